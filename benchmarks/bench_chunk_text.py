@@ -0,0 +1,71 @@
+"""Compare utils.text.chunk_text with the previous slicing implementation.
+
+The 50 KB rows are the target size; the 1 MB rows show how each version scales.
+
+Run from the repository root: ``python benchmarks/bench_chunk_text.py``
+"""
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.text import chunk_text  # noqa: E402
+
+_SIZES = (50_000, 1_000_000)
+_REPEAT = 3
+
+
+def legacy_chunk_text(text: str, limit: int = 1900, max_chunks: int = 6) -> list[str]:
+    text = (text or "").strip()
+    if not text:
+        return ["(No response)"]
+
+    chunks = []
+    remaining = text
+
+    while len(remaining) > limit and len(chunks) < max_chunks - 1:
+        split_at = remaining.rfind("\n", 0, limit)
+        if split_at == -1:
+            split_at = remaining.rfind(" ", 0, limit)
+        if split_at == -1:
+            split_at = limit
+
+        chunks.append(remaining[:split_at].rstrip())
+        remaining = remaining[split_at:].lstrip()
+
+    if remaining:
+        chunks.append(remaining)
+
+    return chunks
+
+
+def _inputs(size: int) -> dict[str, str]:
+    prose = "The quick brown fox jumps over the lazy dog. " * (size // 45)
+    paragraphs = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 6 + "\n\n") * (size // 350)
+    code_block = "\n".join(f"    result_{i} = compute({i})  # step {i}" for i in range(size // 40))
+    markdown = f"Some intro text.\n\n```python\n{code_block}\n```\n\n- item one\n- item two\n"
+    no_spaces = "x" * size
+    return {"prose": prose, "paragraphs": paragraphs, "markdown": markdown, "no_spaces": no_spaces}
+
+
+def _best_ms(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=_REPEAT)) / number * 1000
+
+
+def main() -> None:
+    print(f"{'input':<20}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for size in _SIZES:
+        number = max(1, 1_000_000 // size)
+        max_chunks = size  # never hit the cap, so both versions walk the whole input
+        for name, text in _inputs(size).items():
+            legacy_ms = _best_ms(lambda: legacy_chunk_text(text, max_chunks=max_chunks), number)
+            current_ms = _best_ms(lambda: chunk_text(text, max_chunks=max_chunks), number)
+            label = f"{name} ({size // 1000} KB)"
+            print(f"{label:<20}{legacy_ms:>12.3f}{current_ms:>12.3f}{legacy_ms / current_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare the network profiles in services.http_service against a local stand-in server.
+
+The server runs on its own thread and event loop, answering each request with a small JSON
+body after a short delay to mimic an upstream API. Requests go to ``localhost`` so name
+resolution and the DNS cache are part of what is measured. When uvloop is installed, every
+profile is also run on a uvloop event loop.
+
+Run from the repository root: ``python benchmarks/bench_http_profiles.py``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiohttp import web  # noqa: E402
+
+from services.http_service import NETWORK_PROFILES, create_session  # noqa: E402
+
+_PAYLOAD = {"status": "OK", "results": [{"name": "Taco Spot", "vicinity": "1 Main St"}] * 20}
+
+
+class StandInServer:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.port = 0
+        self._ready = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread = threading.Thread(target=self._run, name="stand-in-server", daemon=True)
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        assert self._loop is not None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.delay)
+        return web.json_response(_PAYLOAD)
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_get("/api", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(runner.cleanup())
+        self._loop.close()
+
+
+async def _run_profile(profile, url: str, requests: int, concurrency: int) -> tuple[float, list[float]]:
+    session = create_session(profile, 30)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with session.get(url) as response:
+                await response.json()
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await session.close()
+    return elapsed, latencies
+
+
+def _loop_factories():
+    yield "asyncio", asyncio.new_event_loop
+    try:
+        import uvloop
+    except ImportError:
+        return
+    yield "uvloop", uvloop.new_event_loop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=2.0, help="stand-in server response delay")
+    args = parser.parse_args()
+
+    with StandInServer(args.delay_ms / 1000) as server:
+        url = f"http://localhost:{server.port}/api"
+        print(f"{args.requests} requests, concurrency {args.concurrency}, server delay {args.delay_ms} ms")
+        print(f"{'loop':<8} {'profile':<8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for loop_name, new_loop in _loop_factories():
+            for profile in NETWORK_PROFILES.values():
+                loop = new_loop()
+                try:
+                    elapsed, latencies = loop.run_until_complete(
+                        _run_profile(profile, url, args.requests, args.concurrency)
+                    )
+                finally:
+                    loop.close()
+                cuts = statistics.quantiles(latencies, n=100)
+                print(
+                    f"{loop_name:<8} {profile.name:<8} {args.requests / elapsed:>9.0f} "
+                    f"{cuts[49] * 1000:>8.1f} {cuts[98] * 1000:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""How much event-loop time bursts of ``logger.exception`` cost under each logging setup.
+
+A task logs bursts of identical errors (with a few frames of traceback) while a ticker measures
+how late the loop wakes it. "inline" is the old ``basicConfig`` stream handler; the queue rows
+use utils.logs, once with the repeat limit effectively off and once with its defaults.
+
+Run from the repository root: ``python benchmarks/bench_logging.py``
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.logs import RepeatFilter, start_queue_logging, stop_queue_logging  # noqa: E402
+
+_BURSTS = 40
+_BURST_SIZE = 50
+_TICK_SECONDS = 0.001
+
+logger = logging.getLogger("thejamesroll-bot.bench")
+
+
+def _fail(depth: int) -> None:
+    if depth:
+        _fail(depth - 1)
+    raise RuntimeError("upstream returned 502")
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(_TICK_SECONDS)
+        lags.append(time.perf_counter() - started - _TICK_SECONDS)
+
+
+async def _scenario() -> tuple[list[float], list[float]]:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    costs: list[float] = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    for _ in range(_BURSTS):
+        for attempt in range(_BURST_SIZE):
+            started = time.perf_counter()
+            try:
+                _fail(8)
+            except RuntimeError:
+                logger.exception("Finance lookup failed (attempt %d)", attempt)
+            costs.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+    stop.set()
+    await ticker
+    return costs, lags
+
+
+def _configure(name: str, handle) -> None:
+    root = logging.getLogger()
+    root.handlers.clear()
+    if name == "inline":
+        logging.basicConfig(
+            level=logging.INFO, stream=handle, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+        )
+    elif name == "queue":
+        start_queue_logging(stream=handle, repeat_filter=RepeatFilter(burst=10**9))
+    else:
+        start_queue_logging(stream=handle)
+
+
+def main() -> None:
+    print(f"{'setup':<24}{'mean us/call':>14}{'p99 us/call':>14}{'max lag ms':>12}{'written':>9}")
+    for name in ("inline", "queue", "queue + repeat limit"):
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as handle:
+            _configure(name, handle)
+            costs, lags = asyncio.run(_scenario())
+            stop_queue_logging()
+            logging.getLogger().handlers.clear()
+            handle.seek(0)
+            lines = handle.read().count("Finance lookup failed")
+        p99 = statistics.quantiles(costs, n=100)[98]
+        print(
+            f"{name:<24}{statistics.fmean(costs) * 1e6:>14.1f}{p99 * 1e6:>14.1f}"
+            f"{max(lags, default=0) * 1000:>12.2f}{lines:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Quote search latency as the store grows.
+
+Fills a temporary store with synthetic quotes and times ``QuoteStore.search`` (the blocking
+part, without the thread hop) for selective and common terms in two guilds: one that always
+holds 1k quotes and one that holds most of the rest. Searches only touch their own guild's
+rows, so the 1k guild should stay roughly flat from 1k to 100k quotes in the store, while
+the big guild grows with its own matches.
+
+Run from the repository root: ``python benchmarks/bench_quote_search.py``
+"""
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.quote_store import QuoteStore  # noqa: E402
+
+_SIZES = (1_000, 10_000, 100_000)
+_GUILDS = 4
+_REPEAT = 200
+_WORDS = (
+    "pizza taco friday monday coffee meeting deploy server bug fix launch lunch dinner "
+    "game night raid boss loot cat dog walk rain sun beach movie popcorn late early"
+).split()
+_QUERIES = {"selective": "zebra", "prefix": "piz", "common+author": "night"}
+_SMALL_GUILD = 0
+_SMALL_GUILD_QUOTES = 1_000
+
+
+def _fill(store: QuoteStore, count: int, rng: random.Random) -> None:
+    rows: dict[int, list[tuple[str, str, None]]] = {guild: [] for guild in range(_GUILDS)}
+    for i in range(count):
+        words = rng.choices(_WORDS, k=8)
+        if i % 997 == 0:
+            words.append("zebra")
+        # The small guild gets a fixed share; guild 1 ends up the biggest of the rest.
+        guild = _SMALL_GUILD if i < _SMALL_GUILD_QUOTES else 1 + i % (_GUILDS - 1)
+        rows[guild].append((" ".join(words), rng.choice(("Ann", "Bo", "Cy", "Di")), None))
+    for guild, guild_rows in rows.items():
+        store._add_many(guild, guild_rows)
+
+
+def main() -> None:
+    rng = random.Random(1)
+    print(f"{'quotes':>8} {'guild':>7} {'query':<14} {'ms/search':>10}")
+    for size in _SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = QuoteStore(Path(tmp) / "quotes.sqlite3")
+            try:
+                _fill(store, size, rng)
+                for guild in (_SMALL_GUILD, 1):
+                    guild_size = store._count(guild)
+                    for label, query in _QUERIES.items():
+                        author = "Ann" if label.endswith("author") else None
+                        seconds = timeit.timeit(lambda: store._search(guild, query, author, 10), number=_REPEAT)
+                        print(f"{size:>8} {guild_size:>7} {label:<14} {seconds / _REPEAT * 1000:>10.3f}")
+            finally:
+                store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,53 @@
 from __future__ import annotations
 
+import argparse
+import asyncio
 import logging
 
-from config import SETTINGS
+from config import load_settings
 from core_bot import JamesBot
+from utils.logs import RepeatFilter, start_queue_logging
 
+logger = logging.getLogger("thejamesroll-bot")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-)
+
+def configure_logging(settings) -> None:
+    """Log through a queue to a background thread, as JSON lines unless ``LOG_FORMAT=text``."""
+    start_queue_logging(
+        json_output=settings.log_format != "text",
+        repeat_filter=RepeatFilter(burst=settings.log_repeat_burst),
+    )
+
+
+def install_uvloop() -> bool:
+    """Use uvloop for the event loop when it is installed; it is an optional speed-up."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def run_bot(settings, **bot_options) -> None:
+    if settings.use_uvloop and not install_uvloop():
+        logger.info("uvloop is not installed; using the default asyncio loop")
+    bot = JamesBot(settings, **bot_options)
+    bot.run(settings.discord_token, log_handler=None)
 
 
 def main() -> None:
-    bot = JamesBot(SETTINGS)
-    bot.run(SETTINGS.discord_token, log_handler=None)
+    parser = argparse.ArgumentParser(description="Run the Discord bot.")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="sync the application command tree even if it has not changed since the last sync",
+    )
+    args = parser.parse_args()
+
+    settings = load_settings()
+    configure_logging(settings)
+    run_bot(settings, force_sync=args.sync)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""Run the bot as several worker processes, each owning a contiguous range of shards.
+
+The launcher hosts the IPC hub (see utils/ipc.py) and restarts workers that exit. Worker 0 is
+the primary: it syncs the command tree and runs the scheduled finance posts.
+
+    python cluster.py --workers 4             # shard count from Discord's recommendation
+    python cluster.py --workers 2 --shards 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+import aiohttp
+
+from bot import configure_logging, run_bot
+from config import load_settings
+from utils.ipc import IPCHub
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+_POLL_SECONDS = 1.0
+_RESTART_DELAY_SECONDS = 5.0
+_STOP_TIMEOUT_SECONDS = 15.0
+
+
+def distribute_shards(shard_count: int, workers: int) -> list[list[int]]:
+    """Split shard ids ``0..shard_count-1`` into contiguous ranges whose sizes differ by at most one."""
+    if shard_count < 1 or workers < 1:
+        raise ValueError("shard_count and workers must be positive")
+    workers = min(workers, shard_count)
+    base, extra = divmod(shard_count, workers)
+    plan = []
+    start = 0
+    for worker in range(workers):
+        size = base + (1 if worker < extra else 0)
+        plan.append(list(range(start, start + size)))
+        start += size
+    return plan
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """The shard Discord delivers a guild's events on."""
+    return (guild_id >> 22) % shard_count
+
+
+async def fetch_recommended_shards(token: str) -> int:
+    headers = {"Authorization": f"Bot {token}"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(_GATEWAY_BOT_URL, headers=headers) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return int(data["shards"])
+
+
+def _run_worker(cluster_id: int, shard_ids: list[int], shard_count: int, ipc_port: int, force_sync: bool) -> None:
+    settings = load_settings()
+    configure_logging(settings)
+    run_bot(
+        settings,
+        force_sync=force_sync,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        cluster_id=cluster_id,
+        ipc_port=ipc_port,
+    )
+
+
+class Cluster:
+    def __init__(self, plan: list[list[int]], shard_count: int, *, force_sync: bool = False) -> None:
+        self.plan = plan
+        self.shard_count = shard_count
+        self.force_sync = force_sync
+        self.hub = IPCHub()
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: dict[int, multiprocessing.process.BaseProcess] = {}
+        self._restart_at: dict[int, float] = {}
+
+    def _spawn(self, cluster_id: int) -> None:
+        process = self._context.Process(
+            target=_run_worker,
+            args=(cluster_id, self.plan[cluster_id], self.shard_count, self.hub.port, self.force_sync),
+            name=f"bot-worker-{cluster_id}",
+        )
+        process.start()
+        self._processes[cluster_id] = process
+        logger.info("Started worker %d (pid %d) with shards %s", cluster_id, process.pid, self.plan[cluster_id])
+
+    def _check_workers(self) -> None:
+        now = time.monotonic()
+        for cluster_id, process in self._processes.items():
+            if process.is_alive():
+                continue
+            restart_at = self._restart_at.get(cluster_id)
+            if restart_at is None:
+                logger.warning(
+                    "Worker %d exited with code %s; restarting in %.0fs",
+                    cluster_id,
+                    process.exitcode,
+                    _RESTART_DELAY_SECONDS,
+                )
+                self._restart_at[cluster_id] = now + _RESTART_DELAY_SECONDS
+            elif restart_at <= now:
+                del self._restart_at[cluster_id]
+                self._spawn(cluster_id)
+
+    async def run(self) -> None:
+        await self.hub.start()
+        for cluster_id in range(len(self.plan)):
+            self._spawn(cluster_id)
+        try:
+            while True:
+                await asyncio.sleep(_POLL_SECONDS)
+                self._check_workers()
+        finally:
+            await self._stop_workers()
+            await self.hub.stop()
+
+    async def _stop_workers(self) -> None:
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        for cluster_id, process in self._processes.items():
+            await asyncio.to_thread(process.join, _STOP_TIMEOUT_SECONDS)
+            if process.is_alive():
+                logger.warning("Worker %d did not stop; killing it", cluster_id)
+                process.kill()
+
+
+async def _run_until_signalled(cluster: Cluster) -> None:
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await cluster.run()
+    except asyncio.CancelledError:
+        logger.info("Cluster stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes to run")
+    parser.add_argument("--shards", type=int, help="total shard count (default: Discord's recommendation)")
+    parser.add_argument("--sync", action="store_true", help="force the primary worker to sync the command tree")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    configure_logging(settings)
+    shard_count = args.shards or asyncio.run(fetch_recommended_shards(settings.discord_token))
+    plan = distribute_shards(shard_count, args.workers)
+    logger.info("Running %d shard(s) across %d worker(s)", shard_count, len(plan))
+    asyncio.run(_run_until_signalled(Cluster(plan, shard_count, force_sync=args.sync)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 from io import BytesIO
+from pathlib import Path
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from services.openai_service import OpenAIService, format_usage_footnote
+from services.image_codec import create_transcoder, file_extension
+from services.image_jobs import ImageDiskCache, ImageRequest, ImageService
+from services.openai_service import DEFAULT_IMAGE_SIZE, OpenAIService, format_usage_footnote
+from services.summarizer import ChannelSummarizer, SummaryResult
 from services.google_translate import translate_text
+from utils.coalesce import Coalescer, normalize_input
+from utils.gallery import GalleryImage, ImageGalleryView
+from utils.language import looks_like_language
+from utils.metrics import REGISTRY
 from utils.presentation import run_interaction_task
 from utils.sanitize import clean_input, prompt_wrap
 from utils.visibility import VISIBILITY_CHOICES, is_ephemeral
 
+logger = logging.getLogger("thejamesroll-bot")
+
+IMAGE_UPLOAD_BYTES = REGISTRY.histogram(
+    "image_upload_bytes",
+    "Size of generated images uploaded to Discord.",
+    buckets=(131072, 262144, 524288, 1048576, 2097152, 4194304, 8388608),
+)
+IMAGE_DELIVERY_SECONDS = REGISTRY.histogram(
+    "image_delivery_seconds", "Time from an /img command to its image being posted."
+)
 
 REWRITE_TONE_CHOICES = [
     app_commands.Choice(name="professional", value="professional"),
@@ -23,12 +44,26 @@ REWRITE_TONE_CHOICES = [
     app_commands.Choice(name="degen", value="degen"),
 ]
 
+IMAGE_SIZE_CHOICES = [
+    app_commands.Choice(name="square", value="1024x1024"),
+    app_commands.Choice(name="landscape", value="1536x1024"),
+    app_commands.Choice(name="portrait", value="1024x1536"),
+]
+
 EXPLAIN_LEVEL_CHOICES = [
     app_commands.Choice(name="simple", value="simple"),
     app_commands.Choice(name="normal", value="normal"),
     app_commands.Choice(name="technical", value="technical"),
 ]
 
+_MAX_HISTORY_MESSAGES = 100
+_MAX_SUMMARY_MESSAGES = 500
+# Commands that read channel history; without the Message Content intent every message is empty.
+_HISTORY_COMMANDS = frozenset({"summarize", "translate-history"})
+_MAX_IMAGE_VARIANTS = 4
+_QUEUE_GRACE_SECONDS = 0.5
+_QUEUE_POLL_SECONDS = 2.0
+
 _ASK_SYSTEM = (
     "You are a Discord assistant helping a friend group in an active server.\n"
     "Tone: friendly, useful, and concise.\n"
@@ -122,6 +157,65 @@ def build_explain_prompt(text: str, level: str) -> str:
     )
 
 
+async def translate_message_history(bot, history, target_language: str) -> str:
+    """Translate a stream of messages, skipping repeats and text already in the target language."""
+    entries: list[tuple[str, str]] = []
+    pending: dict[str, None] = {}
+    seen: set[str] = set()
+    total = duplicates = skipped = 0
+
+    async for message in history:
+        content = (message.content or "").strip()
+        if not content:
+            continue
+        total += 1
+
+        key = " ".join(content.split()).lower()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+
+        if looks_like_language(content, target_language):
+            skipped += 1
+            continue
+
+        entries.append((message.author.display_name, content))
+        pending[content] = None
+
+    if not entries:
+        return f"Nothing to translate in the last {total} message(s)."
+
+    texts = list(pending)
+    results = await bot.translator.translate_many(texts, target_language)
+    translated = {text: result.text for text, result in zip(texts, results)}
+
+    # channel.history yields newest first; show the conversation in reading order.
+    # Names and messages come from other users; neither may add formatting or mentions.
+    lines = [
+        f"**{discord.utils.escape_markdown(author)}:** {discord.utils.escape_mentions(translated[content])}"
+        for author, content in reversed(entries)
+    ]
+    lines.append(
+        f"-# Translated {len(entries)} of {total} message(s) to `{target_language.strip().lower()}` · "
+        f"{skipped} already in target · {duplicates} duplicate(s)"
+    )
+    return "\n".join(lines)
+
+
+def format_channel_summary(result: SummaryResult, *, empty: str) -> str:
+    if not result.text:
+        return empty
+    if result.incremental and not result.messages:
+        return f"{result.text}\n-# No new messages since the last summary"
+    footer = f"-# {result.messages} message(s) · {result.chunks} chunk(s) · {result.calls} call(s)"
+    if result.calls:
+        footer += f" · {result.prompt_tokens} in · {result.completion_tokens} out tokens"
+    if result.incremental:
+        footer += " · extended the previous summary"
+    return f"{result.text}\n{footer}"
+
+
 class RewriteMessageModal(discord.ui.Modal, title="Rewrite Message"):
     tone = discord.ui.TextInput(
         label="Tone",
@@ -130,9 +224,16 @@ class RewriteMessageModal(discord.ui.Modal, title="Rewrite Message"):
         max_length=50,
     )
 
-    def __init__(self, openai_service: OpenAIService, target_message: discord.Message, max_chunks: int) -> None:
+    def __init__(
+        self,
+        openai_service: OpenAIService,
+        coalescer: Coalescer,
+        target_message: discord.Message,
+        max_chunks: int,
+    ) -> None:
         super().__init__()
         self.openai_service = openai_service
+        self.coalescer = coalescer
         self.target_message = target_message
         self.max_chunks = max_chunks
 
@@ -141,10 +242,9 @@ class RewriteMessageModal(discord.ui.Modal, title="Rewrite Message"):
             tone_value = self.tone.value.strip().lower()
             text = self.target_message.content or "(no text content)"
             prompt = build_rewrite_prompt(text, tone_value)
-            result, usage = await self.openai_service.ask(
-                prompt,
-                system_prompt=_REWRITE_SYSTEM,
-                max_tokens=800,
+            result, usage = await self.coalescer.run(
+                ("rewrite", tone_value, normalize_input(text)),
+                lambda: self.openai_service.ask(prompt, system_prompt=_REWRITE_SYSTEM, max_tokens=800),
             )
             return result + format_usage_footnote(usage)
 
@@ -157,24 +257,134 @@ class RewriteMessageModal(discord.ui.Modal, title="Rewrite Message"):
         )
 
 
+class TranslateMessageModal(discord.ui.Modal, title="Translate Message"):
+    target_language = discord.ui.TextInput(
+        label="Target language",
+        placeholder="Language code, e.g. en, es, fr, ja, zh-CN",
+        required=True,
+        max_length=10,
+    )
+
+    def __init__(self, bot, target_message: discord.Message, max_chunks: int) -> None:
+        super().__init__()
+        self.bot = bot
+        self.target_message = target_message
+        self.max_chunks = max_chunks
+
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        async def work() -> str:
+            text = self.target_message.content
+            if not text or not text.strip():
+                return "That message has no text to translate."
+            return await translate_text(
+                self.bot,
+                text=text,
+                target_language=self.target_language.value,
+            )
+
+        await run_interaction_task(
+            interaction,
+            task_name="Translate Message",
+            work=work,
+            ephemeral=True,
+            max_chunks=self.max_chunks,
+        )
+
+
 class AICog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.openai_service = OpenAIService(bot.settings)
+        self.coalescer = Coalescer("ai")
+        self.images = ImageService(
+            lambda request: self.openai_service.generate_images(
+                request.prompt, n=request.n, size=request.size, model=request.model
+            ),
+            ImageDiskCache(Path(bot.settings.image_cache_dir), bot.settings.image_cache_max_mb * 1024 * 1024),
+            workers=bot.settings.image_workers,
+        )
+        self.transcoder = create_transcoder(bot.settings)
+        self.summarizer = ChannelSummarizer(self.openai_service, bot.cache)
 
         self.rewrite_message_menu = app_commands.ContextMenu(
             name="Rewrite Message",
             callback=self.rewrite_message_context,
         )
+        self.translate_message_menu = app_commands.ContextMenu(
+            name="Translate Message",
+            callback=self.translate_message_context,
+        )
+        self.summarize_from_menu = app_commands.ContextMenu(
+            name="Summarize From Here",
+            callback=self.summarize_from_context,
+        )
+        self.menus = [self.rewrite_message_menu, self.translate_message_menu]
+
+        if bot.intents.message_content:
+            self.menus.append(self.summarize_from_menu)
+        else:
+            # Registered before cog_load runs, so filter here rather than removing from the tree.
+            self.__cog_app_commands__ = [
+                command for command in self.__cog_app_commands__ if command.name not in _HISTORY_COMMANDS
+            ]
+            logger.info(
+                "Message Content intent is off; not registering %s or Summarize From Here",
+                ", ".join(f"/{name}" for name in sorted(_HISTORY_COMMANDS)),
+            )
 
     async def cog_load(self) -> None:
-        self.bot.tree.add_command(self.rewrite_message_menu)
+        for menu in self.menus:
+            self.bot.tree.add_command(menu)
+        self.images.start()
 
     async def cog_unload(self) -> None:
-        self.bot.tree.remove_command(
-            self.rewrite_message_menu.name,
-            type=self.rewrite_message_menu.type,
-        )
+        for menu in self.menus:
+            self.bot.tree.remove_command(menu.name, type=menu.type)
+        await self.images.stop()
+        await self.openai_service.close()
+        if self.transcoder is not None:
+            self.transcoder.close()
+
+    async def _generate_queued_images(self, interaction: discord.Interaction, request: ImageRequest) -> list[dict]:
+        """Cached images if there are any; otherwise queue the job and show the user their place in line."""
+        if request.cache:
+            cached = await self.images.cached(request)
+            if cached is not None:
+                return cached
+
+        job = await self.images.submit(interaction.guild_id or 0, request)
+        edited = False
+        shown: int | None = None
+        try:
+            # Give an idle worker a moment to pick the job up so uncontended requests stay silent.
+            await asyncio.wait({job.future}, timeout=_QUEUE_GRACE_SECONDS)
+            while not job.future.done():
+                position = self.images.queue.position(job)
+                if position != shown and (position or edited):
+                    status = f"⏳ Queued — position {position}" if position else "🎨 Generating…"
+                    await interaction.edit_original_response(content=status)
+                    edited = True
+                shown = position
+                await asyncio.wait({job.future}, timeout=_QUEUE_POLL_SECONDS)
+        finally:
+            if not job.future.done():
+                job.future.cancel()
+        if edited:
+            # The image arrives as a follow-up; drop the status message it replaces.
+            await interaction.delete_original_response()
+        return job.future.result()
+
+    async def _prepare_image(self, image: dict, stem: str) -> tuple[GalleryImage, discord.File | None, int]:
+        """Gallery entry, upload file and upload size for one generated image."""
+        if image["kind"] == "url":
+            return GalleryImage(url=str(image["value"])), None, 0
+        data, mime_type = image["value"], image.get("mime_type", "image/png")
+        if self.transcoder is not None:
+            data, mime_type = await self.transcoder.transcode(data, mime_type)
+        filename = f"{stem}.{file_extension(mime_type)}"
+        # BytesIO shares the buffer of an exact bytes object instead of copying it, so the
+        # upload reads straight from the decoded (or cached, or transcoded) image.
+        return GalleryImage(filename=filename), discord.File(fp=BytesIO(data), filename=filename), len(data)
 
     async def cog_app_command_error(
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
@@ -193,11 +403,49 @@ class AICog(commands.Cog):
     ) -> None:
         modal = RewriteMessageModal(
             openai_service=self.openai_service,
+            coalescer=self.coalescer,
             target_message=message,
             max_chunks=self.bot.settings.max_text_chunks,
         )
         await interaction.response.send_modal(modal)
 
+    async def translate_message_context(
+        self,
+        interaction: discord.Interaction,
+        message: discord.Message,
+    ) -> None:
+        modal = TranslateMessageModal(
+            bot=self.bot,
+            target_message=message,
+            max_chunks=self.bot.settings.max_text_chunks,
+        )
+        await interaction.response.send_modal(modal)
+
+    async def summarize_from_context(
+        self,
+        interaction: discord.Interaction,
+        message: discord.Message,
+    ) -> None:
+        channel = message.channel
+
+        async def work() -> str:
+            # Snowflakes are time-ordered, so one less than the message's ID includes the message itself.
+            history = channel.history(
+                limit=_MAX_SUMMARY_MESSAGES, after=discord.Object(id=message.id - 1), oldest_first=False
+            )
+            result = await self.summarizer.summarize(history)
+            if result.scanned >= _MAX_SUMMARY_MESSAGES:
+                result.text = f"*(Latest {_MAX_SUMMARY_MESSAGES} messages only)*\n{result.text}"
+            return format_channel_summary(result, empty="Nothing to summarize after that message.")
+
+        await run_interaction_task(
+            interaction,
+            task_name="Summarize",
+            work=work,
+            ephemeral=True,
+            max_chunks=self.bot.settings.max_text_chunks,
+        )
+
     @app_commands.command(name="ask", description="Ask the bot a question")
     @app_commands.checks.cooldown(1, 15.0)
     @app_commands.choices(visibility=VISIBILITY_CHOICES)
@@ -215,10 +463,9 @@ class AICog(commands.Cog):
 
         async def work() -> str:
             structured_prompt = build_discord_ask_prompt(prompt)
-            result, usage = await self.openai_service.ask(
-                structured_prompt,
-                system_prompt=_ASK_SYSTEM,
-                max_tokens=800,
+            result, usage = await self.coalescer.run(
+                ("ask", normalize_input(prompt)),
+                lambda: self.openai_service.ask(structured_prompt, system_prompt=_ASK_SYSTEM, max_tokens=800),
             )
             return result + format_usage_footnote(usage)
 
@@ -251,10 +498,9 @@ class AICog(commands.Cog):
 
         async def work() -> str:
             prompt = build_rewrite_prompt(text, tone.value)
-            result, usage = await self.openai_service.ask(
-                prompt,
-                system_prompt=_REWRITE_SYSTEM,
-                max_tokens=800,
+            result, usage = await self.coalescer.run(
+                ("rewrite", tone.value, normalize_input(text)),
+                lambda: self.openai_service.ask(prompt, system_prompt=_REWRITE_SYSTEM, max_tokens=800),
             )
             return result + format_usage_footnote(usage)
 
@@ -288,10 +534,9 @@ class AICog(commands.Cog):
 
         async def work() -> str:
             prompt = build_explain_prompt(text, selected_level)
-            result, usage = await self.openai_service.ask(
-                prompt,
-                system_prompt=_EXPLAIN_SYSTEM,
-                max_tokens=800,
+            result, usage = await self.coalescer.run(
+                ("explain", selected_level, normalize_input(text)),
+                lambda: self.openai_service.ask(prompt, system_prompt=_EXPLAIN_SYSTEM, max_tokens=800),
             )
             return result + format_usage_footnote(usage)
 
@@ -338,13 +583,90 @@ class AICog(commands.Cog):
             max_chunks=self.bot.settings.max_text_chunks,
         )
 
-    @app_commands.command(name="img", description="Generate an image from a prompt")
+    @app_commands.command(name="translate-history", description="Translate recent messages in this channel")
+    @app_commands.describe(
+        target_language="Target language code, e.g. es, fr, ja, zh-CN",
+        count=f"How many recent messages to translate (max {_MAX_HISTORY_MESSAGES})",
+        visibility="Whether the result should be public or private",
+    )
     @app_commands.checks.cooldown(1, 30.0)
     @app_commands.choices(visibility=VISIBILITY_CHOICES)
+    async def translate_history_slash(
+        self,
+        interaction: discord.Interaction,
+        target_language: str,
+        count: app_commands.Range[int, 1, _MAX_HISTORY_MESSAGES] = 25,
+        visibility: app_commands.Choice[str] | None = None,
+    ):
+        channel = interaction.channel
+        if channel is None or not hasattr(channel, "history"):
+            await interaction.response.send_message("Can't read history in this channel.", ephemeral=True)
+            return
+
+        ephemeral = is_ephemeral(visibility, True)
+
+        async def work() -> str:
+            return await translate_message_history(
+                self.bot,
+                channel.history(limit=count),
+                target_language,
+            )
+
+        await run_interaction_task(
+            interaction,
+            task_name="Translate history",
+            work=work,
+            ephemeral=ephemeral,
+            max_chunks=self.bot.settings.max_text_chunks,
+            allowed_mentions=discord.AllowedMentions.none(),
+        )
+
+    @app_commands.command(name="summarize", description="Summarize recent messages in this channel")
+    @app_commands.describe(
+        count=f"How many recent messages to cover (max {_MAX_SUMMARY_MESSAGES})",
+        visibility="Whether the result should be public or private",
+    )
+    @app_commands.checks.cooldown(1, 60.0)
+    @app_commands.choices(visibility=VISIBILITY_CHOICES)
+    async def summarize_slash(
+        self,
+        interaction: discord.Interaction,
+        count: app_commands.Range[int, 1, _MAX_SUMMARY_MESSAGES] = 200,
+        visibility: app_commands.Choice[str] | None = None,
+    ):
+        channel = interaction.channel
+        if channel is None or not hasattr(channel, "history"):
+            await interaction.response.send_message("Can't read history in this channel.", ephemeral=True)
+            return
+
+        ephemeral = is_ephemeral(visibility, True)
+
+        def open_history(after_id: int | None):
+            after = discord.Object(id=after_id) if after_id is not None else None
+            return channel.history(limit=count, after=after, oldest_first=False)
+
+        async def work() -> str:
+            result = await self.summarizer.summarize_channel(channel.id, open_history, limit=count)
+            return format_channel_summary(result, empty=f"Nothing to summarize in the last {count} message(s).")
+
+        await run_interaction_task(
+            interaction,
+            task_name="Summarize",
+            work=work,
+            ephemeral=ephemeral,
+            max_chunks=self.bot.settings.max_text_chunks,
+        )
+
+    @app_commands.command(name="img", description="Generate an image from a prompt")
+    @app_commands.checks.cooldown(1, 30.0)
+    @app_commands.describe(variants="How many versions to generate in one go", size="Image shape")
+    @app_commands.choices(size=IMAGE_SIZE_CHOICES, visibility=VISIBILITY_CHOICES)
     async def image_slash(
         self,
         interaction: discord.Interaction,
         prompt: str,
+        variants: app_commands.Range[int, 1, _MAX_IMAGE_VARIANTS] = 1,
+        size: app_commands.Choice[str] | None = None,
         visibility: app_commands.Choice[str] | None = None,
     ):
         if not prompt.strip():
@@ -352,20 +674,40 @@ class AICog(commands.Cog):
             return
 
         ephemeral = is_ephemeral(visibility, False)
+        request = ImageRequest(
+            prompt,
+            self.bot.settings.default_image_model,
+            n=variants,
+            size=size.value if size else DEFAULT_IMAGE_SIZE,
+        )
+        started = time.perf_counter()
+        upload_size: int | None = None
+        regenerations = 0
+
+        async def regenerate(index: int) -> tuple[GalleryImage, discord.File | None]:
+            nonlocal regenerations
+            regenerations += 1
+            fresh = ImageRequest(request.prompt, request.model, size=request.size, cache=False)
+            job = await self.images.submit(interaction.guild_id or 0, fresh)
+            (image,) = await job.future
+            gallery_image, file, _ = await self._prepare_image(image, f"image-{index + 1}-r{regenerations}")
+            return gallery_image, file
 
         async def work():
-            image = await self.openai_service.generate_image(prompt)
-            embed = discord.Embed(title="Generated image", description=prompt)
-            if image["kind"] == "url":
-                embed.set_image(url=str(image["value"]))
-                return embed
-
-            file = discord.File(
-                fp=BytesIO(bytes(image["value"])),
-                filename="generated-image.png",
+            nonlocal upload_size
+            images = await self._generate_queued_images(interaction, request)
+            prepared = await asyncio.gather(
+                *(self._prepare_image(image, f"image-{number}") for number, image in enumerate(images, start=1))
             )
-            embed.set_image(url="attachment://generated-image.png")
-            return embed, file
+            upload_size = sum(nbytes for _, _, nbytes in prepared)
+            view = ImageGalleryView(
+                prompt,
+                [gallery_image for gallery_image, _, _ in prepared],
+                owner_id=interaction.user.id,
+                regenerate=regenerate,
+            )
+            files = [file for _, file, _ in prepared if file is not None]
+            return (view.current_embed(), *files, view)
 
         await run_interaction_task(
             interaction,
@@ -374,6 +716,14 @@ class AICog(commands.Cog):
             ephemeral=ephemeral,
             max_chunks=self.bot.settings.max_text_chunks,
         )
+        if upload_size is not None:
+            elapsed = time.perf_counter() - started
+            IMAGE_DELIVERY_SECONDS.observe(elapsed)
+            if upload_size:
+                IMAGE_UPLOAD_BYTES.observe(upload_size)
+            logger.info(
+                "%d image(s) delivered in %.0f ms, %d byte(s) uploaded", request.n, elapsed * 1000, upload_size
+            )
 
 
 async def setup(bot):
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import datetime
+from io import BytesIO
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.presentation import run_interaction_task
+from utils.profiler import is_profiling, profile_loop
+
+_MAX_PROFILE_SECONDS = 60
+_TOP_ROWS = 10
+
+
+def build_profile_embed(result) -> discord.Embed:
+    embed = discord.Embed(
+        title="Event loop profile",
+        description=f"{result.samples} samples over {result.duration:.0f}s "
+        f"({result.interval * 1000:.0f} ms interval)",
+    )
+
+    top_tasks = result.top_tasks(_TOP_ROWS)
+    if top_tasks:
+        embed.add_field(
+            name="Top coroutines by wall time holding the loop",
+            value="\n".join(f"`{name}` — ~{seconds:.2f}s" for name, seconds in top_tasks)[:1024],
+            inline=False,
+        )
+
+    top_awaits = result.top_awaits(_TOP_ROWS)
+    if top_awaits:
+        embed.add_field(
+            name="Top await points by task wall time",
+            value="\n".join(f"`{label}` — ~{seconds:.2f}s" for label, seconds in top_awaits)[:1024],
+            inline=False,
+        )
+
+    if result.task_counts:
+        total = sum(result.task_counts.values())
+        lines = [f"`{name}` × {count}" for name, count in result.task_counts.most_common(_TOP_ROWS)]
+        embed.add_field(name=f"Live tasks ({total})", value="\n".join(lines)[:1024], inline=False)
+
+    return embed
+
+
+class DebugCog(commands.Cog):
+    debug = app_commands.Group(
+        name="debug",
+        description="Owner-only diagnostics",
+        default_permissions=discord.Permissions(administrator=True),
+    )
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+    @debug.command(name="profile", description="Sample the live event loop and attach the profile")
+    @app_commands.describe(seconds=f"How long to sample (1–{_MAX_PROFILE_SECONDS})")
+    async def profile_slash(
+        self,
+        interaction: discord.Interaction,
+        seconds: app_commands.Range[int, 1, _MAX_PROFILE_SECONDS] = 10,
+    ) -> None:
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can run this.", ephemeral=True)
+            return
+
+        if is_profiling():
+            await interaction.response.send_message("A profile is already running; try again shortly.", ephemeral=True)
+            return
+
+        async def work():
+            result = await profile_loop(seconds)
+            stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d-%H%M%S")
+            loop_file = discord.File(
+                fp=BytesIO(result.collapsed().encode("utf-8")),
+                filename=f"profile-{stamp}.collapsed.txt",
+            )
+            tasks_file = discord.File(
+                fp=BytesIO(result.collapsed_tasks().encode("utf-8")),
+                filename=f"profile-{stamp}.tasks.collapsed.txt",
+            )
+            return build_profile_embed(result), loop_file, tasks_file
+
+        await run_interaction_task(interaction, task_name="Profile", work=work, ephemeral=True)
+
+
+async def setup(bot) -> None:
+    await bot.add_cog(DebugCog(bot))
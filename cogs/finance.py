@@ -4,13 +4,20 @@ import asyncio
 import datetime
 import json
 import logging
+import re
 from pathlib import Path
-import xml.etree.ElementTree as ET
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
+from services.headline_summaries import HeadlineSummarizer
+from services.http_service import timeout_kwargs
+from services.openai_service import OpenAIService
+from utils.metrics import REGISTRY
+from utils.text import discord_len
+from utils.tracing import span, trace_interaction, upstream_span
+
 logger = logging.getLogger(__name__)
 
 _CARD_CATEGORIES_PATH = Path(__file__).parent.parent / "data" / "card_categories.json"
@@ -19,6 +26,8 @@ _QUARTER_MONTHS = {1: "Jan–Mar", 2: "Apr–Jun", 3: "Jul–Sep", 4: "Oct–Dec
 
 # 9pm UTC = 5pm EST — digest on Fridays, alert check Mon–Thu
 _DAILY_TIME = datetime.time(hour=21, minute=0, tzinfo=datetime.timezone.utc)
+# Friday headlines go to the Batch API through the day, so the digest mostly reads the cache.
+_PREFETCH_TIMES = [datetime.time(hour=hour, minute=0, tzinfo=datetime.timezone.utc) for hour in (9, 13, 17)]
 
 _AV_URL = "https://www.alphavantage.co/query"
 _COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
@@ -33,21 +42,47 @@ _STOCK_SYMBOLS = {
     "Gold": "GLD",
 }
 
+_FIELD_LIMIT = 1024
+_EMBED_LIMIT = 6000
+_RECAP_NAME = "🧠 What Happened This Week"
+_CARD_NAME = "💳 Chase Bonus Categories"
+_DIGEST_FOOTER = "Data: Alpha Vantage · CoinGecko · WSJ · Finnhub"
+_TAG_RE = re.compile(r"<[^>]+>")
+
 # Daily alert thresholds
 _SPY_ALERT_PCT = 1.5
 _BTC_ALERT_PCT = 5.0
 
+FINANCE_POSTS_TOTAL = REGISTRY.counter("finance_posts_total", "Scheduled finance messages posted.", ("kind",))
+
 
 class FinanceCog(commands.Cog):
     def __init__(self, bot) -> None:
         self.bot = bot
-        self._card_data: dict = self._load_card_categories()
-        self.weekly_digest.start()
-        self.daily_check.start()
+        self._card_data: dict = {}
+        self.openai_service: OpenAIService | None = None
+        self.headline_summarizer: HeadlineSummarizer | None = None
+        if bot.settings.finance_ai_digest:
+            self.openai_service = OpenAIService(bot.settings)
+            self.headline_summarizer = HeadlineSummarizer(
+                self.openai_service, bot.cache, token_budget=bot.settings.finance_ai_token_budget
+            )
+        # In cluster mode every worker loads this cog; only one may post.
+        if getattr(bot, "is_primary", True):
+            self.weekly_digest.start()
+            self.daily_check.start()
+            if self.headline_summarizer is not None:
+                self.headline_prefetch.start()
+
+    async def cog_load(self) -> None:
+        self._card_data = await asyncio.to_thread(self._load_card_categories)
 
-    def cog_unload(self) -> None:
+    async def cog_unload(self) -> None:
         self.weekly_digest.cancel()
         self.daily_check.cancel()
+        self.headline_prefetch.cancel()
+        if self.openai_service is not None:
+            await self.openai_service.close()
 
     @staticmethod
     def _load_card_categories() -> dict:
@@ -79,6 +114,16 @@ class FinanceCog(commands.Cog):
     async def before_daily_check(self) -> None:
         await self.bot.wait_until_ready()
 
+    @tasks.loop(time=_PREFETCH_TIMES)
+    async def headline_prefetch(self) -> None:
+        if datetime.datetime.now(datetime.timezone.utc).weekday() != 4:  # Friday
+            return
+        await self._prefetch_headline_summaries()
+
+    @headline_prefetch.before_loop
+    async def before_headline_prefetch(self) -> None:
+        await self.bot.wait_until_ready()
+
     # ------------------------------------------------------------------ channel helper
 
     def _get_finance_channel(self):
@@ -88,7 +133,9 @@ class FinanceCog(commands.Cog):
             return None
         channel = self.bot.get_channel(channel_id)
         if not channel:
-            logger.error("Finance channel %d not found", channel_id)
+            # The channel's guild may live on another cluster worker's shards; post over REST.
+            logger.debug("Finance channel %d not cached; using a partial channel", channel_id)
+            channel = self.bot.get_partial_messageable(channel_id)
         return channel
 
     # ------------------------------------------------------------------ weekly digest
@@ -97,12 +144,13 @@ class FinanceCog(commands.Cog):
         channel = self._get_finance_channel()
         if channel:
             await channel.send(embed=await self._build_digest_embed())
+            FINANCE_POSTS_TOTAL.inc(kind="digest")
 
     async def _build_digest_embed(self) -> discord.Embed:
         settings = self.bot.settings
 
         market_task = self._fetch_market() if settings.alpha_vantage_api_key else asyncio.sleep(0)
-        news_task = self._fetch_news()
+        news_task = self._fetch_news_with_summaries()
         econ_task = self._fetch_econ_calendar(days=7) if settings.finnhub_api_key else asyncio.sleep(0)
 
         market, news, econ_events = await asyncio.gather(
@@ -138,15 +186,21 @@ class FinanceCog(commands.Cog):
                 inline=False,
             )
 
+        card_text = self._card_section()
         if isinstance(news, list) and news:
             lines = [f"{i + 1}. [{h['title']}]({h['url']})" for i, h in enumerate(news)]
             embed.add_field(name="📰 Top Finance Headlines", value="\n".join(lines), inline=False)
+            # The recap is the one optional section: it gets whatever the 6000-character embed
+            # total leaves after the card field and footer that still follow it.
+            reserved = discord_len(_DIGEST_FOOTER) + (discord_len(_CARD_NAME + card_text) if card_text else 0)
+            recap = self._recap_section(news, room=_EMBED_LIMIT - len(embed) - reserved - discord_len(_RECAP_NAME))
+            if recap:
+                embed.add_field(name=_RECAP_NAME, value=recap, inline=False)
 
-        card_text = self._card_section()
         if card_text:
-            embed.add_field(name="💳 Chase Bonus Categories", value=card_text, inline=False)
+            embed.add_field(name=_CARD_NAME, value=card_text, inline=False)
 
-        embed.set_footer(text="Data: Alpha Vantage · CoinGecko · WSJ · Finnhub")
+        embed.set_footer(text=_DIGEST_FOOTER)
         return embed
 
     # ------------------------------------------------------------------ daily alert
@@ -158,6 +212,7 @@ class FinanceCog(commands.Cog):
         embed = await self._build_alert_embed()
         if embed:
             await channel.send(embed=embed)
+            FINANCE_POSTS_TOTAL.inc(kind="alert")
 
     async def _build_alert_embed(self) -> discord.Embed | None:
         settings = self.bot.settings
@@ -208,8 +263,11 @@ class FinanceCog(commands.Cog):
             "to": tomorrow.isoformat(),
             "token": self.bot.settings.finnhub_api_key,
         }
-        async with self.bot.http_session.get(_FINNHUB_ECON_URL, params=params) as resp:
-            data = await resp.json()
+        with upstream_span("finnhub.calendar"):
+            async with self.bot.http_session.get(
+                _FINNHUB_ECON_URL, params=params, **timeout_kwargs(self.bot, "finnhub.calendar")
+            ) as resp:
+                data = await resp.json()
 
         events = data.get("economicCalendar", [])
         high_impact = [
@@ -221,8 +279,11 @@ class FinanceCog(commands.Cog):
 
     async def _check_spy_daily(self) -> str | None:
         params = {"symbol": "SPY", "token": self.bot.settings.finnhub_api_key}
-        async with self.bot.http_session.get(_FINNHUB_QUOTE_URL, params=params) as resp:
-            data = await resp.json()
+        with upstream_span("finnhub.quote"):
+            async with self.bot.http_session.get(
+                _FINNHUB_QUOTE_URL, params=params, **timeout_kwargs(self.bot, "finnhub.quote")
+            ) as resp:
+                data = await resp.json()
 
         dp = data.get("dp")
         c = data.get("c")
@@ -235,8 +296,11 @@ class FinanceCog(commands.Cog):
 
     async def _check_btc_24h(self) -> str | None:
         params = {"ids": "bitcoin", "vs_currencies": "usd", "include_24hr_change": "true"}
-        async with self.bot.http_session.get(_COINGECKO_PRICE_URL, params=params) as resp:
-            data = await resp.json()
+        with upstream_span("coingecko.price"):
+            async with self.bot.http_session.get(
+                _COINGECKO_PRICE_URL, params=params, **timeout_kwargs(self.bot, "coingecko.price")
+            ) as resp:
+                data = await resp.json()
 
         btc = data.get("bitcoin", {})
         price = btc.get("usd")
@@ -269,8 +333,11 @@ class FinanceCog(commands.Cog):
             "symbol": symbol,
             "apikey": self.bot.settings.alpha_vantage_api_key,
         }
-        async with self.bot.http_session.get(_AV_URL, params=params) as resp:
-            data = await resp.json()
+        with upstream_span("alphavantage"):
+            async with self.bot.http_session.get(
+                _AV_URL, params=params, **timeout_kwargs(self.bot, "alphavantage")
+            ) as resp:
+                data = await resp.json()
 
         if "Information" in data or "Note" in data:
             msg = data.get("Information") or data.get("Note", "")
@@ -289,8 +356,11 @@ class FinanceCog(commands.Cog):
 
     async def _coingecko_btc(self) -> dict:
         params = {"vs_currency": "usd", "ids": "bitcoin", "price_change_percentage": "7d"}
-        async with self.bot.http_session.get(_COINGECKO_MARKETS_URL, params=params) as resp:
-            data = await resp.json()
+        with upstream_span("coingecko.markets"):
+            async with self.bot.http_session.get(
+                _COINGECKO_MARKETS_URL, params=params, **timeout_kwargs(self.bot, "coingecko.markets")
+            ) as resp:
+                data = await resp.json()
 
         coin = data[0]
         price = coin["current_price"]
@@ -301,22 +371,78 @@ class FinanceCog(commands.Cog):
 
     async def _fetch_news(self) -> list[dict]:
         try:
-            async with self.bot.http_session.get(_NEWS_RSS_URL) as resp:
-                if resp.status != 200:
-                    logger.warning("WSJ RSS returned HTTP %d", resp.status)
-                    return []
-                text = await resp.text()
+            with upstream_span("wsj.rss"):
+                async with self.bot.http_session.get(
+                    _NEWS_RSS_URL, **timeout_kwargs(self.bot, "wsj.rss")
+                ) as resp:
+                    if resp.status != 200:
+                        logger.warning("WSJ RSS returned HTTP %d", resp.status)
+                        return []
+                    text = await resp.text()
         except Exception:
             logger.exception("WSJ RSS fetch failed")
             return []
 
+        return await asyncio.to_thread(self._parse_headlines, text)
+
+    async def _fetch_news_with_summaries(self) -> list[dict]:
+        """Headlines, each with a ``summary`` when the AI recap is on and one could be made."""
+        news = await self._fetch_news()
+        if self.headline_summarizer is not None and news:
+            try:
+                with span("headline_summaries"):
+                    summaries = await self.headline_summarizer.summarize(news)
+            except Exception:
+                # The recap is optional; the headlines still go out without it.
+                logger.exception("Headline summaries failed; posting headlines without a recap")
+                return news
+            for headline, summary in zip(news, summaries):
+                headline["summary"] = summary
+        return news
+
+    async def _prefetch_headline_summaries(self) -> None:
+        news = await self._fetch_news()
+        if not news:
+            return
+        try:
+            queued = await self.headline_summarizer.prefetch(news)
+        except Exception:
+            # The digest still summarizes whatever is missing when it posts.
+            logger.exception("Headline summary prefetch failed")
+            return
+        if queued:
+            logger.info("Queued %d headline summary(ies) on the Batch API", queued)
+
+    @staticmethod
+    def _recap_section(news: list[dict], room: int = _FIELD_LIMIT) -> str | None:
+        """Summary lines that fit in one field and in ``room``, in Discord units; None if none fit."""
+        limit = min(_FIELD_LIMIT, room)
+        lines = []
+        used = 0
+        for headline in news:
+            if not headline.get("summary"):
+                continue
+            line = f"• **{headline['title']}** — {headline['summary']}"
+            line_len = discord_len(line)
+            if used + line_len + 1 > limit:
+                break
+            lines.append(line)
+            used += line_len + 1
+        return "\n".join(lines) or None
+
+    @staticmethod
+    def _parse_headlines(text: str) -> list[dict]:
+        import xml.etree.ElementTree as ET
+
         root = ET.fromstring(text)
         headlines = []
         for item in root.findall(".//item")[:5]:
             title = (item.findtext("title") or "").strip()
             url = (item.findtext("link") or item.findtext("guid") or "").strip()
             if title and url:
-                headlines.append({"title": title[:120], "url": url})
+                snippet = " ".join(_TAG_RE.sub(" ", item.findtext("description") or "").split())
+                guid = (item.findtext("guid") or url).strip()
+                headlines.append({"title": title[:120], "url": url, "guid": guid, "snippet": snippet})
         return headlines
 
     # ------------------------------------------------------------------ econ
@@ -329,8 +455,11 @@ class FinanceCog(commands.Cog):
             "to": to_date.isoformat(),
             "token": self.bot.settings.finnhub_api_key,
         }
-        async with self.bot.http_session.get(_FINNHUB_ECON_URL, params=params) as resp:
-            data = await resp.json()
+        with upstream_span("finnhub.calendar"):
+            async with self.bot.http_session.get(
+                _FINNHUB_ECON_URL, params=params, **timeout_kwargs(self.bot, "finnhub.calendar")
+            ) as resp:
+                data = await resp.json()
 
         events = data.get("economicCalendar", [])
         high_impact = [
@@ -372,9 +501,13 @@ class FinanceCog(commands.Cog):
 
     @app_commands.command(name="finance", description="Show the weekly finance digest")
     async def finance_slash(self, interaction: discord.Interaction) -> None:
-        await interaction.response.defer()
-        embed = await self._build_digest_embed()
-        await interaction.followup.send(embed=embed)
+        with trace_interaction(interaction, fallback="finance"):
+            with span("defer"):
+                await interaction.response.defer()
+            with span("work"):
+                embed = await self._build_digest_embed()
+            with span("followup"):
+                await interaction.followup.send(embed=embed)
 
 
 async def setup(bot) -> None:
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import json
-import random
+import asyncio
 from pathlib import Path
 
 import discord
@@ -9,14 +8,22 @@ from discord import app_commands
 from discord.ext import commands
 
 from services.openai_service import OpenAIService, format_usage_footnote
+from services.quote_store import Quote, QuoteStore
+from utils.metrics import REGISTRY
 from utils.presentation import run_interaction_task
 from utils.sanitize import clean_input
+from utils.visibility import VISIBILITY_CHOICES, is_ephemeral
 
 
-QUOTES_FILE = Path(__file__).resolve().parent.parent / "data" / "quotes.json"
+QUOTES_DB = Path(__file__).resolve().parent.parent / "data" / "quotes.sqlite3"
+# Pre-SQLite store; imported into the configured guild (or the DM namespace) on first start.
+LEGACY_QUOTES_FILE = Path(__file__).resolve().parent.parent / "data" / "quotes.json"
 
 _MAX_QUOTE_TEXT = 500
 _MAX_QUOTE_AUTHOR = 100
+_QUOTE_SEARCH_RESULTS = 10
+
+QUOTE_ACTIONS_TOTAL = REGISTRY.counter("quote_actions_total", "/quote uses by action.", ("action",))
 
 ROAST_TONE_CHOICES = [
     app_commands.Choice(name="savage", value="savage"),
@@ -37,33 +44,12 @@ _ROAST_SYSTEM = (
 )
 
 
-class QuoteStore:
-    def __init__(self, path: Path = QUOTES_FILE) -> None:
-        self.path = path
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-
-    def _load(self) -> list[dict]:
-        if not self.path.exists():
-            return []
-        with self.path.open() as f:
-            return json.load(f)
-
-    def _save(self, quotes: list[dict]) -> None:
-        with self.path.open("w") as f:
-            json.dump(quotes, f, indent=2)
-
-    def add(self, text: str, author: str) -> int:
-        quotes = self._load()
-        quotes.append({"text": text, "author": author})
-        self._save(quotes)
-        return len(quotes)
-
-    def get_random(self) -> dict | None:
-        quotes = self._load()
-        return random.choice(quotes) if quotes else None
-
-    def count(self) -> int:
-        return len(self._load())
+def build_quote_results_embed(query: str | None, author: str | None, quotes: list[Quote]) -> discord.Embed:
+    filters = [f"“{query}”" if query else None, f"by {author}" if author else None]
+    embed = discord.Embed(title=("Quotes " + " ".join(part for part in filters if part))[:256])
+    lines = [f'**#{quote.number}** "{quote.text}" — {quote.author}' for quote in quotes]
+    embed.description = "\n".join(lines)[:4096]
+    return embed
 
 
 def _build_roast_prompt(target_name: str, tone: str) -> str:
@@ -87,7 +73,19 @@ class FunCog(commands.Cog):
     def __init__(self, bot) -> None:
         self.bot = bot
         self.openai_service = OpenAIService(bot.settings)
-        self.quotes = QuoteStore()
+        self.quotes: QuoteStore | None = None
+
+    async def cog_load(self) -> None:
+        self.quotes = await asyncio.to_thread(
+            QuoteStore,
+            QUOTES_DB,
+            legacy_json=LEGACY_QUOTES_FILE,
+            legacy_guild_id=self.bot.settings.quotes_migrate_guild_id,
+        )
+
+    async def cog_unload(self) -> None:
+        if self.quotes is not None:
+            await asyncio.to_thread(self.quotes.close)
 
     async def cog_app_command_error(
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
@@ -99,53 +97,81 @@ class FunCog(commands.Cog):
         else:
             raise error
 
-    @app_commands.command(name="quote", description="Add or retrieve a server quote")
+    quote = app_commands.Group(name="quote", description="Save, pull and search server quotes")
+
+    @quote.command(name="add", description="Save a new server quote")
+    @app_commands.describe(text="The quote text", author="Who said it")
+    async def quote_add(self, interaction: discord.Interaction, text: str, author: str) -> None:
+        QUOTE_ACTIONS_TOTAL.inc(action="add")
+        if len(text) > _MAX_QUOTE_TEXT:
+            await interaction.response.send_message(
+                f"Quote text must be {_MAX_QUOTE_TEXT} characters or fewer.", ephemeral=True
+            )
+            return
+        if len(author) > _MAX_QUOTE_AUTHOR:
+            await interaction.response.send_message(
+                f"Author name must be {_MAX_QUOTE_AUTHOR} characters or fewer.", ephemeral=True
+            )
+            return
+        number = await self.quotes.add(interaction.guild_id or 0, text, author, added_by=interaction.user.id)
+        await interaction.response.send_message(
+            f'Quote #{number} saved: **"{text}"** — {author}', ephemeral=True
+        )
+
+    @quote.command(name="random", description="Pull a random server quote")
+    async def quote_random(self, interaction: discord.Interaction) -> None:
+        QUOTE_ACTIONS_TOTAL.inc(action="random")
+        quote = await self.quotes.get_random(interaction.guild_id or 0)
+        if not quote:
+            await interaction.response.send_message("No quotes saved yet.", ephemeral=True)
+            return
+        embed = discord.Embed(description=f'"{quote.text}"')
+        embed.set_footer(text=f"— {quote.author} · #{quote.number}")
+        await interaction.response.send_message(embed=embed)
+
+    @quote.command(name="search", description="Search server quotes by words and/or author")
     @app_commands.describe(
-        action="add a new quote or pull a random one",
-        text='The quote text (required for "add")',
-        author='Who said it (required for "add")',
+        query="Words to look for; partial words match too",
+        author="Only quotes by this person",
+        visibility="Who can see the results",
     )
-    @app_commands.choices(
-        action=[
-            app_commands.Choice(name="add", value="add"),
-            app_commands.Choice(name="random", value="random"),
-        ]
-    )
-    async def quote_slash(
+    @app_commands.choices(visibility=VISIBILITY_CHOICES)
+    async def quote_search(
         self,
         interaction: discord.Interaction,
-        action: app_commands.Choice[str],
-        text: str | None = None,
+        query: str | None = None,
         author: str | None = None,
+        visibility: app_commands.Choice[str] | None = None,
     ) -> None:
-        if action.value == "add":
-            if not text or not author:
-                await interaction.response.send_message(
-                    'Provide both `text` and `author` to add a quote.', ephemeral=True
-                )
-                return
-            if len(text) > _MAX_QUOTE_TEXT:
-                await interaction.response.send_message(
-                    f"Quote text must be {_MAX_QUOTE_TEXT} characters or fewer.", ephemeral=True
-                )
-                return
-            if len(author) > _MAX_QUOTE_AUTHOR:
-                await interaction.response.send_message(
-                    f"Author name must be {_MAX_QUOTE_AUTHOR} characters or fewer.", ephemeral=True
-                )
-                return
-            count = self.quotes.add(text, author)
-            await interaction.response.send_message(
-                f'Quote #{count} saved: **"{text}"** — {author}', ephemeral=True
-            )
-        else:
-            quote = self.quotes.get_random()
-            if not quote:
-                await interaction.response.send_message("No quotes saved yet.", ephemeral=True)
-                return
-            embed = discord.Embed(description=f'"{quote["text"]}"')
-            embed.set_footer(text=f"— {quote['author']}")
-            await interaction.response.send_message(embed=embed)
+        QUOTE_ACTIONS_TOTAL.inc(action="search")
+        if not query and not author:
+            await interaction.response.send_message("Provide a `query`, an `author`, or both.", ephemeral=True)
+            return
+
+        quotes = await self.quotes.search(
+            interaction.guild_id or 0, query or "", author=author, limit=_QUOTE_SEARCH_RESULTS
+        )
+        if not quotes:
+            await interaction.response.send_message("No matching quotes.", ephemeral=True)
+            return
+        await interaction.response.send_message(
+            embed=build_quote_results_embed(query, author, quotes),
+            ephemeral=is_ephemeral(visibility, default_private=False),
+        )
+
+    @quote_search.autocomplete("query")
+    async def quote_search_query_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        suggestions = await self.quotes.suggest_terms(interaction.guild_id or 0, current)
+        return [app_commands.Choice(name=term[:100], value=term[:100]) for term in suggestions]
+
+    @quote_search.autocomplete("author")
+    async def quote_search_author_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        authors = await self.quotes.suggest_authors(interaction.guild_id or 0, current)
+        return [app_commands.Choice(name=name, value=name) for name in authors]
 
     @app_commands.command(name="roast", description="Have the bot roast someone")
     @app_commands.describe(
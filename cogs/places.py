@@ -4,16 +4,28 @@ from discord.ext import commands
 
 from services.google_places import (
     build_address_embed,
+    build_addresses_embed,
+    build_restaurants_comparison_embed,
     build_restaurants_embed,
     get_restaurant_address,
+    get_restaurant_addresses,
     get_restaurants,
+    get_restaurants_for_cities,
 )
 from utils.presentation import run_interaction_task
+from utils.text import build_choice_list
+from utils.metrics import REGISTRY
+from utils.tracing import span
 from utils.visibility import VISIBILITY_CHOICES, is_ephemeral
 
 _MAX_CITY_LEN = 100
 _MAX_CATEGORY_LEN = 50
 _MAX_RESTAURANT_LEN = 100
+_MAX_BATCH_ITEMS = 5
+
+BATCH_ITEMS = REGISTRY.histogram(
+    "places_batch_items", "Items per batch places command.", ("command",), buckets=(1, 2, 3, 4, 5)
+)
 
 
 class PlacesCog(commands.Cog):
@@ -57,7 +69,8 @@ class PlacesCog(commands.Cog):
                 radius_miles=radius,
                 category=category,
             )
-            return build_restaurants_embed(city, radius, category, restaurants)
+            with span("build_embed"):
+                return build_restaurants_embed(city, radius, category, restaurants)
 
         await run_interaction_task(
             interaction,
@@ -88,7 +101,100 @@ class PlacesCog(commands.Cog):
 
         async def work():
             name, address = await get_restaurant_address(self.bot, restaurant, city)
-            return build_address_embed(name, address)
+            with span("build_embed"):
+                return build_address_embed(name, address)
+
+        await run_interaction_task(
+            interaction,
+            task_name="Address lookup",
+            work=work,
+            ephemeral=ephemeral,
+            max_chunks=self.bot.settings.max_text_chunks,
+        )
+
+    @app_commands.command(name="eats-compare", description="Compare restaurants across several cities")
+    @app_commands.describe(cities=f"Comma-separated list of up to {_MAX_BATCH_ITEMS} cities")
+    @app_commands.checks.cooldown(1, 30.0)
+    @app_commands.choices(visibility=VISIBILITY_CHOICES)
+    async def eats_compare_slash(
+        self,
+        interaction: discord.Interaction,
+        cities: str,
+        radius: app_commands.Range[float, 1, 50] = 3,
+        category: str | None = None,
+        visibility: app_commands.Choice[str] | None = None,
+    ):
+        city_list = build_choice_list(cities)
+        if not city_list:
+            await interaction.response.send_message("Provide at least one city.", ephemeral=True)
+            return
+        if len(city_list) > _MAX_BATCH_ITEMS:
+            await interaction.response.send_message(
+                f"Compare at most {_MAX_BATCH_ITEMS} cities at once.", ephemeral=True
+            )
+            return
+        if any(len(city) > _MAX_CITY_LEN for city in city_list):
+            await interaction.response.send_message("City name is too long.", ephemeral=True)
+            return
+        if category and len(category) > _MAX_CATEGORY_LEN:
+            await interaction.response.send_message("Category is too long.", ephemeral=True)
+            return
+
+        ephemeral = is_ephemeral(visibility, False)
+        BATCH_ITEMS.observe(len(city_list), command="eats-compare")
+
+        async def work():
+            results = await get_restaurants_for_cities(
+                self.bot,
+                cities=city_list,
+                radius_miles=radius,
+                category=category,
+            )
+            with span("build_embed"):
+                return build_restaurants_comparison_embed(results, radius, category)
+
+        await run_interaction_task(
+            interaction,
+            task_name="Restaurant comparison",
+            work=work,
+            ephemeral=ephemeral,
+            max_chunks=self.bot.settings.max_text_chunks,
+        )
+
+    @app_commands.command(name="addy-batch", description="Look up several restaurant addresses at once")
+    @app_commands.describe(restaurants=f"Comma-separated list of up to {_MAX_BATCH_ITEMS} restaurants")
+    @app_commands.checks.cooldown(1, 20.0)
+    @app_commands.choices(visibility=VISIBILITY_CHOICES)
+    async def addy_batch_slash(
+        self,
+        interaction: discord.Interaction,
+        restaurants: str,
+        city: str,
+        visibility: app_commands.Choice[str] | None = None,
+    ):
+        names = build_choice_list(restaurants)
+        if not names:
+            await interaction.response.send_message("Provide at least one restaurant.", ephemeral=True)
+            return
+        if len(names) > _MAX_BATCH_ITEMS:
+            await interaction.response.send_message(
+                f"Look up at most {_MAX_BATCH_ITEMS} restaurants at once.", ephemeral=True
+            )
+            return
+        if any(len(name) > _MAX_RESTAURANT_LEN for name in names):
+            await interaction.response.send_message("Restaurant name is too long.", ephemeral=True)
+            return
+        if len(city) > _MAX_CITY_LEN:
+            await interaction.response.send_message("City name is too long.", ephemeral=True)
+            return
+
+        ephemeral = is_ephemeral(visibility, False)
+        BATCH_ITEMS.observe(len(names), command="addy-batch")
+
+        async def work():
+            results = await get_restaurant_addresses(self.bot, names, city)
+            with span("build_embed"):
+                return build_addresses_embed(city, results)
 
         await run_interaction_task(
             interaction,
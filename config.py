@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from pathlib import Path
 
 from dotenv import load_dotenv
 
-load_dotenv()
+_DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "data" / "cache.sqlite3"
 
 
 @dataclass(slots=True)
@@ -24,6 +25,25 @@ class Settings:
     finance_channel_id: int | None
     finnhub_api_key: str | None
     alpha_vantage_api_key: str | None
+    finance_ai_digest: bool
+    finance_ai_token_budget: int
+    trace_export_path: str | None
+    metrics_host: str
+    metrics_port: int | None
+    loop_lag_warn_ms: int
+    network_profile: str
+    use_uvloop: bool
+    cache_backend: str
+    cache_path: str
+    image_workers: int
+    image_cache_dir: str
+    image_cache_max_mb: int
+    image_transcode_format: str
+    image_transcode_quality: int
+    log_format: str
+    log_repeat_burst: int
+    message_content_intent: bool
+    quotes_migrate_guild_id: int | None
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -31,7 +51,9 @@ class Settings:
         openai_api_key = os.getenv("CHATGPT_API_KEY")
         google_api_key = os.getenv("GOOGLE_GEO_PLACES_API_KEY")
         guild_id_raw = os.getenv("GUILD_ID")
+        quotes_migrate_guild_id_raw = os.getenv("QUOTES_MIGRATE_GUILD_ID")
         finance_channel_id_raw = os.getenv("FINANCE_CHANNEL_ID")
+        metrics_port_raw = os.getenv("METRICS_PORT", "9108")
 
         if not discord_token:
             raise RuntimeError("Missing DISCORD_BOT_API_KEY")
@@ -53,7 +75,29 @@ class Settings:
             finance_channel_id=int(finance_channel_id_raw) if finance_channel_id_raw else None,
             finnhub_api_key=os.getenv("FINNHUB_API_KEY"),
             alpha_vantage_api_key=os.getenv("ALPHA_VANTAGE_API_KEY"),
+            finance_ai_digest=os.getenv("FINANCE_AI_DIGEST", "0").lower() in ("1", "true", "yes"),
+            finance_ai_token_budget=int(os.getenv("FINANCE_AI_TOKEN_BUDGET", "4000")),
+            trace_export_path=os.getenv("TRACE_EXPORT_PATH"),
+            metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            metrics_port=int(metrics_port_raw) if metrics_port_raw and metrics_port_raw != "0" else None,
+            loop_lag_warn_ms=int(os.getenv("LOOP_LAG_WARN_MS", "250")),
+            network_profile=os.getenv("NETWORK_PROFILE", "default"),
+            use_uvloop=os.getenv("USE_UVLOOP", "0").lower() in ("1", "true", "yes"),
+            cache_backend=os.getenv("CACHE_BACKEND", "memory").lower(),
+            cache_path=os.getenv("CACHE_PATH", str(_DEFAULT_CACHE_PATH)),
+            image_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+            image_cache_dir=os.getenv("IMAGE_CACHE_DIR", "data/image_cache"),
+            image_cache_max_mb=int(os.getenv("IMAGE_CACHE_MAX_MB", "512")),
+            image_transcode_format=os.getenv("IMAGE_TRANSCODE_FORMAT", "png").strip().lower(),
+            image_transcode_quality=int(os.getenv("IMAGE_TRANSCODE_QUALITY", "85")),
+            log_format=os.getenv("LOG_FORMAT", "json").strip().lower(),
+            log_repeat_burst=int(os.getenv("LOG_REPEAT_BURST", "5")),
+            message_content_intent=os.getenv("MESSAGE_CONTENT_INTENT", "0").lower() in ("1", "true", "yes"),
+            quotes_migrate_guild_id=int(quotes_migrate_guild_id_raw) if quotes_migrate_guild_id_raw else None,
         )
 
 
-SETTINGS = Settings.from_env()
\ No newline at end of file
+def load_settings() -> Settings:
+    """Read ``.env`` into the environment and build settings from it. Call once at startup."""
+    load_dotenv()
+    return Settings.from_env()
\ No newline at end of file
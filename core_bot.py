@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import importlib
 import logging
+import time
+from pathlib import Path
 
 import aiohttp
 import discord
@@ -8,44 +12,224 @@ from discord import app_commands
 from discord.ext import commands
 
 from config import Settings
+from services.cache import create_cache
+from services.google_translate import TranslationService
+from services.http_service import create_session, get_network_profile
+from utils.command_sync import command_tree_hash, load_command_hashes, save_command_hashes
+from utils.ipc import IPCClient
+from utils.loop_watchdog import LoopWatchdog
+from utils.metrics import REGISTRY, MetricsServer
+from utils.tracing import RECORDER
 
 logger = logging.getLogger("thejamesroll-bot")
 
+_TRACE_EXPORT_INTERVAL_SECONDS = 30
+_CACHE_COUNT_INTERVAL_SECONDS = 30
+# Kept out of startup for a fast login, then imported in a thread once the bot is ready so the
+# first command that needs them does not pay for the import on the event loop.
+_WARM_MODULES = ("openai",)
+EXTENSIONS = ("cogs.general", "cogs.ai", "cogs.places", "cogs.fun", "cogs.finance", "cogs.debug")
+_COMMAND_HASH_PATH = Path(__file__).resolve().parent / "data" / "command_tree_hash.json"
 
-class JamesBot(commands.Bot):
-    def __init__(self, settings: Settings) -> None:
+CACHE_SIZE = REGISTRY.gauge("cache_entries", "Entries in the shared cache backend, all namespaces.")
+TRANSLATE_CACHE_SIZE = REGISTRY.gauge("translate_cache_entries", "Entries in the in-process translation cache.")
+ASYNCIO_TASKS = REGISTRY.gauge("asyncio_tasks", "Tasks alive on the bot's event loop.")
+STARTUP_PHASE_SECONDS = REGISTRY.gauge(
+    "bot_startup_phase_seconds", "Duration of each startup phase on the last start.", ("phase",)
+)
+
+
+class JamesBot(commands.AutoShardedBot):
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        force_sync: bool = False,
+        shard_ids: list[int] | None = None,
+        shard_count: int | None = None,
+        cluster_id: int = 0,
+        ipc_port: int | None = None,
+    ) -> None:
         intents = discord.Intents.default()
-        # intents.message_content = True
-        super().__init__(command_prefix="!", intents=intents)
+        # Privileged: it must also be switched on for the app in the Developer Portal, or login fails.
+        intents.message_content = settings.message_content_intent
+        # With no shard arguments this runs every shard Discord recommends in one process;
+        # cluster.py passes each worker its own slice.
+        super().__init__(command_prefix="!", intents=intents, shard_ids=shard_ids, shard_count=shard_count)
 
         self.settings = settings
         self.http_session: aiohttp.ClientSession | None = None
-        self.geocode_cache: dict[str, tuple[float, float, float]] = {}
+        self.network_profile = get_network_profile(settings.network_profile)
+        self.cache = create_cache(settings)
         self.geocode_ttl_seconds = 60 * 60 * 24
+        self.translator = TranslationService(self)
+        self._trace_export_task: asyncio.Task | None = None
+        self._cache_count_task: asyncio.Task | None = None
+        # Fire-and-forget work; referenced here so it is not garbage-collected mid-flight.
+        self._background_tasks: set[asyncio.Task] = set()
+        self.loop_watchdog: LoopWatchdog | None = None
+        self.metrics_server: MetricsServer | None = None
+        self.force_sync = force_sync
+        self.cluster_id = cluster_id
+        self.ipc = IPCClient(cluster_id, port=ipc_port) if ipc_port else None
+        self._startup_started: float | None = None
+        self._phase_started: float | None = None
+
+        CACHE_SIZE.set_function(self.cache.entry_count)
+        TRANSLATE_CACHE_SIZE.set_function(lambda: len(self.translator._cache))
+        ASYNCIO_TASKS.set_function(lambda: len(asyncio.all_tasks()))
+
+    def _end_phase(self, phase: str) -> None:
+        if self._phase_started is None:
+            return
+        now = time.perf_counter()
+        elapsed = now - self._phase_started
+        self._phase_started = now
+        STARTUP_PHASE_SECONDS.set(elapsed, phase=phase)
+        logger.info("Startup phase %s took %.2fs", phase, elapsed)
+
+    @property
+    def is_primary(self) -> bool:
+        """The one process that owns cluster-wide work: command sync and scheduled posts."""
+        return self.cluster_id == 0
+
+    async def login(self, token: str) -> None:
+        self._startup_started = self._phase_started = time.perf_counter()
+        await super().login(token)
 
     async def setup_hook(self) -> None:
-        timeout = aiohttp.ClientTimeout(total=self.settings.http_timeout_seconds)
-        self.http_session = aiohttp.ClientSession(timeout=timeout)
+        self._end_phase("login")
+
+        self.loop_watchdog = LoopWatchdog(
+            asyncio.get_running_loop(),
+            threshold_seconds=self.settings.loop_lag_warn_ms / 1000,
+        )
+        self.loop_watchdog.start()
+
+        self.http_session = create_session(self.network_profile, self.settings.http_timeout_seconds)
+        logger.info(
+            "HTTP session using %s network profile on %s",
+            self.network_profile.name,
+            type(asyncio.get_running_loop()).__module__,
+        )
 
-        for ext in ("cogs.general", "cogs.ai", "cogs.places", "cogs.fun", "cogs.finance"):
+        if self.settings.trace_export_path:
+            self._trace_export_task = asyncio.create_task(self._export_traces_forever())
+        self._cache_count_task = asyncio.create_task(self._count_cache_forever())
+
+        if self.settings.metrics_port:
+            # Cluster workers each serve their own registry on consecutive ports.
+            port = self.settings.metrics_port + self.cluster_id
+            self.metrics_server = MetricsServer(host=self.settings.metrics_host, port=port)
+            try:
+                await self.metrics_server.start()
+            except OSError:
+                logger.exception("Could not start metrics server on port %d", port)
+                self.metrics_server = None
+
+        if self.ipc is not None:
+            self.ipc.subscribe("cache.fill", self._on_shared_cache_fill)
+            try:
+                await self.ipc.connect()
+            except OSError:
+                logger.exception("Could not connect to the cluster IPC hub on port %d", self.ipc.port)
+        self._end_phase("services")
+
+        for ext in EXTENSIONS:
             await self.load_extension(ext)
             logger.info("Loaded extension %s", ext)
+        self._end_phase("extensions")
 
-        if self.settings.guild_id:
-            guild = discord.Object(id=self.settings.guild_id)
+        if self.is_primary:
+            await self._sync_command_tree()
+        self._end_phase("sync")
+
+    async def _sync_command_tree(self) -> None:
+        guild = discord.Object(id=self.settings.guild_id) if self.settings.guild_id else None
+        if guild is not None:
             self.tree.copy_global_to(guild=guild)
-            await self.tree.sync(guild=guild)
-        else:
-            await self.tree.sync()
+        scope = f"guild:{guild.id}" if guild is not None else "global"
+
+        digest = command_tree_hash(self.tree, guild=guild)
+        hashes = await asyncio.to_thread(load_command_hashes, _COMMAND_HASH_PATH)
+        if not self.force_sync and hashes.get(scope) == digest:
+            logger.info("Command tree unchanged for %s (%s); skipping sync", scope, digest[:12])
+            return
+
+        await self.tree.sync(guild=guild)
+        hashes[scope] = digest
+        await asyncio.to_thread(save_command_hashes, _COMMAND_HASH_PATH, hashes)
+        logger.info("Synced command tree for %s (%s)", scope, digest[:12])
+
+    def _on_shared_cache_fill(self, payload: dict) -> None:
+        ttl = payload["expires_at"] - time.time()
+        if ttl > 0:
+            self._spawn(self.cache.set(payload["namespace"], payload["key"], payload["value"], ttl=ttl))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _warm_imports(self) -> None:
+        for module in _WARM_MODULES:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(importlib.import_module, module)
+            except ImportError:
+                logger.exception("Pre-importing %s failed", module)
+                continue
+            logger.info("Pre-imported %s in %.2fs", module, time.perf_counter() - started)
+
+    async def _count_cache_forever(self) -> None:
+        # Counting can mean a table scan, so the cache_entries gauge reads a periodically refreshed value.
+        while True:
+            try:
+                await self.cache.refresh_entry_count()
+            except Exception:
+                logger.exception("Counting cache entries failed")
+            await asyncio.sleep(_CACHE_COUNT_INTERVAL_SECONDS)
+
+    async def _export_traces_forever(self) -> None:
+        path = self.settings.trace_export_path
+        while True:
+            await asyncio.sleep(_TRACE_EXPORT_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(RECORDER.export, path)
+            except OSError:
+                logger.exception("Trace export to %s failed", path)
 
     async def close(self) -> None:
+        if self.loop_watchdog:
+            self.loop_watchdog.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.ipc:
+            await self.ipc.close()
+        if self._cache_count_task:
+            self._cache_count_task.cancel()
+        if self._trace_export_task:
+            self._trace_export_task.cancel()
+            try:
+                await asyncio.to_thread(RECORDER.export, self.settings.trace_export_path)
+            except Exception:
+                # Losing the last spans must not stop the session and cache from closing.
+                logger.exception("Final trace export to %s failed", self.settings.trace_export_path)
         if self.http_session and not self.http_session.closed:
             await self.http_session.close()
+        await self.cache.close()
         await super().close()
 
     async def on_ready(self) -> None:
         assert self.user is not None
         logger.info("Logged in as %s (%s)", self.user, self.user.id)
+        if self._startup_started is not None:
+            # on_ready fires again after reconnects; only the first one belongs to startup.
+            self._end_phase("ready")
+            logger.info("Startup took %.2fs", time.perf_counter() - self._startup_started)
+            self._startup_started = self._phase_started = None
+            self._spawn(self._warm_imports())
         await self.change_presence(
             status=discord.Status.online,
             activity=discord.Activity(
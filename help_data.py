@@ -8,17 +8,25 @@ HELP_SECTIONS = {
         "/ask — Ask a question.",
         "/rewrite — Rewrite text in a chosen tone.",
         "/explain — Explain text more clearly.",
-        "/img — Generate an image from a prompt.",
+        "/summarize — Summarize recent messages in this channel.",
+        "Summarize From Here — Right-click a message to summarize everything since it.",
+        "/img — Generate an image from a prompt; pick up to 4 variants and a shape.",
     ],
     "Fun": [
-        "/quote — Add or retrieve a server quote.",
+        "/quote add — Save a server quote.",
+        "/quote random — Pull a random server quote.",
+        "/quote search — Find quotes by words (partial words work) or author.",
         "/roast — Have the bot roast someone (pick your tone).",
     ],
     "Food": [
         "/eats — Find nearby restaurants.",
         "/addy — Look up a restaurant address.",
+        "/eats-compare — Compare restaurants across several cities.",
+        "/addy-batch — Look up several restaurant addresses at once.",
     ],
     "Translation": [
         "/translate — Translate text into another language.",
+        "/translate-history — Translate recent messages in this channel.",
+        "Translate Message — Right-click a message to translate it.",
     ],
 }
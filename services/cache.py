@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+_SQLITE_PURGE_EVERY = 500
+
+
+class CacheBackend(ABC):
+    """Namespaced key/value cache with per-entry TTLs.
+
+    Values must be JSON-serializable; backends that leave the process store them as JSON, so
+    tuples come back as lists.
+    """
+
+    #: True when other processes see the same entries, e.g. cluster workers sharing one file.
+    shared = False
+
+    @abstractmethod
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> dict[str, Any]:
+        """Return the live entries among ``keys``; missing and expired keys are left out."""
+
+    @abstractmethod
+    async def set_many(self, namespace: str, items: Mapping[str, Any], *, ttl: float | None = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def entry_count(self) -> int:
+        """Entries stored; must not block, since the metrics endpoint calls it on the loop."""
+
+    async def refresh_entry_count(self) -> None:
+        """Update what ``entry_count`` reports, for backends that cannot count cheaply."""
+
+    async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return (await self.get_many(namespace, [key])).get(key, default)
+
+    async def set(self, namespace: str, key: str, value: Any, *, ttl: float | None = None) -> None:
+        await self.set_many(namespace, {key: value}, ttl=ttl)
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryLRU(CacheBackend):
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, float | None]] = OrderedDict()
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> dict[str, Any]:
+        now = time.time()
+        found = {}
+        for key in keys:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                continue
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[(namespace, key)]
+                continue
+            self._entries.move_to_end((namespace, key))
+            found[key] = value
+        return found
+
+    async def set_many(self, namespace: str, items: Mapping[str, Any], *, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        for key, value in items.items():
+            self._entries[(namespace, key)] = (value, expires_at)
+            self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self._entries.pop((namespace, key), None)
+
+    def entry_count(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """Cache in a SQLite file in WAL mode, so several bot processes can share it.
+
+    Queries run in worker threads; one connection is shared behind a lock. ``entry_count``
+    reports the count from the last ``refresh_entry_count``, since other processes write too.
+    """
+
+    shared = True
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._count = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def _get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM cache WHERE namespace = ? AND key IN ({placeholders})"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, *keys, time.time()),
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def _set_many(self, namespace: str, items: Mapping[str, Any], ttl: float | None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        rows = [(namespace, key, json.dumps(value, separators=(",", ":")), expires_at) for key, value in items.items()]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", rows)
+                self._writes += len(rows)
+                if self._writes >= _SQLITE_PURGE_EVERY:
+                    self._writes = 0
+                    self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> dict[str, Any]:
+        return await asyncio.to_thread(self._get_many, namespace, list(keys))
+
+    async def set_many(self, namespace: str, items: Mapping[str, Any], *, ttl: float | None = None) -> None:
+        if items:
+            await asyncio.to_thread(self._set_many, namespace, dict(items), ttl)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await asyncio.to_thread(self._delete, namespace, key)
+
+    def _count_entries(self) -> None:
+        with self._lock:
+            self._count = self._conn.execute("SELECT count(*) FROM cache").fetchone()[0]
+
+    def entry_count(self) -> int:
+        return self._count
+
+    async def refresh_entry_count(self) -> None:
+        await asyncio.to_thread(self._count_entries)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_cache(settings) -> CacheBackend:
+    if settings.cache_backend == "memory":
+        return MemoryLRU()
+    if settings.cache_backend == "sqlite":
+        return SQLiteCache(settings.cache_path)
+    raise RuntimeError(f"Unknown CACHE_BACKEND {settings.cache_backend!r}; expected 'memory' or 'sqlite'")
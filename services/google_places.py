@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 import time
+from typing import Awaitable, Callable, TypeVar
 from urllib.parse import quote_plus
 
 import discord
 
 from services.http_service import get_json
+from utils.metrics import REGISTRY
 from utils.text import miles_to_meters
 
+T = TypeVar("T")
+
+_BATCH_CONCURRENCY = 4
+_COMPARE_RESULTS_PER_CITY = 5
+_EMBED_FIELD_LIMIT = 1024
+_GEOCODE_NAMESPACE = "geocode"
+
+GEOCODE_LOOKUPS_TOTAL = REGISTRY.counter("geocode_cache_lookups_total", "Geocode lookups by cache result.", ("result",))
+
+
+def _city_key(city: str) -> str:
+    return city.strip().lower()
+
 
 async def geocode_city(bot, city: str) -> tuple[float, float]:
     if not bot.settings.google_api_key:
         raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
 
-    key = city.strip().lower()
-    cached = bot.geocode_cache.get(key)
-    if cached and (time.time() - cached[2]) < bot.geocode_ttl_seconds:
+    key = _city_key(city)
+    cached = await bot.cache.get(_GEOCODE_NAMESPACE, key)
+    if cached is not None:
+        GEOCODE_LOOKUPS_TOTAL.inc(result="hit")
         return cached[0], cached[1]
+    GEOCODE_LOOKUPS_TOTAL.inc(result="miss")
 
     payload = await get_json(
         bot,
@@ -25,6 +43,7 @@ async def geocode_city(bot, city: str) -> tuple[float, float]:
             "address": city,
             "key": bot.settings.google_api_key,
         },
+        upstream="google.geocode",
     )
 
     status = payload.get("status")
@@ -35,7 +54,19 @@ async def geocode_city(bot, city: str) -> tuple[float, float]:
     lat = float(location["lat"])
     lng = float(location["lng"])
 
-    bot.geocode_cache[key] = (lat, lng, time.time())
+    await bot.cache.set(_GEOCODE_NAMESPACE, key, [lat, lng], ttl=bot.geocode_ttl_seconds)
+    ipc = getattr(bot, "ipc", None)
+    if ipc is not None and not bot.cache.shared:
+        # Other cluster workers answer the same city from their own caches.
+        await ipc.publish(
+            "cache.fill",
+            {
+                "namespace": _GEOCODE_NAMESPACE,
+                "key": key,
+                "value": [lat, lng],
+                "expires_at": time.time() + bot.geocode_ttl_seconds,
+            },
+        )
     return lat, lng
 
 
@@ -49,7 +80,16 @@ async def get_restaurants(
         raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
 
     lat, lng = await geocode_city(bot, city)
+    return await _nearby_restaurants(bot, lat, lng, radius_miles, category)
 
+
+async def _nearby_restaurants(
+    bot,
+    lat: float,
+    lng: float,
+    radius_miles: float,
+    category: str | None,
+) -> list[str]:
     params: dict[str, object] = {
         "location": f"{lat},{lng}",
         "radius": miles_to_meters(radius_miles),
@@ -63,9 +103,12 @@ async def get_restaurants(
         bot,
         "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
         params=params,
+        upstream="google.places.nearby",
     )
 
     status = payload.get("status")
+    if status == "ZERO_RESULTS":
+        return ["No restaurants found."]
     if status != "OK":
         raise RuntimeError(f"Places search failed: {status}")
 
@@ -84,7 +127,16 @@ async def get_restaurant_address(bot, name: str, city: str) -> tuple[str, str]:
         raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
 
     lat, lng = await geocode_city(bot, city)
+    return await _text_search_address(bot, name, city, lat, lng)
+
 
+async def _text_search_address(
+    bot,
+    name: str,
+    city: str,
+    lat: float,
+    lng: float,
+) -> tuple[str, str]:
     payload = await get_json(
         bot,
         "https://maps.googleapis.com/maps/api/place/textsearch/json",
@@ -93,6 +145,7 @@ async def get_restaurant_address(bot, name: str, city: str) -> tuple[str, str]:
             "location": f"{lat},{lng}",
             "key": bot.settings.google_api_key,
         },
+        upstream="google.places.textsearch",
     )
 
     status = payload.get("status")
@@ -107,6 +160,86 @@ async def get_restaurant_address(bot, name: str, city: str) -> tuple[str, str]:
     return result["name"], result["formatted_address"]
 
 
+async def _gather_bounded(
+    factories: list[Callable[[], Awaitable[T]]],
+    limit: int = _BATCH_CONCURRENCY,
+) -> list[T | Exception]:
+    """Run the factories concurrently, at most ``limit`` at a time, keeping input order.
+
+    Failures are returned in place of results so one bad item does not sink the batch.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(factory: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await factory()
+
+    return await asyncio.gather(*(run(factory) for factory in factories), return_exceptions=True)
+
+
+async def geocode_cities(bot, cities: list[str]) -> dict[str, tuple[float, float] | Exception]:
+    """Geocode each distinct city once, keyed by the normalized city name."""
+    if not bot.settings.google_api_key:
+        raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
+
+    unique: dict[str, str] = {}
+    for city in cities:
+        unique.setdefault(_city_key(city), city)
+
+    results = await _gather_bounded(
+        [lambda city=city: geocode_city(bot, city) for city in unique.values()]
+    )
+    return dict(zip(unique.keys(), results))
+
+
+async def get_restaurants_for_cities(
+    bot,
+    cities: list[str],
+    radius_miles: float = 3,
+    category: str | None = None,
+) -> list[tuple[str, list[str] | Exception]]:
+    """Search several cities concurrently; each entry holds either its lines or its error.
+
+    Spellings of the same city share one geocode and one nearby search; every spelling still
+    gets its own entry, in the order given.
+    """
+    locations = await geocode_cities(bot, cities)
+
+    async def search(key: str) -> list[str]:
+        location = locations[key]
+        if isinstance(location, Exception):
+            raise location
+        return await _nearby_restaurants(bot, location[0], location[1], radius_miles, category)
+
+    keys = list(locations)
+    results = dict(zip(keys, await _gather_bounded([lambda key=key: search(key) for key in keys])))
+    return [(city, results[_city_key(city)]) for city in cities]
+
+
+async def get_restaurant_addresses(
+    bot,
+    names: list[str],
+    city: str,
+) -> list[tuple[str, tuple[str, str] | Exception]]:
+    """Look up several restaurants in one city, sharing a single geocode."""
+    lat, lng = await geocode_city(bot, city)
+
+    results = await _gather_bounded(
+        [lambda name=name: _text_search_address(bot, name, city, lat, lng) for name in names]
+    )
+    return list(zip(names, results))
+
+
+def _truncate_field(text: str) -> str:
+    if len(text) <= _EMBED_FIELD_LIMIT:
+        return text
+    return text[: _EMBED_FIELD_LIMIT - 1].rstrip() + "…"
+
+
+def _batch_error_text(error: Exception) -> str:
+    return f"⚠️ {error}" if isinstance(error, RuntimeError) else "⚠️ Lookup failed."
+
+
 def build_restaurants_embed(
     city: str,
     radius: float,
@@ -130,4 +263,44 @@ def build_address_embed(name: str, address: str) -> discord.Embed:
     embed = discord.Embed(title=name, description=address)
     maps_url = f"https://www.google.com/maps/search/?api=1&query={quote_plus(address)}"
     embed.add_field(name="Maps", value=maps_url, inline=False)
-    return embed
\ No newline at end of file
+    return embed
+
+
+def build_restaurants_comparison_embed(
+    results: list[tuple[str, list[str] | Exception]],
+    radius: float,
+    category: str | None,
+) -> discord.Embed:
+    embed = discord.Embed(title="Restaurant comparison")
+
+    for city, restaurants in results:
+        if isinstance(restaurants, Exception):
+            value = _batch_error_text(restaurants)
+        else:
+            value = "\n".join(restaurants[:_COMPARE_RESULTS_PER_CITY])
+        embed.add_field(name=city, value=_truncate_field(value), inline=False)
+
+    if category:
+        embed.set_footer(text=f"Category filter: {category} • Radius: {radius} miles")
+    else:
+        embed.set_footer(text=f"Radius: {radius} miles")
+
+    return embed
+
+
+def build_addresses_embed(
+    city: str,
+    results: list[tuple[str, tuple[str, str] | Exception]],
+) -> discord.Embed:
+    embed = discord.Embed(title=f"Restaurant addresses in {city}")
+
+    for query, result in results:
+        if isinstance(result, Exception):
+            embed.add_field(name=query, value=_batch_error_text(result), inline=False)
+            continue
+
+        name, address = result
+        maps_url = f"https://www.google.com/maps/search/?api=1&query={quote_plus(address)}"
+        embed.add_field(name=name, value=_truncate_field(f"{address}\n{maps_url}"), inline=False)
+
+    return embed
@@ -1,48 +1,331 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
 from services.http_service import post_json
+from utils.metrics import REGISTRY
+from utils.text import split_segments
 
+logger = logging.getLogger(__name__)
 
-async def translate_text(
+_TRANSLATE_URL = "https://translation.googleapis.com/language/translate/v2"
+
+# Google Translate v2 accepts up to 128 `q` values per request.
+_MAX_BATCH_ITEMS = 128
+_MAX_BATCH_CHARS = 30_000
+_BATCH_WINDOW_SECONDS = 0.03
+_CACHE_SIZE = 2048
+_SEGMENT_CHARS = 4500
+_SEGMENT_CONCURRENCY = 4
+# When a batch request fails, its texts are retried one per request, this many at a time.
+_FALLBACK_CONCURRENCY = 8
+
+TRANSLATE_REQUESTS_TOTAL = REGISTRY.counter(
+    "translate_requests_total", "Translate calls by cache result.", ("result",)
+)
+TRANSLATE_BATCH_SIZE = REGISTRY.histogram(
+    "translate_batch_size", "Texts sent per Google Translate request.", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+TRANSLATE_BATCH_DELAY_SECONDS = REGISTRY.histogram(
+    "translate_batch_delay_seconds",
+    "Time the first text in a batch waited before the request was sent.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+
+@dataclass(slots=True)
+class TranslationResult:
+    text: str
+    detected_source: str | None = None
+
+
+@dataclass(slots=True)
+class TranslationStats:
+    requests: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    batched_items: int = 0
+    max_batch_size: int = 0
+    total_batch_delay: float = 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.requests if self.requests else 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.batched_items / self.batches if self.batches else 0.0
+
+    @property
+    def avg_batch_delay(self) -> float:
+        return self.total_batch_delay / self.batches if self.batches else 0.0
+
+
+@dataclass(slots=True)
+class _PendingBatch:
+    source: str | None
+    target: str
+    created_at: float = field(default_factory=time.perf_counter)
+    futures: dict[str, asyncio.Future] = field(default_factory=dict)
+    chars: int = 0
+    flush_handle: asyncio.TimerHandle | None = None
+
+
+def _normalize_language(language: str | None) -> str | None:
+    if not language:
+        return None
+    return language.strip().lower() or None
+
+
+def _cache_key(text: str, source: str | None, target: str) -> tuple[str, str, str]:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return digest, source or "", target
+
+
+class TranslationService:
+    """Batches concurrent translate calls per language pair and caches the results."""
+
+    def __init__(
+        self,
+        bot,
+        *,
+        batch_window_seconds: float = _BATCH_WINDOW_SECONDS,
+        cache_size: int = _CACHE_SIZE,
+    ) -> None:
+        self.bot = bot
+        self.batch_window_seconds = batch_window_seconds
+        self.cache_size = cache_size
+        self.stats = TranslationStats()
+        self._cache: OrderedDict[tuple[str, str, str], TranslationResult] = OrderedDict()
+        self._pending: dict[tuple[str | None, str], _PendingBatch] = {}
+        # Referenced until done so a batch in flight is not garbage-collected.
+        self._tasks: set[asyncio.Task] = set()
+
+    async def translate(
+        self,
+        text: str,
+        target_language: str,
+        source_language: str | None = None,
+    ) -> TranslationResult:
+        if not self.bot.settings.google_api_key:
+            raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
+
+        target = _normalize_language(target_language)
+        if not target:
+            raise RuntimeError("Target language is required")
+        source = _normalize_language(source_language)
+
+        self.stats.requests += 1
+        cached = self._cache_get(_cache_key(text, source, target))
+        if cached is not None:
+            self.stats.cache_hits += 1
+            TRANSLATE_REQUESTS_TOTAL.inc(result="hit")
+            return cached
+        TRANSLATE_REQUESTS_TOTAL.inc(result="miss")
+
+        future = self._enqueue(text, source, target)
+        # Several waiters can share one future; shield it so one cancellation does not cancel the rest.
+        return await asyncio.shield(future)
+
+    async def translate_many(
+        self,
+        texts: list[str],
+        target_language: str,
+        source_language: str | None = None,
+    ) -> list[TranslationResult]:
+        return list(
+            await asyncio.gather(
+                *(self.translate(text, target_language, source_language) for text in texts)
+            )
+        )
+
+    def _cache_get(self, key: tuple[str, str, str]) -> TranslationResult | None:
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: tuple[str, str, str], result: TranslationResult) -> None:
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _enqueue(self, text: str, source: str | None, target: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        batch_key = (source, target)
+        batch = self._pending.get(batch_key)
+
+        if batch is not None and text in batch.futures:
+            return batch.futures[text]
+
+        if batch is not None and batch.chars + len(text) > _MAX_BATCH_CHARS:
+            self._flush(batch_key)
+            batch = None
+
+        if batch is None:
+            batch = _PendingBatch(source=source, target=target)
+            batch.flush_handle = loop.call_later(self.batch_window_seconds, self._flush, batch_key)
+            self._pending[batch_key] = batch
+
+        future = loop.create_future()
+        batch.futures[text] = future
+        batch.chars += len(text)
+
+        if len(batch.futures) >= _MAX_BATCH_ITEMS:
+            self._flush(batch_key)
+
+        return future
+
+    def _flush(self, batch_key: tuple[str | None, str]) -> None:
+        batch = self._pending.pop(batch_key, None)
+        if batch is None:
+            return
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: _PendingBatch) -> None:
+        texts = list(batch.futures)
+        delay = time.perf_counter() - batch.created_at
+        self.stats.batches += 1
+        self.stats.batched_items += len(texts)
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(texts))
+        self.stats.total_batch_delay += delay
+        TRANSLATE_BATCH_SIZE.observe(len(texts))
+        TRANSLATE_BATCH_DELAY_SECONDS.observe(delay)
+        logger.debug(
+            "Translate batch: %d item(s) -> %s after %.1f ms",
+            len(texts),
+            batch.target,
+            delay * 1000,
+        )
+
+        try:
+            try:
+                outcomes = await self._request(texts, batch.source, batch.target)
+            except Exception as exc:
+                if len(texts) == 1:
+                    outcomes = [exc]
+                else:
+                    # One bad text fails the whole request; retry each on its own so only it fails.
+                    logger.warning("Translate batch of %d failed (%s); retrying one by one", len(texts), exc)
+                    outcomes = await self._request_each(texts, batch.source, batch.target)
+
+            for text, outcome in zip(texts, outcomes):
+                future = batch.futures[text]
+                if isinstance(outcome, BaseException):
+                    if not future.done():
+                        future.set_exception(outcome)
+                    continue
+                self._cache_put(_cache_key(text, batch.source, batch.target), outcome)
+                if not future.done():
+                    future.set_result(outcome)
+        finally:
+            # Cancelled (e.g. at shutdown) or failed unexpectedly: never leave a waiter hanging.
+            for future in batch.futures.values():
+                if not future.done():
+                    future.cancel()
+
+    async def _request_each(
+        self,
+        texts: list[str],
+        source: str | None,
+        target: str,
+    ) -> list[TranslationResult | BaseException]:
+        semaphore = asyncio.Semaphore(_FALLBACK_CONCURRENCY)
+
+        async def one(text: str) -> TranslationResult:
+            async with semaphore:
+                (result,) = await self._request([text], source, target)
+            return result
+
+        return list(await asyncio.gather(*(one(text) for text in texts), return_exceptions=True))
+
+    async def _request(
+        self,
+        texts: list[str],
+        source: str | None,
+        target: str,
+    ) -> list[TranslationResult]:
+        data: list[tuple[str, str]] = [("q", text) for text in texts]
+        data += [
+            ("target", target),
+            ("key", self.bot.settings.google_api_key),
+            ("format", "text"),
+        ]
+        if source:
+            data.append(("source", source))
+
+        payload = await post_json(self.bot, _TRANSLATE_URL, data=data, upstream="google.translate")
+
+        data_block = payload.get("data", {})
+        translations = data_block.get("translations", [])
+        if len(translations) != len(texts):
+            raise RuntimeError("Translation returned no result")
+
+        results = []
+        for item in translations:
+            translated = item.get("translatedText")
+            if not translated:
+                raise RuntimeError("Translation returned empty text")
+            results.append(TranslationResult(translated, item.get("detectedSourceLanguage")))
+        return results
+
+
+async def translate_long_text(
     bot,
     text: str,
     target_language: str,
     source_language: str | None = None,
-) -> str:
-    if not bot.settings.google_api_key:
-        raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
+) -> TranslationResult:
+    """Translate text of any length by translating sentence-aligned segments concurrently.
 
-    target_language = target_language.strip().lower()
-    if source_language:
-        source_language = source_language.strip().lower()
+    Whitespace around each segment is kept out of the request and restored afterwards,
+    so paragraph and line breaks survive the round trip.
+    """
+    segments = split_segments(text, _SEGMENT_CHARS)
+    semaphore = asyncio.Semaphore(_SEGMENT_CONCURRENCY)
 
-    data: dict[str, str] = {
-        "q": text,
-        "target": target_language,
-        "key": bot.settings.google_api_key,
-        "format": "text",
-    }
+    async def translate_segment(segment: str) -> tuple[str, str | None]:
+        core = segment.strip()
+        if not core:
+            return segment, None
 
-    if source_language:
-        data["source"] = source_language
+        leading = segment[: len(segment) - len(segment.lstrip())]
+        trailing = segment[len(segment.rstrip()):]
+        async with semaphore:
+            result = await bot.translator.translate(core, target_language, source_language)
+        return f"{leading}{result.text}{trailing}", result.detected_source
 
-    payload = await post_json(
-        bot,
-        "https://translation.googleapis.com/language/translate/v2",
-        data=data,
-    )
+    translated = await asyncio.gather(*(translate_segment(segment) for segment in segments))
+    detected = next((source for _, source in translated if source), None)
+    return TranslationResult("".join(text for text, _ in translated), detected)
+
+
+async def translate_text(
+    bot,
+    text: str,
+    target_language: str,
+    source_language: str | None = None,
+) -> str:
+    if not bot.settings.google_api_key:
+        raise RuntimeError("GOOGLE_GEO_PLACES_API_KEY is not configured")
 
-    data_block = payload.get("data", {})
-    translations = data_block.get("translations", [])
-    if not translations:
-        raise RuntimeError("Translation returned no result")
+    if not text.strip():
+        raise RuntimeError("Nothing to translate")
 
-    translated = translations[0].get("translatedText")
-    if not translated:
-        raise RuntimeError("Translation returned empty text")
+    target_language = target_language.strip().lower()
+    result = await translate_long_text(bot, text.strip(), target_language, source_language)
 
-    detected = translations[0].get("detectedSourceLanguage")
-    if detected:
-        return f"Detected source: `{detected}`\nTarget: `{target_language}`\n\n{translated}"
+    if result.detected_source:
+        return f"Detected source: `{result.detected_source}`\nTarget: `{target_language}`\n\n{result.text}"
 
-    return f"Target: `{target_language}`\n\n{translated}"
\ No newline at end of file
+    return f"Target: `{target_language}`\n\n{result.text}"
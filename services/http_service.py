@@ -1,27 +1,130 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from typing import Any
+from urllib.parse import urlsplit
 
+import aiohttp
 
-async def get_json(bot, url: str, *, params: dict[str, Any] | None = None) -> dict[str, Any]:
+from utils.tracing import upstream_span
+
+
+@dataclass(frozen=True, slots=True)
+class NetworkProfile:
+    """Connection pool and timeout tuning for the shared ``aiohttp`` session."""
+
+    name: str
+    limit: int = 100
+    limit_per_host: int = 0
+    dns_cache_ttl: int | None = 10
+    keepalive_timeout: float = 15.0
+    connect_timeout: float | None = None
+    sock_read_timeout: float | None = None
+    # Connect and sock-read overrides keyed by dotted upstream name; ``google`` also covers
+    # ``google.translate``. The total always comes from HTTP_TIMEOUT_SECONDS.
+    upstream_timeouts: dict[str, aiohttp.ClientTimeout] = field(default_factory=dict)
+
+    def session_timeout(self, total: float | None) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=total, connect=self.connect_timeout, sock_read=self.sock_read_timeout)
+
+    def timeout_for(self, upstream: str, total: float | None) -> aiohttp.ClientTimeout | None:
+        name = upstream
+        while name:
+            override = self.upstream_timeouts.get(name)
+            if override is not None:
+                sock_read = override.sock_read
+                if sock_read is not None and total is not None:
+                    sock_read = min(sock_read, total)
+                return aiohttp.ClientTimeout(total=total, connect=override.connect, sock_read=sock_read)
+            name = name.rpartition(".")[0]
+        return None
+
+    def connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=self.dns_cache_ttl is not None,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+
+NETWORK_PROFILES = {
+    # aiohttp's own defaults: what the bot ran with before profiles existed.
+    "default": NetworkProfile("default"),
+    "tuned": NetworkProfile(
+        "tuned",
+        limit=100,
+        limit_per_host=16,
+        dns_cache_ttl=300,
+        keepalive_timeout=60.0,
+        connect_timeout=5.0,
+        sock_read_timeout=20.0,
+        upstream_timeouts={
+            "google": aiohttp.ClientTimeout(connect=5, sock_read=10),
+            "finnhub": aiohttp.ClientTimeout(connect=5, sock_read=10),
+            "coingecko": aiohttp.ClientTimeout(connect=5, sock_read=10),
+            # Alpha Vantage's weekly series is large and slow to start streaming.
+            "alphavantage": aiohttp.ClientTimeout(connect=5, sock_read=25),
+            "wsj": aiohttp.ClientTimeout(connect=5, sock_read=10),
+        },
+    ),
+}
+
+
+def get_network_profile(name: str) -> NetworkProfile:
+    try:
+        return NETWORK_PROFILES[name]
+    except KeyError:
+        raise RuntimeError(
+            f"Unknown NETWORK_PROFILE {name!r}; expected one of {', '.join(NETWORK_PROFILES)}"
+        ) from None
+
+
+def create_session(profile: NetworkProfile, total_timeout: float | None) -> aiohttp.ClientSession:
+    """Build a session for ``profile``. Must be called with the event loop running."""
+    return aiohttp.ClientSession(connector=profile.connector(), timeout=profile.session_timeout(total_timeout))
+
+
+def timeout_kwargs(bot, upstream: str) -> dict[str, aiohttp.ClientTimeout]:
+    """Request kwargs overriding the session timeout for ``upstream``, if its profile has one."""
+    profile = getattr(bot, "network_profile", None)
+    if profile is None:
+        return {}
+    timeout = profile.timeout_for(upstream, bot.settings.http_timeout_seconds)
+    return {"timeout": timeout} if timeout is not None else {}
+
+
+async def get_json(
+    bot,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    upstream: str | None = None,
+) -> dict[str, Any]:
     if not bot.http_session:
         raise RuntimeError("HTTP session is not initialized")
 
-    async with bot.http_session.get(url, params=params) as response:
-        response.raise_for_status()
-        return await response.json()
+    name = upstream or urlsplit(url).hostname or "http"
+    with upstream_span(name):
+        async with bot.http_session.get(url, params=params, **timeout_kwargs(bot, name)) as response:
+            response.raise_for_status()
+            return await response.json()
 
 
 async def post_json(
     bot,
     url: str,
     *,
-    data: dict[str, Any] | None = None,
+    data: dict[str, Any] | list[tuple[str, Any]] | None = None,
     json: dict[str, Any] | None = None,
+    upstream: str | None = None,
 ) -> dict[str, Any]:
     if not bot.http_session:
         raise RuntimeError("HTTP session is not initialized")
 
-    async with bot.http_session.post(url, data=data, json=json) as response:
-        response.raise_for_status()
-        return await response.json()
\ No newline at end of file
+    name = upstream or urlsplit(url).hostname or "http"
+    with upstream_span(name):
+        async with bot.http_session.post(url, data=data, json=json, **timeout_kwargs(bot, name)) as response:
+            response.raise_for_status()
+            return await response.json()
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""Optional re-encoding of generated images into smaller formats before upload.
+
+Encoding a 1024x1024 image takes long enough to stall the event loop, so it runs in a small
+process pool. Pillow is an optional dependency; without it images are uploaded as PNG.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import time
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from utils.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger("thejamesroll-bot")
+
+IMAGE_TRANSCODE_SECONDS = REGISTRY.histogram(
+    "image_transcode_seconds", "Time spent re-encoding a generated image, including the process hop."
+)
+
+# setting value -> (Pillow format, MIME type, file extension)
+_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+_DISABLED = ("", "none", "png")
+
+_EXTENSIONS = {"image/png": "png", **{mime: ext for _, mime, ext in _FORMATS.values()}}
+
+
+def file_extension(mime_type: str) -> str:
+    return _EXTENSIONS.get(mime_type, "png")
+
+
+def _encode(data: bytes, image_format: str, quality: int) -> bytes:
+    """Runs in a pool process."""
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as image:
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        out = BytesIO()
+        image.save(out, format=image_format, quality=quality)
+    # getvalue() hands back the buffer itself rather than a copy when nothing else holds it.
+    return out.getvalue()
+
+
+class ImageTranscoder:
+    def __init__(self, target: str, quality: int, *, workers: int = 1) -> None:
+        self.image_format, self.mime_type, _ = _FORMATS[target]
+        self.quality = quality
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn, not fork: forking a process that runs an event loop and threads is unsafe.
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def transcode(self, data: bytes, mime_type: str) -> tuple[bytes, str]:
+        """Re-encode ``data``; the original comes back if encoding fails or does not save space."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            encoded = await loop.run_in_executor(self._executor(), _encode, data, self.image_format, self.quality)
+        except Exception:
+            logger.exception("Image transcoding to %s failed; uploading the original", self.image_format)
+            return data, mime_type
+        finally:
+            IMAGE_TRANSCODE_SECONDS.observe(time.perf_counter() - started)
+        if len(encoded) >= len(data):
+            return data, mime_type
+        return encoded, self.mime_type
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def create_transcoder(settings) -> ImageTranscoder | None:
+    target = settings.image_transcode_format
+    if target in _DISABLED:
+        return None
+    if target not in _FORMATS:
+        raise RuntimeError(f"Unknown IMAGE_TRANSCODE_FORMAT {target!r}; expected 'webp', 'jpeg' or 'png'")
+    if importlib.util.find_spec("PIL") is None:
+        logger.warning("IMAGE_TRANSCODE_FORMAT=%s needs Pillow, which is not installed; uploading PNG", target)
+        return None
+    return ImageTranscoder(target, settings.image_transcode_quality)
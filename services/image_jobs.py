@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from services.openai_service import DEFAULT_IMAGE_SIZE
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("thejamesroll-bot")
+
+IMAGE_CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "image_cache_lookups_total", "Generated-image cache lookups by result.", ("result",)
+)
+IMAGE_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "image_queue_wait_seconds", "Time /img jobs waited for a generation worker."
+)
+IMAGE_QUEUE_DEPTH = REGISTRY.gauge("image_queue_depth", "Image jobs waiting for a worker.")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+ImageResult = dict[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class ImageRequest:
+    prompt: str
+    model: str
+    n: int = 1
+    size: str = DEFAULT_IMAGE_SIZE
+    #: False for regenerations: skip the cache both ways so the user gets a fresh image.
+    cache: bool = True
+
+
+Generate = Callable[[ImageRequest], Awaitable[list[ImageResult]]]
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _WHITESPACE_RE.sub(" ", prompt).strip().casefold()
+
+
+def image_cache_key(model: str, prompt: str, *, size: str = DEFAULT_IMAGE_SIZE, variant: int = 0) -> str:
+    raw = f"{model}\0{size}\0{variant}\0{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ImageDiskCache:
+    """Generated PNGs on disk, addressed by ``sha256(model, normalized prompt)``.
+
+    Files live at ``<root>/<key[:2]>/<key>.png``. Total size is capped at ``max_bytes``;
+    the least recently read or written files are evicted first. Blocking file work runs in
+    worker threads.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        # key -> (size, last used); rebuilt from the directory on first use.
+        self._index: dict[str, tuple[int, float]] | None = None
+        self._total = 0
+        self._lock = asyncio.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.png"
+
+    def _scan(self) -> dict[str, tuple[int, float]]:
+        index = {}
+        if self.root.exists():
+            for path in self.root.glob("*/*.png"):
+                stat = path.stat()
+                index[path.stem] = (stat.st_size, stat.st_mtime)
+        return index
+
+    async def _ensure_index(self) -> dict[str, tuple[int, float]]:
+        if self._index is None:
+            self._index = await asyncio.to_thread(self._scan)
+            self._total = sum(size for size, _ in self._index.values())
+        return self._index
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def _read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    def _remove(self, keys: list[str]) -> None:
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key: str) -> bytes | None:
+        async with self._lock:
+            index = await self._ensure_index()
+            if key not in index:
+                return None
+            data = await asyncio.to_thread(self._read, key)
+            if data is None:
+                self._total -= index.pop(key)[0]
+                return None
+            index[key] = (len(data), time.time())
+            return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        async with self._lock:
+            index = await self._ensure_index()
+            await asyncio.to_thread(self._write, key, data)
+            previous = index.get(key)
+            if previous is not None:
+                self._total -= previous[0]
+            index[key] = (len(data), time.time())
+            self._total += len(data)
+
+            evicted = []
+            for old_key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+                if self._total <= self.max_bytes:
+                    break
+                evicted.append(old_key)
+                self._total -= size
+                del index[old_key]
+            if evicted:
+                await asyncio.to_thread(self._remove, evicted)
+
+
+@dataclass(slots=True, eq=False)
+class ImageJob:
+    guild_id: int
+    request: ImageRequest
+    future: asyncio.Future = field(repr=False)
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class ImageJobQueue:
+    """Bounded pool of image workers with round-robin fair share between guilds.
+
+    Each guild has its own FIFO; workers take the head job of the next guild in rotation, so
+    one busy server cannot starve the others.
+    """
+
+    def __init__(self, generate: Generate, *, workers: int = 2) -> None:
+        self._generate = generate
+        self.worker_count = workers
+        self._queues: dict[int, deque[ImageJob]] = {}
+        self._rotation: deque[int] = deque()
+        self._available = asyncio.Condition()
+        self._workers: list[asyncio.Task] = []
+        IMAGE_QUEUE_DEPTH.set_function(lambda: self.pending)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        for number in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._work(), name=f"image-worker-{number}"))
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+        self._rotation.clear()
+
+    async def submit(self, guild_id: int, request: ImageRequest) -> ImageJob:
+        job = ImageJob(guild_id, request, asyncio.get_running_loop().create_future())
+        async with self._available:
+            queue = self._queues.setdefault(guild_id, deque())
+            if not queue:
+                self._rotation.append(guild_id)
+            queue.append(job)
+            self._available.notify()
+        return job
+
+    def position(self, job: ImageJob) -> int:
+        """1-based place in line under round-robin dispatch, or 0 once a worker has it."""
+        queue = self._queues.get(job.guild_id)
+        if not queue or job not in queue:
+            return 0
+        ahead_in_guild = queue.index(job)
+        guild_turn = self._rotation.index(job.guild_id)
+        ahead = ahead_in_guild
+        for turn, guild_id in enumerate(self._rotation):
+            if guild_id != job.guild_id:
+                # Guilds earlier in the rotation get one more turn before ours comes round.
+                ahead += min(len(self._queues[guild_id]), ahead_in_guild + (turn < guild_turn))
+        return ahead + 1
+
+    async def _next_job(self) -> ImageJob:
+        async with self._available:
+            await self._available.wait_for(lambda: bool(self._rotation))
+            guild_id = self._rotation.popleft()
+            queue = self._queues[guild_id]
+            job = queue.popleft()
+            if queue:
+                self._rotation.append(guild_id)
+            else:
+                del self._queues[guild_id]
+            return job
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._next_job()
+            if job.future.done():
+                continue
+            IMAGE_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - job.queued_at)
+            try:
+                result = await self._generate(job.request)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as exc:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+
+
+class ImageService:
+    """Serves ``/img`` requests from the disk cache, or through the job queue on a miss."""
+
+    def __init__(self, generate: Generate, cache: ImageDiskCache, *, workers: int) -> None:
+        self.cache = cache
+        self.queue = ImageJobQueue(self._generate_and_store, workers=workers)
+        self._generate = generate
+
+    def start(self) -> None:
+        self.queue.start()
+
+    async def stop(self) -> None:
+        await self.queue.stop()
+
+    async def _generate_and_store(self, request: ImageRequest) -> list[ImageResult]:
+        results = await self._generate(request)
+        if request.cache:
+            for variant, result in enumerate(results):
+                if result["kind"] != "bytes":
+                    continue
+                key = image_cache_key(request.model, request.prompt, size=request.size, variant=variant)
+                try:
+                    await self.cache.put(key, result["value"])
+                except OSError:
+                    logger.exception("Could not write generated image to the cache")
+        return results
+
+    async def cached(self, request: ImageRequest) -> list[ImageResult] | None:
+        """All ``request.n`` variants from the cache, or None if any of them is missing."""
+        results = []
+        for variant in range(request.n):
+            key = image_cache_key(request.model, request.prompt, size=request.size, variant=variant)
+            data = await self.cache.get(key)
+            if data is None:
+                IMAGE_CACHE_LOOKUPS_TOTAL.inc(result="miss")
+                return None
+            results.append({"kind": "bytes", "value": data, "mime_type": "image/png"})
+        IMAGE_CACHE_LOOKUPS_TOTAL.inc(result="hit")
+        return results
+
+    async def submit(self, guild_id: int, request: ImageRequest) -> ImageJob:
+        return await self.queue.submit(guild_id, request)
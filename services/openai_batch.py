@@ -0,0 +1,256 @@
+"""Chat completions through the OpenAI Batch API, for work that can wait.
+
+Batch requests draw on their own rate-limit pool (and cost half as much), so bulk jobs sent
+here never eat into the per-minute limits that interactive commands like ``/ask`` rely on.
+Jobs are collected for a short window, uploaded as one JSONL file, and the batch is polled
+until it finishes; each job's result goes to its future and optional callback.
+
+Batches live only as long as the process: jobs still running at shutdown are cancelled here,
+and OpenAI finishes (and bills) them without anyone reading the results.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_CHAT_ENDPOINT = "/v1/chat/completions"
+_COMPLETION_WINDOW = "24h"
+_FLUSH_SECONDS = 30.0
+_POLL_SECONDS = 60.0
+# The API allows 50,000 requests per batch; far more than the bot ever queues at once.
+_MAX_BATCH_JOBS = 5000
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+# A batch can run for a day; one dropped poll must not abandon it. Failed polls back off
+# exponentially from the poll interval up to this cap, and only this many in a row give up.
+_MAX_POLL_FAILURES = 8
+_MAX_POLL_BACKOFF_SECONDS = 30 * 60
+
+BATCH_JOBS_TOTAL = REGISTRY.counter("openai_batch_jobs_total", "Batch API jobs by outcome.", ("outcome",))
+BATCHES_TOTAL = REGISTRY.counter("openai_batches_total", "Batch API batches by final status.", ("status",))
+BATCH_POLL_ERRORS_TOTAL = REGISTRY.counter(
+    "openai_batch_poll_errors_total", "Batch API status or result reads that failed."
+)
+BATCH_TURNAROUND_SECONDS = REGISTRY.histogram(
+    "openai_batch_turnaround_seconds",
+    "Time from submitting a batch to reading its results.",
+    buckets=(30, 60, 120, 300, 600, 1800, 3600, 4 * 3600, 24 * 3600),
+)
+
+
+@dataclass(slots=True)
+class BatchResult:
+    custom_id: str
+    text: str | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+BatchCallback = Callable[[BatchResult], Awaitable[None] | None]
+
+
+@dataclass(slots=True)
+class _BatchJob:
+    custom_id: str
+    body: dict[str, Any]
+    future: asyncio.Future
+    callbacks: list[BatchCallback] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _PendingBatch:
+    jobs: dict[str, _BatchJob] = field(default_factory=dict)
+    flush_handle: asyncio.TimerHandle | None = None
+
+
+def build_batch_file(jobs: list[_BatchJob]) -> bytes:
+    lines = (
+        json.dumps({"custom_id": job.custom_id, "method": "POST", "url": _CHAT_ENDPOINT, "body": job.body})
+        for job in jobs
+    )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def parse_batch_output(text: str) -> dict[str, BatchResult]:
+    """Results by ``custom_id`` from a batch output or error file."""
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record["custom_id"]
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or body.get("error") or {}
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            results[custom_id] = BatchResult(custom_id, error=message or f"HTTP {response.get('status_code')}")
+            continue
+        usage = body.get("usage") or {}
+        results[custom_id] = BatchResult(
+            custom_id,
+            text=body["choices"][0]["message"].get("content") or "",
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+    return results
+
+
+class ChatBatcher:
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        *,
+        flush_seconds: float = _FLUSH_SECONDS,
+        poll_seconds: float = _POLL_SECONDS,
+        max_jobs: int = _MAX_BATCH_JOBS,
+        on_usage: Callable[[int, int], None] | None = None,
+    ) -> None:
+        self._client_factory = client_factory
+        self.flush_seconds = flush_seconds
+        self.poll_seconds = poll_seconds
+        self.max_jobs = max_jobs
+        self._on_usage = on_usage
+        self._pending: _PendingBatch | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending.jobs) if self._pending is not None else 0
+
+    def submit(
+        self,
+        body: dict[str, Any],
+        *,
+        custom_id: str | None = None,
+        callback: BatchCallback | None = None,
+    ) -> asyncio.Future:
+        """Queue one chat completion request body; the future resolves to its ``BatchResult``.
+
+        Jobs queued under the same ``custom_id`` while it is still waiting to be sent share one
+        request; queuing a different body under an id that is already waiting is a ValueError.
+        """
+        loop = asyncio.get_running_loop()
+        if self._pending is None:
+            self._pending = _PendingBatch(flush_handle=loop.call_later(self.flush_seconds, self.flush))
+        custom_id = custom_id or f"job-{next(self._ids)}-{int(time.time())}"
+
+        job = self._pending.jobs.get(custom_id)
+        if job is not None and job.body != body:
+            raise ValueError(f"Batch job {custom_id!r} is already queued with a different request")
+        if job is None:
+            job = _BatchJob(custom_id, body, loop.create_future())
+            self._pending.jobs[custom_id] = job
+        if callback is not None:
+            job.callbacks.append(callback)
+
+        if len(self._pending.jobs) >= self.max_jobs:
+            self.flush()
+        return job.future
+
+    def flush(self) -> None:
+        """Send whatever is queued now instead of waiting for the window to close."""
+        batch, self._pending = self._pending, None
+        if batch is None:
+            return
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        task = asyncio.get_running_loop().create_task(self._run(list(batch.jobs.values())))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        if self._pending is not None:
+            if self._pending.flush_handle is not None:
+                self._pending.flush_handle.cancel()
+            for job in self._pending.jobs.values():
+                job.future.cancel()
+            self._pending = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, jobs: list[_BatchJob]) -> None:
+        try:
+            results = await self._execute(jobs)
+        except asyncio.CancelledError:
+            for job in jobs:
+                job.future.cancel()
+            raise
+        except Exception as exc:
+            logger.exception("OpenAI batch of %d job(s) failed", len(jobs))
+            results = {job.custom_id: BatchResult(job.custom_id, error=str(exc) or type(exc).__name__) for job in jobs}
+
+        for job in jobs:
+            result = results.get(job.custom_id) or BatchResult(job.custom_id, error="missing from batch output")
+            await self._deliver(job, result)
+
+    async def _execute(self, jobs: list[_BatchJob]) -> dict[str, BatchResult]:
+        client = self._client_factory()
+        upload = await client.files.create(file=("batch.jsonl", build_batch_file(jobs)), purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=upload.id, endpoint=_CHAT_ENDPOINT, completion_window=_COMPLETION_WINDOW
+        )
+        submitted = time.monotonic()
+        logger.info("Submitted OpenAI batch %s with %d job(s)", batch.id, len(jobs))
+
+        while batch.status not in _TERMINAL_STATUSES:
+            await asyncio.sleep(self.poll_seconds)
+            batch = await self._retrying(f"poll of batch {batch.id}", lambda: client.batches.retrieve(batch.id))
+        BATCHES_TOTAL.inc(status=batch.status)
+        BATCH_TURNAROUND_SECONDS.observe(time.monotonic() - submitted)
+        logger.info("OpenAI batch %s finished as %s", batch.id, batch.status)
+
+        # Expired and cancelled batches still return whatever finished before they stopped.
+        results: dict[str, BatchResult] = {}
+        for file_id in (getattr(batch, "output_file_id", None), getattr(batch, "error_file_id", None)):
+            if file_id:
+                content = await self._retrying(f"download of {file_id}", lambda: client.files.content(file_id))
+                results.update(parse_batch_output(content.text))
+        if not results and batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} {batch.status}")
+        return results
+
+    async def _retrying(self, what: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """``await call()``, retrying transient failures with backoff before giving up."""
+        for failures in itertools.count(1):
+            try:
+                return await call()
+            except Exception:
+                BATCH_POLL_ERRORS_TOTAL.inc()
+                if failures >= _MAX_POLL_FAILURES:
+                    raise
+                delay = min(self.poll_seconds * 2**failures, _MAX_POLL_BACKOFF_SECONDS)
+                logger.warning(
+                    "OpenAI batch %s failed (%d in a row); retrying in %.0fs", what, failures, delay, exc_info=True
+                )
+                await asyncio.sleep(delay)
+
+    async def _deliver(self, job: _BatchJob, result: BatchResult) -> None:
+        BATCH_JOBS_TOTAL.inc(outcome="ok" if result.ok else "error")
+        if result.ok and self._on_usage is not None:
+            self._on_usage(result.prompt_tokens, result.completion_tokens)
+        if not job.future.done():
+            job.future.set_result(result)
+        for callback in job.callbacks:
+            try:
+                outcome = callback(result)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception:
+                logger.exception("Batch callback for %s failed", job.custom_id)
@@ -1,16 +1,47 @@
 from __future__ import annotations
 
-import base64
+import asyncio
+import binascii
 from datetime import datetime
+from functools import cached_property
 from zoneinfo import ZoneInfo
 
-from openai import AsyncOpenAI
+from services.openai_batch import BatchCallback, ChatBatcher
+from utils.metrics import REGISTRY
+from utils.tracing import upstream_span
+
+OPENAI_REQUESTS_TOTAL = REGISTRY.counter(
+    "openai_requests_total", "OpenAI API calls by operation and outcome.", ("operation", "outcome")
+)
+OPENAI_TOKENS_TOTAL = REGISTRY.counter("openai_tokens_total", "Chat tokens used.", ("direction",))
+
+DEFAULT_IMAGE_SIZE = "1024x1024"
 
 
 class OpenAIService:
     def __init__(self, settings) -> None:
         self.settings = settings
-        self._client = AsyncOpenAI(api_key=settings.openai_api_key)
+
+    @cached_property
+    def _client(self):
+        # openai (and its httpx/pydantic stack) is the slowest import in the bot. It stays out of
+        # startup and JamesBot pre-imports it in a thread after on_ready, so this is normally cheap.
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(api_key=self.settings.openai_api_key)
+
+    @cached_property
+    def batch(self) -> ChatBatcher:
+        return ChatBatcher(lambda: self._client, on_usage=self._count_batch_usage)
+
+    @staticmethod
+    def _count_batch_usage(prompt_tokens: int, completion_tokens: int) -> None:
+        OPENAI_TOKENS_TOTAL.inc(prompt_tokens, direction="prompt")
+        OPENAI_TOKENS_TOTAL.inc(completion_tokens, direction="completion")
+
+    async def close(self) -> None:
+        if "batch" in self.__dict__:
+            await self.batch.close()
 
     def _build_system(self, system_prompt: str) -> str:
         current_date = datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
@@ -30,31 +61,95 @@ class OpenAIService:
         max_tokens: int = 1024,
     ) -> tuple[str, object | None]:
         selected_model = model or self.settings.default_chat_model
-        response = await self._client.chat.completions.create(
-            model=selected_model,
-            messages=[
+        try:
+            with upstream_span("openai.chat"):
+                response = await self._client.chat.completions.create(
+                    model=selected_model,
+                    messages=[
+                        {"role": "system", "content": self._build_system(system_prompt)},
+                        {"role": "user", "content": prompt},
+                    ],
+                    max_tokens=max_tokens,
+                    timeout=self.settings.openai_timeout_seconds,
+                )
+        except Exception:
+            OPENAI_REQUESTS_TOTAL.inc(operation="chat", outcome="error")
+            raise
+        OPENAI_REQUESTS_TOTAL.inc(operation="chat", outcome="ok")
+        if response.usage is not None:
+            OPENAI_TOKENS_TOTAL.inc(response.usage.prompt_tokens, direction="prompt")
+            OPENAI_TOKENS_TOTAL.inc(response.usage.completion_tokens, direction="completion")
+        return response.choices[0].message.content or "", response.usage
+
+    def ask_batched(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str = "You are a helpful assistant.",
+        model: str | None = None,
+        max_tokens: int = 1024,
+        custom_id: str | None = None,
+        callback: BatchCallback | None = None,
+    ) -> asyncio.Future:
+        """Like ``ask``, but through the Batch API: for work that can wait minutes to hours.
+
+        Returns a future for the ``BatchResult``; ``callback`` gets the same result.
+        """
+        body = {
+            "model": model or self.settings.default_chat_model,
+            "messages": [
                 {"role": "system", "content": self._build_system(system_prompt)},
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=max_tokens,
-            timeout=self.settings.openai_timeout_seconds,
-        )
-        return response.choices[0].message.content or "", response.usage
+            "max_tokens": max_tokens,
+        }
+        return self.batch.submit(body, custom_id=custom_id, callback=callback)
 
-    async def generate_image(self, prompt: str, *, model: str | None = None) -> dict[str, str | bytes]:
+    async def generate_images(
+        self,
+        prompt: str,
+        *,
+        n: int = 1,
+        size: str = DEFAULT_IMAGE_SIZE,
+        model: str | None = None,
+    ) -> list[dict[str, str | bytes]]:
+        """Generate ``n`` variants of ``prompt`` in a single API call."""
         selected_model = model or self.settings.default_image_model
-        response = await self._client.images.generate(
-            model=selected_model,
-            prompt=prompt,
-            size="1024x1024",
-            timeout=self.settings.image_timeout_seconds,
-        )
-        item = response.data[0]
+        try:
+            with upstream_span("openai.images"):
+                response = await self._client.images.generate(
+                    model=selected_model,
+                    prompt=prompt,
+                    n=n,
+                    size=size,
+                    timeout=self.settings.image_timeout_seconds,
+                )
+        except Exception:
+            OPENAI_REQUESTS_TOTAL.inc(operation="image", outcome="error")
+            raise
+        OPENAI_REQUESTS_TOTAL.inc(operation="image", outcome="ok")
+        # Several megabytes of base64 per variant; decode them in a worker, not on the event loop.
+        images = await asyncio.to_thread(_decode_images, response.data or ())
+        if not images:
+            raise RuntimeError(f"Image API returned no image data for model {selected_model}")
+        return images
+
+    async def generate_image(
+        self, prompt: str, *, size: str = DEFAULT_IMAGE_SIZE, model: str | None = None
+    ) -> dict[str, str | bytes]:
+        return (await self.generate_images(prompt, size=size, model=model))[0]
+
+
+def _decode_images(data) -> list[dict[str, str | bytes]]:
+    """Runs in a worker thread."""
+    images = []
+    for item in data:
         if item.b64_json:
-            return {"kind": "bytes", "value": base64.b64decode(item.b64_json), "mime_type": "image/png"}
-        if item.url:
-            return {"kind": "url", "value": item.url}
-        raise RuntimeError(f"Image API returned no image data for model {selected_model}")
+            # a2b_base64 reads the ASCII str in place; b64decode would first copy it into bytes.
+            images.append({"kind": "bytes", "value": binascii.a2b_base64(item.b64_json), "mime_type": "image/png"})
+        elif item.url:
+            images.append({"kind": "url", "value": item.url})
+    return images
 
 
 def format_usage_footnote(usage) -> str:
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    author TEXT NOT NULL,
+    added_by INTEGER,
+    created_at REAL NOT NULL,
+    UNIQUE (guild_id, seq)
+);
+CREATE TABLE IF NOT EXISTS guild_quote_counts (
+    guild_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quotes_by_author ON quotes (guild_id, author COLLATE NOCASE);
+"""
+
+# External-content index over quotes.text/author; prefix indexes make "term"* lookups cheap.
+# guild_id is indexed too, so a search matches only its own guild's rows inside FTS5 instead of
+# matching every guild's quotes and filtering them afterwards.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE quotes_fts USING fts5(
+    text,
+    author,
+    guild_id,
+    content='quotes',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+"""
+
+# Quotes are append-only, so keeping the index current only needs an insert trigger.
+_FTS_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS quotes_fts_insert AFTER INSERT ON quotes BEGIN
+    INSERT INTO quotes_fts (rowid, text, author, guild_id) VALUES (new.id, new.text, new.author, new.guild_id);
+END;
+"""
+
+_SEARCH_AUTHOR_WEIGHT = 0.5
+_SUGGEST_SAMPLE = 50
+_TERM_RE = re.compile(r"\w+")
+
+
+def build_match_query(text: str) -> str | None:
+    """FTS5 query matching every word of ``text`` as a prefix, e.g. ``"pizz"* "frid"*``."""
+    terms = _TERM_RE.findall(text.casefold())
+    return " ".join(f'"{term}"*' for term in terms) or None
+
+
+def _guild_match(guild_id: int, match: str) -> str:
+    """``match`` against one guild's quote text and authors only."""
+    return f'guild_id : "{guild_id}" AND {{text author}} : ({match})'
+
+
+@dataclass(slots=True)
+class Quote:
+    number: int
+    text: str
+    author: str
+
+
+class QuoteStore:
+    """Per-guild quotes in SQLite.
+
+    Quotes are append-only and numbered 1..n within each guild, with n kept in its own table,
+    so a random pick is one count lookup plus one indexed row fetch. Writes are single
+    transactions; all queries run in worker threads behind one shared connection.
+    """
+
+    def __init__(self, path: Path, *, legacy_json: Path | None = None, legacy_guild_id: int | None = None) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        self._ensure_search_index()
+        if legacy_json is not None and legacy_json.exists():
+            if legacy_guild_id is None:
+                # The old quotes were shared by every server; only the operator knows whose they are.
+                logger.warning(
+                    "Found legacy quotes in %s but QUOTES_MIGRATE_GUILD_ID is not set; leaving them unmigrated",
+                    legacy_json,
+                )
+            else:
+                self._migrate_json(legacy_json, legacy_guild_id)
+
+    # ------------------------------------------------------------------ blocking helpers
+
+    def _insert(self, guild_id: int, text: str, author: str, added_by: int | None, created_at: float) -> int:
+        self._conn.execute(
+            "INSERT INTO guild_quote_counts (guild_id, count) VALUES (?, 1)"
+            " ON CONFLICT (guild_id) DO UPDATE SET count = count + 1",
+            (guild_id,),
+        )
+        (seq,) = self._conn.execute(
+            "SELECT count FROM guild_quote_counts WHERE guild_id = ?", (guild_id,)
+        ).fetchone()
+        self._conn.execute(
+            "INSERT INTO quotes (guild_id, seq, text, author, added_by, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (guild_id, seq, text, author, added_by, created_at),
+        )
+        return seq
+
+    def _add_many(self, guild_id: int, rows: list[tuple[str, str, int | None]]) -> list[int]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                numbers = [self._insert(guild_id, text, author, added_by, now) for text, author, added_by in rows]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return numbers
+
+    def _count(self, guild_id: int) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count FROM guild_quote_counts WHERE guild_id = ?", (guild_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def _get(self, guild_id: int, number: int) -> Quote | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, text, author FROM quotes WHERE guild_id = ? AND seq = ?", (guild_id, number)
+            ).fetchone()
+        return Quote(*row) if row else None
+
+    def _ensure_search_index(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(quotes_fts)")}
+        if "guild_id" not in columns:
+            # No index yet, or one from before guild_id was indexed: build it from the quotes table.
+            self._conn.executescript(
+                "DROP TRIGGER IF EXISTS quotes_fts_insert; DROP TABLE IF EXISTS quotes_fts;" + _FTS_SCHEMA
+            )
+            self._conn.execute("INSERT INTO quotes_fts (quotes_fts) VALUES ('rebuild')")
+        self._conn.executescript(_FTS_TRIGGER)
+
+    def _search(self, guild_id: int, query: str, author: str | None, limit: int) -> list[Quote]:
+        match = build_match_query(query)
+        if match is None and author is None:
+            return []
+        with self._lock:
+            if match is None:
+                rows = self._conn.execute(
+                    "SELECT seq, text, author FROM quotes WHERE guild_id = ? AND author = ? COLLATE NOCASE"
+                    " ORDER BY seq DESC LIMIT ?",
+                    (guild_id, author, limit),
+                ).fetchall()
+            else:
+                author_clause = " AND q.author = ? COLLATE NOCASE" if author is not None else ""
+                params = (_guild_match(guild_id, match), *((author,) if author is not None else ()), limit)
+                rows = self._conn.execute(
+                    "SELECT q.seq, q.text, q.author FROM quotes_fts JOIN quotes AS q ON q.id = quotes_fts.rowid"
+                    f" WHERE quotes_fts MATCH ?{author_clause}"
+                    f" ORDER BY bm25(quotes_fts, 1.0, {_SEARCH_AUTHOR_WEIGHT}, 0.0) LIMIT ?",
+                    params,
+                ).fetchall()
+        return [Quote(*row) for row in rows]
+
+    def _suggest_terms(self, guild_id: int, partial: str, limit: int) -> list[str]:
+        words = list(_TERM_RE.finditer(partial))
+        if not words:
+            return []
+        last = words[-1].group().casefold()
+        head = partial[: words[-1].start()]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT q.text FROM quotes_fts JOIN quotes AS q ON q.id = quotes_fts.rowid"
+                " WHERE quotes_fts MATCH ? LIMIT ?",
+                (_guild_match(guild_id, build_match_query(partial)), _SUGGEST_SAMPLE),
+            ).fetchall()
+        counts: dict[str, int] = {}
+        for (text,) in rows:
+            for word in _TERM_RE.findall(text.casefold()):
+                if word.startswith(last):
+                    counts[word] = counts.get(word, 0) + 1
+        ranked = sorted(counts, key=lambda word: (-counts[word], word))
+        return [head + word for word in ranked[:limit]]
+
+    def _suggest_authors(self, guild_id: int, prefix: str, limit: int) -> list[str]:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT author FROM quotes WHERE guild_id = ? AND author LIKE ? ESCAPE '\\'"
+                " GROUP BY author COLLATE NOCASE ORDER BY count(*) DESC, author LIMIT ?",
+                (guild_id, f"{escaped}%", limit),
+            ).fetchall()
+        return [author for (author,) in rows]
+
+    def _migrate_json(self, legacy_json: Path, guild_id: int) -> None:
+        with legacy_json.open(encoding="utf-8") as f:
+            legacy = json.load(f)
+        rows = [(item["text"], item["author"], None) for item in legacy if item.get("text") and item.get("author")]
+        # A non-empty guild means an earlier run imported the file but stopped before renaming it.
+        if rows and not self._count(guild_id):
+            self._add_many(guild_id, rows)
+        migrated = legacy_json.with_name(legacy_json.name + ".migrated")
+        legacy_json.replace(migrated)
+        logger.info(
+            "Migrated %d quote(s) from %s into guild %d; kept the original as %s",
+            len(rows),
+            legacy_json,
+            guild_id,
+            migrated,
+        )
+
+    # ------------------------------------------------------------------ async API
+
+    async def add(self, guild_id: int, text: str, author: str, *, added_by: int | None = None) -> int:
+        """Save a quote and return its number within the guild."""
+        (number,) = await asyncio.to_thread(self._add_many, guild_id, [(text, author, added_by)])
+        return number
+
+    async def count(self, guild_id: int) -> int:
+        return await asyncio.to_thread(self._count, guild_id)
+
+    async def get(self, guild_id: int, number: int) -> Quote | None:
+        return await asyncio.to_thread(self._get, guild_id, number)
+
+    async def get_random(self, guild_id: int) -> Quote | None:
+        count = await self.count(guild_id)
+        if not count:
+            return None
+        return await self.get(guild_id, random.randint(1, count))
+
+    async def search(self, guild_id: int, query: str, *, author: str | None = None, limit: int = 10) -> list[Quote]:
+        """Best matches first; every word is matched as a prefix. With no words, the author's latest quotes."""
+        return await asyncio.to_thread(self._search, guild_id, query, author, limit)
+
+    async def suggest_terms(self, guild_id: int, partial: str, *, limit: int = 25) -> list[str]:
+        """Completions of the last word of ``partial`` drawn from this guild's quotes."""
+        return await asyncio.to_thread(self._suggest_terms, guild_id, partial, limit)
+
+    async def suggest_authors(self, guild_id: int, prefix: str, *, limit: int = 25) -> list[str]:
+        return await asyncio.to_thread(self._suggest_authors, guild_id, prefix, limit)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
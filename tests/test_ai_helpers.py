@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import tempfile
 import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 
-from cogs.ai import build_discord_ask_prompt, build_rewrite_prompt, _ASK_SYSTEM
+import discord
+
+from cogs.ai import AICog, build_discord_ask_prompt, build_rewrite_prompt, translate_message_history, _ASK_SYSTEM
+from services.google_translate import TranslationResult
+
+
+async def _history(*messages):
+    for author, content in messages:
+        yield SimpleNamespace(author=SimpleNamespace(display_name=author), content=content)
 
 
 class AiHelperTests(unittest.TestCase):
@@ -32,6 +44,63 @@ class AiHelperTests(unittest.TestCase):
     def test_build_discord_ask_prompt_injection_guard_in_system(self):
         self.assertIn("untrusted", _ASK_SYSTEM)
 
+    def test_translate_message_history_batches_unique_foreign_messages(self):
+        translate_many = AsyncMock(
+            side_effect=lambda texts, target: [TranslationResult(text.upper()) for text in texts]
+        )
+        bot = SimpleNamespace(translator=SimpleNamespace(translate_many=translate_many))
+        history = _history(
+            ("ana", "hola amigos"),
+            ("ben", "the game was fun"),
+            ("cho", "Hola   amigos"),
+            ("dee", ""),
+            ("eve", "¿qué tal?"),
+        )
+
+        text = asyncio.run(translate_message_history(bot, history, "en"))
+
+        translate_many.assert_awaited_once_with(["hola amigos", "¿qué tal?"], "en")
+        self.assertLess(text.index("¿QUÉ TAL?"), text.index("HOLA AMIGOS"))
+        self.assertIn("Translated 2 of 4 message(s)", text)
+        self.assertIn("1 already in target · 1 duplicate(s)", text)
+
+    def test_translate_message_history_escapes_names_and_mentions(self):
+        translate_many = AsyncMock(return_value=[TranslationResult("ping @everyone now")])
+        bot = SimpleNamespace(translator=SimpleNamespace(translate_many=translate_many))
+
+        text = asyncio.run(translate_message_history(bot, _history(("**boss**", "¿qué tal? hola @everyone")), "en"))
+
+        self.assertIn("**\\*\\*boss\\*\\*:**", text)
+        self.assertIn("@\u200beveryone", text)
+
+
+class HistoryCommandTests(unittest.TestCase):
+    def _cog(self, message_content: bool) -> AICog:
+        intents = discord.Intents.default()
+        intents.message_content = message_content
+        settings = SimpleNamespace(
+            openai_api_key="test",
+            openai_timeout_seconds=1,
+            image_cache_dir=tempfile.mkdtemp(),
+            image_cache_max_mb=1,
+            image_workers=1,
+            image_transcode_format="png",
+            image_transcode_quality=85,
+        )
+        return AICog(SimpleNamespace(intents=intents, settings=settings, cache=None))
+
+    def test_history_commands_need_message_content(self):
+        without = self._cog(False)
+        names = {command.name for command in without.__cog_app_commands__}
+        self.assertNotIn("summarize", names)
+        self.assertNotIn("translate-history", names)
+        self.assertIn("ask", names)
+        self.assertNotIn("Summarize From Here", [menu.name for menu in without.menus])
+
+        with_intent = self._cog(True)
+        self.assertIn("summarize", {command.name for command in with_intent.__cog_app_commands__})
+        self.assertIn("Summarize From Here", [menu.name for menu in with_intent.menus])
+
 
 if __name__ == "__main__":
     unittest.main()
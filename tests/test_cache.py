@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from services.cache import MemoryLRU, SQLiteCache, create_cache
+
+
+class CacheBackendContract:
+    """Behaviour every backend must share; mixed into one TestCase per backend."""
+
+    def make_cache(self):
+        raise NotImplementedError
+
+    def test_namespaces_batches_and_ttl(self):
+        async def scenario():
+            cache = self.make_cache()
+            try:
+                await cache.set_many("geocode", {"austin": [30.2, -97.7], "dallas": [32.7, -96.8]})
+                await cache.set("places", "austin", ["Taco Spot"])
+                await cache.set("geocode", "paris", [48.8, 2.3], ttl=0.05)
+
+                self.assertEqual(
+                    await cache.get_many("geocode", ["austin", "dallas", "nowhere"]),
+                    {"austin": [30.2, -97.7], "dallas": [32.7, -96.8]},
+                )
+                self.assertEqual(await cache.get("places", "austin"), ["Taco Spot"])
+                self.assertEqual(await cache.get("places", "dallas", "miss"), "miss")
+                self.assertEqual(await cache.get("geocode", "paris"), [48.8, 2.3])
+
+                await asyncio.sleep(0.08)
+                self.assertIsNone(await cache.get("geocode", "paris"))
+
+                await cache.delete("geocode", "dallas")
+                self.assertEqual(await cache.get_many("geocode", ["austin", "dallas"]), {"austin": [30.2, -97.7]})
+            finally:
+                await cache.close()
+
+        asyncio.run(scenario())
+
+
+class MemoryLRUTests(CacheBackendContract, unittest.TestCase):
+    def make_cache(self):
+        return MemoryLRU()
+
+    def test_least_recently_used_entry_is_evicted(self):
+        async def scenario():
+            cache = MemoryLRU(max_entries=2)
+            await cache.set("ns", "a", 1)
+            await cache.set("ns", "b", 2)
+            await cache.get("ns", "a")
+            await cache.set("ns", "c", 3)
+            return await cache.get_many("ns", ["a", "b", "c"])
+
+        self.assertEqual(asyncio.run(scenario()), {"a": 1, "c": 3})
+
+
+class SQLiteCacheTests(CacheBackendContract, unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "cache.sqlite3"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def make_cache(self):
+        return SQLiteCache(self.path)
+
+    def test_separate_connections_share_entries(self):
+        async def scenario():
+            writer, reader = SQLiteCache(self.path), SQLiteCache(self.path)
+            try:
+                await writer.set("geocode", "austin", [30.2, -97.7], ttl=60)
+                stale = reader.entry_count()
+                await reader.refresh_entry_count()
+                return await reader.get("geocode", "austin"), stale, reader.entry_count()
+            finally:
+                await writer.close()
+                await reader.close()
+
+        self.assertEqual(asyncio.run(scenario()), ([30.2, -97.7], 0, 1))
+
+    def test_create_cache_reads_settings(self):
+        cache = create_cache(SimpleNamespace(cache_backend="sqlite", cache_path=str(self.path)))
+        self.assertTrue(cache.shared)
+        asyncio.run(cache.close())
+        self.assertFalse(create_cache(SimpleNamespace(cache_backend="memory", cache_path="")).shared)
+        with self.assertRaises(RuntimeError):
+            create_cache(SimpleNamespace(cache_backend="redis", cache_path=""))
+
+
+if __name__ == "__main__":
+    unittest.main()
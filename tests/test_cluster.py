@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import cluster
+from config import Settings
+from core_bot import JamesBot
+from services import google_places
+from services.cache import MemoryLRU
+from utils.ipc import IPCClient, IPCHub
+
+
+class FakeGateway:
+    """Stands in for Discord's gateway: one session per shard, guild events routed by a fixed table."""
+
+    def __init__(self, shard_count: int, routes: dict[int, int]) -> None:
+        self.shard_count = shard_count
+        self.routes = routes
+        self.sessions: dict[int, int] = {}
+        self.received: dict[int, list[int]] = {}
+
+    def identify(self, worker: int, shard_id: int) -> None:
+        if not 0 <= shard_id < self.shard_count:
+            raise AssertionError(f"worker {worker} identified as out-of-range shard {shard_id}")
+        if shard_id in self.sessions:
+            raise AssertionError(f"shard {shard_id} identified by workers {self.sessions[shard_id]} and {worker}")
+        self.sessions[shard_id] = worker
+
+    def dispatch_guild_create(self, guild_id: int) -> None:
+        worker = self.sessions[self.routes[guild_id]]
+        self.received.setdefault(worker, []).append(guild_id)
+
+
+# Shards Discord delivers these guilds on with 10 shards: (guild_id >> 22) % 10, worked out by hand.
+_GUILD_SHARDS = {
+    1: 0,
+    54525957: 3,
+    41771983423143937: 4,
+    175928847299117063: 6,
+    29360128: 7,
+    81384788765712384: 8,
+}
+
+
+def _settings() -> Settings:
+    env = {"DISCORD_BOT_API_KEY": "token", "CHATGPT_API_KEY": "key", "NETWORK_PROFILE": "default"}
+    with patch.dict(os.environ, env):
+        return Settings.from_env()
+
+
+class ShardDistributionTests(unittest.TestCase):
+    def test_ranges_are_contiguous_balanced_and_complete(self):
+        for shard_count, workers in [(1, 1), (10, 3), (16, 4), (3, 8)]:
+            with self.subTest(shard_count=shard_count, workers=workers):
+                plan = cluster.distribute_shards(shard_count, workers)
+
+                self.assertEqual([shard for shards in plan for shard in shards], list(range(shard_count)))
+                self.assertLessEqual(max(map(len, plan)) - min(map(len, plan)), 1)
+                self.assertEqual(len(plan), min(shard_count, workers))
+
+        with self.assertRaises(ValueError):
+            cluster.distribute_shards(0, 2)
+
+    def test_every_guild_reaches_exactly_the_worker_that_owns_its_shard(self):
+        shard_count = 10
+        plan = cluster.distribute_shards(shard_count, 3)
+        self.assertEqual(plan, [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        gateway = FakeGateway(shard_count, _GUILD_SHARDS)
+        bots = [
+            JamesBot(_settings(), shard_ids=shards, shard_count=shard_count, cluster_id=worker)
+            for worker, shards in enumerate(plan)
+        ]
+        for worker, bot in enumerate(bots):
+            for shard_id in bot.shard_ids:
+                gateway.identify(worker, shard_id)
+
+        for guild_id in _GUILD_SHARDS:
+            gateway.dispatch_guild_create(guild_id)
+
+        self.assertEqual(len(gateway.sessions), shard_count)
+        self.assertEqual(
+            gateway.received,
+            {0: [1, 54525957], 1: [41771983423143937, 175928847299117063], 2: [29360128, 81384788765712384]},
+        )
+        # The bot's own routing agrees with the gateway's.
+        for guild_id, shard_id in _GUILD_SHARDS.items():
+            self.assertEqual(cluster.shard_for_guild(guild_id, shard_count), shard_id)
+        self.assertEqual([bot.is_primary for bot in bots], [True, False, False])
+
+
+class IPCTests(unittest.TestCase):
+    def test_publish_reaches_other_workers_and_counters_are_shared(self):
+        async def scenario():
+            hub = IPCHub()
+            port = await hub.start()
+            clients = [IPCClient(worker, port=port) for worker in range(3)]
+            received: dict[int, list[dict]] = {worker: [] for worker in range(3)}
+            for client in clients:
+                client.subscribe("note", received[client.worker_id].append)
+                await client.connect()
+            try:
+                while len(hub.workers) < 3:
+                    await asyncio.sleep(0.01)
+
+                await clients[0].publish("note", {"text": "hi"})
+                totals = await asyncio.gather(*(client.incr("quota:img", 1) for client in clients for _ in range(20)))
+                await asyncio.sleep(0.05)
+
+                self.assertEqual(received[0], [])
+                self.assertEqual(received[1], [{"text": "hi"}])
+                self.assertEqual(received[2], [{"text": "hi"}])
+                self.assertEqual(sorted(totals), list(range(1, 61)))
+
+                self.assertEqual(await clients[1].incr("window", 1, ttl=0.05), 1)
+                await asyncio.sleep(0.08)
+                self.assertEqual(await clients[2].incr("window", 1, ttl=0.05), 1)
+            finally:
+                for client in clients:
+                    await client.close()
+                await hub.stop()
+
+        asyncio.run(scenario())
+
+    def test_lost_hub_fails_pending_and_later_requests(self):
+        async def fake_hub(reader, writer):
+            await reader.readline()  # hello
+            writer.write(b"{not json\n" + b'{"op":"publish","topic":"note","payload":{"n":1}}\n')
+            await writer.drain()
+            await reader.readline()  # an incr that is never answered
+            writer.close()
+
+        async def scenario():
+            server = await asyncio.start_server(fake_hub, "127.0.0.1", 0)
+            client = IPCClient(0, port=server.sockets[0].getsockname()[1])
+            received = []
+            client.subscribe("note", received.append)
+            await client.connect()
+            try:
+                for _ in range(100):
+                    if received:
+                        break
+                    await asyncio.sleep(0.01)
+                with self.assertRaises(ConnectionError):
+                    await asyncio.wait_for(client.incr("quota"), timeout=1)
+                self.assertFalse(client.connected)
+                with self.assertRaises(ConnectionError):
+                    await asyncio.wait_for(client.incr("quota"), timeout=1)
+            finally:
+                await client.close()
+                server.close()
+                await server.wait_closed()
+            return received
+
+        with self.assertLogs("thejamesroll-bot", level="WARNING") as logs:
+            received = asyncio.run(scenario())
+        # The malformed line was skipped without stopping the reader.
+        self.assertEqual(received, [{"n": 1}])
+        self.assertTrue(any("malformed" in line for line in logs.output))
+
+    def test_geocode_fill_is_shared_with_other_workers(self):
+        async def fake_get_json(bot, url, *, params=None, upstream=None):
+            return {"status": "OK", "results": [{"geometry": {"location": {"lat": 30.2, "lng": -97.7}}}]}
+
+        async def scenario():
+            hub = IPCHub()
+            port = await hub.start()
+            first, second = IPCClient(0, port=port), IPCClient(1, port=port)
+            shared: list[dict] = []
+            second.subscribe("cache.fill", shared.append)
+            await first.connect()
+            await second.connect()
+            bot = SimpleNamespace(
+                settings=SimpleNamespace(google_api_key="test"),
+                cache=MemoryLRU(),
+                geocode_ttl_seconds=60,
+                ipc=first,
+            )
+            try:
+                while len(hub.workers) < 2:
+                    await asyncio.sleep(0.01)
+                with patch.object(google_places, "get_json", fake_get_json):
+                    await google_places.geocode_city(bot, " Austin ")
+                await asyncio.sleep(0.05)
+            finally:
+                await first.close()
+                await second.close()
+                await hub.stop()
+            return shared
+
+        shared = asyncio.run(scenario())
+        self.assertEqual(len(shared), 1)
+        self.assertEqual((shared[0]["namespace"], shared[0]["key"]), ("geocode", "austin"))
+        self.assertEqual(shared[0]["value"], [30.2, -97.7])
+
+
+if __name__ == "__main__":
+    unittest.main()
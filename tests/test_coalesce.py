@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from utils.coalesce import (
+    COALESCED_REQUESTS_TOTAL,
+    DUPLICATE_INTERACTIONS_TOTAL,
+    Coalescer,
+    InteractionDeduper,
+    normalize_input,
+)
+from utils.presentation import run_interaction_task
+
+
+class CoalescerTests(unittest.TestCase):
+    def test_identical_requests_share_one_call(self):
+        coalescer = Coalescer("test-share")
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        async def scenario():
+            key = ("ask", normalize_input("what  is\n an ETF? "))
+            return await asyncio.gather(*(coalescer.run(key, factory) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(scenario()), ["answer"] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(COALESCED_REQUESTS_TOTAL.get(name="test-share"), 2)
+        self.assertEqual(coalescer.inflight, 0)
+
+    def test_different_keys_and_later_requests_run_separately(self):
+        coalescer = Coalescer("test-separate")
+        calls = []
+
+        async def factory(value):
+            calls.append(value)
+            await asyncio.sleep(0)
+            return value
+
+        async def scenario():
+            first = await asyncio.gather(
+                coalescer.run("a", lambda: factory("a")), coalescer.run("b", lambda: factory("b"))
+            )
+            again = await coalescer.run("a", lambda: factory("a2"))
+            return first, again
+
+        first, again = asyncio.run(scenario())
+        self.assertEqual(first, ["a", "b"])
+        # Only overlapping requests are shared; nothing is cached once the first one finishes.
+        self.assertEqual(again, "a2")
+        self.assertEqual(calls, ["a", "b", "a2"])
+
+    def test_errors_reach_every_waiter(self):
+        coalescer = Coalescer("test-error")
+
+        async def factory():
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream down")
+
+        async def scenario():
+            return await asyncio.gather(coalescer.run("k", factory), coalescer.run("k", factory), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_cancelled_waiter_leaves_others_running(self):
+        coalescer = Coalescer("test-cancel")
+        release = None
+
+        async def factory():
+            await release.wait()
+            return "done"
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            first = asyncio.create_task(coalescer.run("k", factory))
+            second = asyncio.create_task(coalescer.run("k", factory))
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            return await second, first.cancelled()
+
+        self.assertEqual(asyncio.run(scenario()), ("done", True))
+
+
+class InteractionDeduperTests(unittest.TestCase):
+    def test_repeats_are_rejected_and_counted(self):
+        deduper = InteractionDeduper(size=2)
+        before = DUPLICATE_INTERACTIONS_TOTAL.get()
+
+        self.assertTrue(deduper.claim(1))
+        self.assertFalse(deduper.claim(1))
+        self.assertTrue(deduper.claim(None))
+        self.assertTrue(deduper.claim(None))
+        self.assertEqual(DUPLICATE_INTERACTIONS_TOTAL.get() - before, 1)
+
+    def test_oldest_ids_are_forgotten(self):
+        deduper = InteractionDeduper(size=2)
+        for interaction_id in (1, 2, 3):
+            deduper.claim(interaction_id)
+        self.assertTrue(deduper.claim(1))
+        self.assertFalse(deduper.claim(3))
+
+    def test_duplicate_interaction_is_not_answered_twice(self):
+        interaction = SimpleNamespace(
+            id=424242,
+            guild_id=None,
+            channel_id=1,
+            user=SimpleNamespace(id=1),
+            command=SimpleNamespace(qualified_name="ask"),
+            response=SimpleNamespace(defer=AsyncMock()),
+            followup=SimpleNamespace(send=AsyncMock()),
+        )
+        work = AsyncMock(return_value="hi")
+
+        async def scenario():
+            await run_interaction_task(interaction, task_name="Ask", work=work, ephemeral=False)
+            await run_interaction_task(interaction, task_name="Ask", work=work, ephemeral=False)
+
+        asyncio.run(scenario())
+        interaction.response.defer.assert_awaited_once()
+        work.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
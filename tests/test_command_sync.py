@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import discord
+from discord import app_commands
+
+from utils.command_sync import command_tree_hash, load_command_hashes, save_command_hashes
+
+
+def _tree(description: str = "Say hi", reverse: bool = False) -> app_commands.CommandTree:
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+
+    async def hello(interaction: discord.Interaction) -> None:
+        pass
+
+    async def roll(interaction: discord.Interaction, sides: int) -> None:
+        pass
+
+    commands = [
+        app_commands.Command(name="hello", description=description, callback=hello),
+        app_commands.Command(name="roll", description="Roll a die", callback=roll),
+    ]
+    for command in reversed(commands) if reverse else commands:
+        tree.add_command(command)
+    return tree
+
+
+class CommandTreeHashTests(unittest.TestCase):
+    def test_hash_ignores_registration_order_but_tracks_schema(self):
+        self.assertEqual(command_tree_hash(_tree()), command_tree_hash(_tree(reverse=True)))
+        self.assertNotEqual(command_tree_hash(_tree()), command_tree_hash(_tree(description="Say hello")))
+
+    def test_hashes_round_trip_and_tolerate_missing_or_corrupt_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data" / "command_tree_hash.json"
+            self.assertEqual(load_command_hashes(path), {})
+
+            save_command_hashes(path, {"global": "abc"})
+            self.assertEqual(load_command_hashes(path), {"global": "abc"})
+
+            path.write_text("{not json", encoding="utf-8")
+            self.assertEqual(load_command_hashes(path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
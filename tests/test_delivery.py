@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from utils.delivery import ChannelSendQueue, DeliveryStats, PaginatorView, deliver_text, pack_embed_pages
+from utils.text import discord_len
+
+
+def _interaction():
+    return SimpleNamespace(
+        channel_id=123,
+        user=SimpleNamespace(id=42),
+        followup=SimpleNamespace(send=AsyncMock()),
+    )
+
+
+class DeliveryTests(unittest.TestCase):
+    def test_short_text_is_one_plain_message(self):
+        interaction = _interaction()
+        stats = DeliveryStats()
+        asyncio.run(deliver_text(interaction, "hello", ephemeral=True, max_chunks=6, stats=stats))
+
+        interaction.followup.send.assert_awaited_once_with(content="hello", ephemeral=True)
+        self.assertEqual(stats.sends, 1)
+
+    def test_medium_text_packs_into_one_message_with_embeds(self):
+        interaction = _interaction()
+        stats = DeliveryStats()
+        text = "word " * 1100  # ~5500 chars: too long for content, fits one message of embeds
+        asyncio.run(deliver_text(interaction, text, ephemeral=False, max_chunks=6, stats=stats))
+
+        self.assertEqual(stats.sends, 1)
+        embeds = interaction.followup.send.await_args.kwargs["embeds"]
+        self.assertEqual(len(embeds), 2)
+        self.assertLessEqual(sum(len(embed.description) for embed in embeds), 6000)
+
+    def test_long_text_uses_a_single_paginated_message(self):
+        interaction = _interaction()
+        stats = DeliveryStats()
+        text = "word " * 4000
+
+        async def run():
+            await deliver_text(interaction, text, ephemeral=False, max_chunks=6, stats=stats)
+
+        asyncio.run(run())
+
+        self.assertEqual(stats.sends, 1)
+        view = interaction.followup.send.await_args.kwargs["view"]
+        self.assertIsInstance(view, PaginatorView)
+        self.assertGreater(len(view.groups), 1)
+        self.assertTrue(view.previous_page.disabled)
+        self.assertFalse(view.next_page.disabled)
+
+    def test_pack_embed_pages_respects_message_totals(self):
+        groups = pack_embed_pages("x " * 20000, max_chunks=20)
+        for group in groups:
+            self.assertLessEqual(sum(len(page) for page in group), 6000)
+            self.assertTrue(all(len(page) <= 4000 for page in group))
+
+    def test_page_groups_leave_room_for_the_footer(self):
+        # Two pages that together sit just under 6000 (counting each emoji as two), then a third.
+        first = "😀" * 10 + "a" * 2979
+        text = "\n\n".join((first, "b" * 2998, "c" * 1500))
+        groups = pack_embed_pages(text, max_chunks=6)
+        self.assertEqual([len(group) for group in groups], [1, 2])
+
+        async def scenario():
+            view = PaginatorView(groups, owner_id=None)
+            for index in range(len(groups)):
+                view.index = index
+                embeds = view.current_embeds()
+                total = sum(discord_len(embed.description) + discord_len(embed.footer.text or "") for embed in embeds)
+                self.assertLessEqual(total, 6000)
+
+        asyncio.run(scenario())
+
+    def test_send_queue_spaces_out_bursts(self):
+        queue = ChannelSendQueue(max_sends=2, window_seconds=0.1)
+
+        async def send():
+            await queue.acquire(1)
+            return time.monotonic()
+
+        async def run():
+            return await asyncio.gather(*(send() for _ in range(4)))
+
+        started = time.monotonic()
+        stamps = asyncio.run(run())
+        self.assertGreaterEqual(max(stamps) - started, 0.09)
+
+    def test_send_queue_forgets_idle_channels(self):
+        queue = ChannelSendQueue(max_sends=2, window_seconds=0.05)
+
+        async def run():
+            for channel_id in range(1, 6):
+                await queue.acquire(channel_id)
+            self.assertEqual(queue.channels, 5)
+            await asyncio.sleep(0.06)
+            await queue.acquire(99)
+
+        asyncio.run(run())
+        self.assertEqual(queue.channels, 1)
+        self.assertEqual(set(queue._locks), {99})
+
+    def test_paginator_keeps_the_page_and_disables_buttons_on_timeout(self):
+        async def run():
+            origin = SimpleNamespace(edit_original_response=AsyncMock())
+            view = PaginatorView([["one"], ["two"]], owner_id=42, origin=origin)
+            await view.on_timeout()
+            return origin, view
+
+        origin, view = asyncio.run(run())
+        self.assertTrue(view.previous_page.disabled and view.next_page.disabled)
+        origin.edit_original_response.assert_awaited_once_with(view=view)
+
+
+if __name__ == "__main__":
+    unittest.main()
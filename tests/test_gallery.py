@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from utils.gallery import GalleryImage, ImageGalleryView
+from utils.presentation import run_interaction_task
+
+
+def _interaction(attachments=(), user_id=1):
+    return SimpleNamespace(
+        user=SimpleNamespace(id=user_id),
+        message=SimpleNamespace(attachments=list(attachments)),
+        response=SimpleNamespace(edit_message=AsyncMock(), send_message=AsyncMock()),
+        followup=SimpleNamespace(send=AsyncMock()),
+        edit_original_response=AsyncMock(),
+    )
+
+
+class ImageGalleryViewTests(unittest.TestCase):
+    def test_select_switches_the_shown_variant(self):
+        async def scenario():
+            images = [GalleryImage(filename="image-1.png"), GalleryImage(url="https://example.com/2.png")]
+            view = ImageGalleryView("a fox", images, owner_id=1, regenerate=AsyncMock())
+            self.assertEqual(view.current_embed().image.url, "attachment://image-1.png")
+            self.assertEqual(len(view.pick_variant.options), 2)
+
+            interaction = _interaction()
+            view.pick_variant._values = ["1"]
+            await view.pick_variant.callback(interaction)
+            embed = interaction.response.edit_message.await_args.kwargs["embed"]
+            self.assertEqual(embed.image.url, "https://example.com/2.png")
+            self.assertEqual(embed.footer.text, "Variant 2/2")
+
+        asyncio.run(scenario())
+
+    def test_single_image_has_no_select(self):
+        async def scenario():
+            view = ImageGalleryView("a fox", [GalleryImage(filename="image-1.png")], owner_id=1, regenerate=AsyncMock())
+            self.assertNotIn(view.pick_variant, view.children)
+            self.assertIsNone(view.current_embed().footer.text)
+
+        asyncio.run(scenario())
+
+    def test_regenerate_replaces_only_the_shown_attachment(self):
+        async def scenario():
+            images = [GalleryImage(filename=f"image-{number}.png") for number in (1, 2, 3)]
+            new_file = discord.File(fp=BytesIO(b"new"), filename="image-2-r1.png")
+            regenerate = AsyncMock(return_value=(GalleryImage(filename="image-2-r1.png"), new_file))
+            view = ImageGalleryView("a fox", images, owner_id=1, regenerate=regenerate)
+            view.index = 1
+
+            attachments = [SimpleNamespace(filename=f"image-{number}.png") for number in (3, 1, 2)]
+            interaction = _interaction(attachments)
+            await view.regenerate_button.callback(interaction)
+
+            regenerate.assert_awaited_once_with(1)
+            kwargs = interaction.edit_original_response.await_args.kwargs
+            self.assertEqual(
+                [item.filename for item in kwargs["attachments"]], ["image-1.png", "image-2-r1.png", "image-3.png"]
+            )
+            self.assertIs(kwargs["attachments"][1], new_file)
+            self.assertEqual(kwargs["embed"].image.url, "attachment://image-2-r1.png")
+            self.assertFalse(view.regenerate_button.disabled)
+
+        asyncio.run(scenario())
+
+    def test_failed_regenerate_keeps_the_gallery(self):
+        async def scenario():
+            images = [GalleryImage(filename="image-1.png")]
+            view = ImageGalleryView("a fox", images, owner_id=1, regenerate=AsyncMock(side_effect=RuntimeError("boom")))
+            interaction = _interaction([SimpleNamespace(filename="image-1.png")])
+            with self.assertLogs("thejamesroll-bot", level="ERROR"):
+                await view.regenerate_button.callback(interaction)
+            interaction.followup.send.assert_awaited_once()
+            self.assertNotIn("attachments", interaction.edit_original_response.await_args.kwargs)
+            self.assertEqual(view.images[0].filename, "image-1.png")
+
+        asyncio.run(scenario())
+
+    def test_regenerations_are_spaced_out_and_capped(self):
+        async def scenario():
+            regenerate = AsyncMock(return_value=(GalleryImage(filename="image-1-r.png"), None))
+            view = ImageGalleryView(
+                "a fox", [GalleryImage(filename="image-1.png")], owner_id=1, regenerate=regenerate, max_regenerations=2
+            )
+            await view.regenerate_button.callback(_interaction())
+            too_soon = _interaction()
+            await view.regenerate_button.callback(too_soon)
+            self.assertIn("cooling down", too_soon.response.send_message.await_args.args[0])
+            self.assertEqual(regenerate.await_count, 1)
+
+            view.cooldown = 0
+            view._next_regenerate = 0
+            await view.regenerate_button.callback(_interaction())
+            self.assertEqual(regenerate.await_count, 2)
+            self.assertTrue(view.regenerate_button.disabled)
+            self.assertEqual(view.regenerate_button.label, "No regenerations left")
+
+        asyncio.run(scenario())
+
+    def test_timeout_disables_the_controls(self):
+        async def scenario():
+            images = [GalleryImage(filename="image-1.png"), GalleryImage(filename="image-2.png")]
+            view = ImageGalleryView("a fox", images, owner_id=1, regenerate=AsyncMock())
+            view.message = SimpleNamespace(edit=AsyncMock())
+            await view.on_timeout()
+            self.assertTrue(all(item.disabled for item in view.children))
+            view.message.edit.assert_awaited_once_with(view=view)
+
+            # Later clicks hand over their newer interaction token.
+            clicker = _interaction()
+            await view.interaction_check(clicker)
+            await view.on_timeout()
+            clicker.edit_original_response.assert_awaited_once_with(view=view)
+            view.message.edit.assert_awaited_once()
+
+        asyncio.run(scenario())
+
+    def test_queued_gallery_times_out_on_the_follow_up_it_was_sent_in(self):
+        gallery = SimpleNamespace(edit=AsyncMock())
+        interaction = SimpleNamespace(
+            id=None,
+            guild_id=None,
+            channel_id=1,
+            user=SimpleNamespace(id=1),
+            command=SimpleNamespace(qualified_name="img"),
+            response=SimpleNamespace(defer=AsyncMock()),
+            followup=SimpleNamespace(send=AsyncMock(return_value=gallery)),
+            edit_original_response=AsyncMock(),
+            delete_original_response=AsyncMock(),
+        )
+        view = None
+
+        async def work():
+            nonlocal view
+            # A queued job shows its place in line, then drops that status message.
+            await interaction.edit_original_response(content="⏳ Queued — position 1")
+            await interaction.delete_original_response()
+            view = ImageGalleryView("a fox", [GalleryImage(filename="image-1.png")], owner_id=1, regenerate=AsyncMock())
+            return view.current_embed(), discord.File(fp=BytesIO(b"png"), filename="image-1.png"), view
+
+        async def scenario():
+            await run_interaction_task(interaction, task_name="Image", work=work, ephemeral=False)
+            interaction.edit_original_response.reset_mock()
+            await view.on_timeout()
+
+        asyncio.run(scenario())
+        self.assertIs(view.message, gallery)
+        gallery.edit.assert_awaited_once_with(view=view)
+        interaction.edit_original_response.assert_not_awaited()
+
+    def test_only_the_requester_can_use_controls(self):
+        async def scenario():
+            view = ImageGalleryView("a fox", [GalleryImage(filename="image-1.png")], owner_id=1, regenerate=AsyncMock())
+            stranger = _interaction(user_id=2)
+            self.assertFalse(await view.interaction_check(stranger))
+            stranger.response.send_message.assert_awaited_once()
+            self.assertTrue(await view.interaction_check(_interaction(user_id=1)))
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services import google_places
+from services.cache import MemoryLRU
+
+
+def _fake_bot():
+    return SimpleNamespace(
+        settings=SimpleNamespace(google_api_key="test"),
+        cache=MemoryLRU(),
+        geocode_ttl_seconds=60,
+    )
+
+
+class FakePlacesApi:
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.geocode_calls: list[str] = []
+        self.nearby_calls = 0
+
+    async def get_json(self, bot, url, *, params=None, upstream=None):
+        await asyncio.sleep(self.delay)
+        if "geocode" in url:
+            self.geocode_calls.append(params["address"])
+            if params["address"] == "Nowhere":
+                return {"status": "ZERO_RESULTS"}
+            return {"status": "OK", "results": [{"geometry": {"location": {"lat": 1.0, "lng": 2.0}}}]}
+        if "nearbysearch" in url:
+            self.nearby_calls += 1
+            return {"status": "OK", "results": [{"name": "Taco Spot", "vicinity": "1 Main St"}]}
+        if params["query"].startswith("Closed"):
+            return {"status": "ZERO_RESULTS"}
+        name = params["query"].split(" restaurant in ")[0]
+        return {"status": "OK", "results": [{"name": name, "formatted_address": "2 Main St"}]}
+
+
+class GooglePlacesBatchTests(unittest.TestCase):
+    def test_cities_are_geocoded_once_and_failures_are_isolated(self):
+        api = FakePlacesApi()
+        with patch.object(google_places, "get_json", api.get_json):
+            results = asyncio.run(
+                google_places.get_restaurants_for_cities(_fake_bot(), ["Austin", " austin ", "Nowhere"])
+            )
+
+        self.assertEqual(sorted(api.geocode_calls), ["Austin", "Nowhere"])
+        self.assertEqual(api.nearby_calls, 1)
+        self.assertEqual([city for city, _ in results], ["Austin", " austin ", "Nowhere"])
+        self.assertIn("Taco Spot", results[0][1][0])
+        self.assertIn("Taco Spot", results[1][1][0])
+        self.assertIsInstance(results[2][1], RuntimeError)
+
+    def test_batch_runs_concurrently(self):
+        api = FakePlacesApi(delay=0.1)
+        cities = ["Austin", "Dallas", "Houston", "El Paso"]
+        with patch.object(google_places, "get_json", api.get_json):
+            started = time.perf_counter()
+            asyncio.run(google_places.get_restaurants_for_cities(_fake_bot(), cities))
+            elapsed = time.perf_counter() - started
+
+        # One geocode round plus one search round, not one per city.
+        self.assertLess(elapsed, 0.35)
+
+    def test_addresses_share_one_geocode(self):
+        api = FakePlacesApi()
+        with patch.object(google_places, "get_json", api.get_json):
+            results = asyncio.run(
+                google_places.get_restaurant_addresses(_fake_bot(), ["Pho Place", "Closed Diner"], "Austin")
+            )
+
+        self.assertEqual(api.geocode_calls, ["Austin"])
+        self.assertEqual(results[0][1], ("Pho Place", "2 Main St"))
+        self.assertIsInstance(results[1][1], RuntimeError)
+
+        embed = google_places.build_addresses_embed("Austin", results)
+        self.assertEqual(len(embed.fields), 2)
+        self.assertIn("⚠️", embed.fields[1].value)
+
+
+if __name__ == "__main__":
+    unittest.main()
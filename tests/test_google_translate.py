@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services import google_translate
+from services.google_translate import TranslationService, translate_long_text, translate_text
+
+
+class FakeTranslateApi:
+    def __init__(self) -> None:
+        self.calls: list[list[tuple[str, str]]] = []
+
+    async def post_json(self, bot, url, *, data=None, json=None, upstream=None):
+        self.calls.append(data)
+        await asyncio.sleep(0)
+        texts = [value for key, value in data if key == "q"]
+        return {
+            "data": {
+                "translations": [
+                    {"translatedText": text.upper(), "detectedSourceLanguage": "en"} for text in texts
+                ]
+            }
+        }
+
+
+def _fake_bot():
+    bot = SimpleNamespace(settings=SimpleNamespace(google_api_key="test"))
+    bot.translator = TranslationService(bot, batch_window_seconds=0.01)
+    return bot
+
+
+class TranslationServiceTests(unittest.TestCase):
+    def test_concurrent_requests_share_one_call(self):
+        api = FakeTranslateApi()
+        bot = _fake_bot()
+
+        async def run():
+            return await asyncio.gather(
+                bot.translator.translate("hello", "es"),
+                bot.translator.translate("world", "ES "),
+                bot.translator.translate("hello", "es"),
+            )
+
+        with patch.object(google_translate, "post_json", api.post_json):
+            results = asyncio.run(run())
+
+        self.assertEqual([r.text for r in results], ["HELLO", "WORLD", "HELLO"])
+        self.assertEqual(len(api.calls), 1)
+        self.assertEqual([v for k, v in api.calls[0] if k == "q"], ["hello", "world"])
+        self.assertEqual(bot.translator.stats.max_batch_size, 2)
+
+    def test_languages_are_batched_separately(self):
+        api = FakeTranslateApi()
+        bot = _fake_bot()
+
+        async def run():
+            await asyncio.gather(
+                bot.translator.translate("hello", "es"),
+                bot.translator.translate("hello", "fr"),
+            )
+
+        with patch.object(google_translate, "post_json", api.post_json):
+            asyncio.run(run())
+
+        self.assertEqual(len(api.calls), 2)
+
+    def test_repeated_translation_is_served_from_cache(self):
+        api = FakeTranslateApi()
+        bot = _fake_bot()
+
+        async def run():
+            await bot.translator.translate("hello", "es")
+            return await translate_text(bot, "hello", "es")
+
+        with patch.object(google_translate, "post_json", api.post_json):
+            text = asyncio.run(run())
+
+        self.assertEqual(len(api.calls), 1)
+        self.assertIn("HELLO", text)
+        self.assertIn("Detected source: `en`", text)
+        self.assertEqual(bot.translator.stats.cache_hit_rate, 0.5)
+
+    def test_errors_reach_every_waiter(self):
+        bot = _fake_bot()
+
+        async def failing_post(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        async def run():
+            return await asyncio.gather(
+                bot.translator.translate("a", "es"),
+                bot.translator.translate("b", "es"),
+                return_exceptions=True,
+            )
+
+        with patch.object(google_translate, "post_json", failing_post):
+            results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_one_bad_text_only_fails_its_own_waiter(self):
+        api = FakeTranslateApi()
+        bot = _fake_bot()
+
+        async def picky_post(bot_, url, *, data=None, **kwargs):
+            if ("q", "bad") in data:
+                raise RuntimeError("400 invalid value")
+            return await api.post_json(bot_, url, data=data, **kwargs)
+
+        async def run():
+            return await asyncio.gather(
+                bot.translator.translate("good", "es"),
+                bot.translator.translate("bad", "es"),
+                bot.translator.translate("fine", "es"),
+                return_exceptions=True,
+            )
+
+        with patch.object(google_translate, "post_json", picky_post), self.assertLogs(
+            "services.google_translate", level="WARNING"
+        ):
+            good, bad, fine = asyncio.run(run())
+
+        self.assertEqual((good.text, fine.text), ("GOOD", "FINE"))
+        self.assertIsInstance(bad, RuntimeError)
+        self.assertEqual(len(api.calls), 2)
+
+    def test_cancelled_batch_does_not_leave_waiters_hanging(self):
+        bot = _fake_bot()
+
+        async def stuck_post(*args, **kwargs):
+            await asyncio.sleep(60)
+
+        async def run():
+            waiter = asyncio.ensure_future(bot.translator.translate("hello", "es"))
+            await asyncio.sleep(0.02)
+            self.assertEqual(len(bot.translator._tasks), 1)
+            for task in list(bot.translator._tasks):
+                task.cancel()
+            done, _ = await asyncio.wait([waiter], timeout=1)
+            return done, waiter
+
+        with patch.object(google_translate, "post_json", stuck_post):
+            done, waiter = asyncio.run(run())
+
+        self.assertEqual(done, {waiter})
+        self.assertTrue(waiter.cancelled())
+
+    def test_long_text_is_segmented_and_reassembled_in_order(self):
+        api = FakeTranslateApi()
+        bot = _fake_bot()
+        paragraphs = [f"paragraph {i}. " * 300 for i in range(4)]
+        text = "\n\n".join(paragraphs)
+
+        with patch.object(google_translate, "post_json", api.post_json):
+            result = asyncio.run(translate_long_text(bot, text, "es"))
+
+        self.assertEqual(result.text, text.upper())
+        self.assertEqual(result.detected_source, "en")
+        sent = [value for call in api.calls for key, value in call if key == "q"]
+        self.assertGreater(len(sent), 1)
+        self.assertTrue(all(not value[0].isspace() and not value[-1].isspace() for value in sent))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from cogs.finance import FinanceCog
+from services.cache import MemoryLRU
+from services.headline_summaries import HeadlineSummarizer
+from services.openai_batch import BatchResult
+from utils.text import discord_len
+
+
+def _headline(number: int) -> dict:
+    return {"title": f"Headline {number}", "url": f"https://example.com/{number}", "guid": f"guid-{number}", "snippet": "Stocks moved."}
+
+
+class FakeOpenAI:
+    def __init__(self, *, fail: set[str] = frozenset()) -> None:
+        self.prompts: list[str] = []
+        self.fail = fail
+        self.active = self.max_active = 0
+        self.batched: list = []
+
+    async def ask(self, prompt, *, system_prompt, max_tokens):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if any(title in prompt for title in self.fail):
+            raise RuntimeError("upstream error")
+        title = prompt.splitlines()[1]
+        return f"  Summary of {title}.\n", None
+
+    def ask_batched(self, prompt, *, system_prompt, max_tokens, custom_id, callback):
+        self.batched.append((prompt, custom_id, callback))
+
+
+class HeadlineSummarizerTests(unittest.TestCase):
+    def test_uncached_headlines_are_summarized_together_and_cached(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            summarizer = HeadlineSummarizer(openai, MemoryLRU(), token_budget=10_000)
+            first = await summarizer.summarize([_headline(1), _headline(2), _headline(3)])
+            calls = len(openai.prompts)
+            # Another digest sharing two articles only pays for the new one.
+            second = await summarizer.summarize([_headline(2), _headline(3), _headline(4)])
+            return openai, calls, first, second
+
+        openai, calls, first, second = asyncio.run(scenario())
+        self.assertEqual(first, ["Summary of Headline 1.", "Summary of Headline 2.", "Summary of Headline 3."])
+        self.assertEqual(calls, 3)
+        self.assertEqual(openai.max_active, 3)
+        self.assertEqual(len(openai.prompts), 4)
+        self.assertEqual(second[2], "Summary of Headline 4.")
+
+    def test_concurrent_runs_share_in_flight_requests(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            summarizer = HeadlineSummarizer(openai, MemoryLRU(), token_budget=10_000)
+            results = await asyncio.gather(
+                summarizer.summarize([_headline(1), _headline(2)]), summarizer.summarize([_headline(2), _headline(1)])
+            )
+            return openai, results
+
+        openai, (first, second) = asyncio.run(scenario())
+        self.assertEqual(len(openai.prompts), 2)
+        self.assertEqual(first, second[::-1])
+
+    def test_budget_keeps_top_headlines_and_failures_are_retried_later(self):
+        async def scenario():
+            openai = FakeOpenAI(fail={"Headline 1"})
+            summarizer = HeadlineSummarizer(openai, MemoryLRU(), token_budget=200)
+            with self.assertLogs("thejamesroll-bot", level="ERROR"):
+                first = await summarizer.summarize([_headline(number) for number in range(1, 6)])
+            openai.fail = set()
+            second = await summarizer.summarize([_headline(1)])
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertIsNone(first[0])
+        self.assertEqual(first[1], "Summary of Headline 2.")
+        self.assertEqual(first[2:], [None, None, None])
+        self.assertEqual(second, ["Summary of Headline 1."])
+
+    def test_prefetch_fills_the_cache_through_the_batch_api(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            summarizer = HeadlineSummarizer(openai, MemoryLRU(), token_budget=10_000)
+            await summarizer.summarize([_headline(1)])
+            self.assertEqual(await summarizer.prefetch([_headline(1), _headline(2), _headline(3)]), 2)
+            # Still waiting on the batch: nothing is queued twice.
+            self.assertEqual(await summarizer.prefetch([_headline(2), _headline(3)]), 0)
+
+            for prompt, custom_id, callback in openai.batched:
+                title = prompt.splitlines()[1]
+                error = "rate limited" if title == "Headline 3" else None
+                await callback(BatchResult(custom_id, text=f"Batched {title}.", error=error))
+
+            asked = len(openai.prompts)
+            with self.assertNoLogs("thejamesroll-bot", level="ERROR"):
+                digest = await summarizer.summarize([_headline(1), _headline(2), _headline(3)])
+            return openai, asked, digest
+
+        with self.assertLogs("thejamesroll-bot", level="WARNING"):
+            openai, asked, digest = asyncio.run(scenario())
+        self.assertEqual(len(openai.batched), 2)
+        self.assertTrue(all(custom_id.startswith("headline-") for _, custom_id, _ in openai.batched))
+        self.assertEqual(digest, ["Summary of Headline 1.", "Batched Headline 2.", "Summary of Headline 3."])
+        # Only the article the batch failed on went through the interactive API at digest time.
+        self.assertEqual(len(openai.prompts) - asked, 1)
+
+
+class FinanceHeadlineTests(unittest.TestCase):
+    def test_parse_headlines_keeps_guid_and_plain_snippet(self):
+        feed = (
+            "<rss><channel><item><title>Fed holds rates</title><link>https://example.com/fed</link>"
+            "<guid>SB123</guid><description>&lt;p&gt;Officials  signaled&lt;/p&gt; patience.</description>"
+            "</item></channel></rss>"
+        )
+        (headline,) = FinanceCog._parse_headlines(feed)
+        self.assertEqual(headline["guid"], "SB123")
+        self.assertEqual(headline["snippet"], "Officials signaled patience.")
+
+    def test_recap_section_fits_one_embed_field(self):
+        news = [dict(_headline(number), summary="x" * 300) for number in range(5)]
+        news[0]["summary"] = None
+        recap = FinanceCog._recap_section(news)
+        self.assertLessEqual(len(recap), 1024)
+        self.assertNotIn("Headline 0", recap)
+        self.assertIn("Headline 1", recap)
+        self.assertIsNone(FinanceCog._recap_section([_headline(1)]))
+
+    def test_recap_is_measured_in_discord_units(self):
+        news = [dict(_headline(number), summary="📈" * 300) for number in range(3)]
+        recap = FinanceCog._recap_section(news)
+        self.assertLessEqual(discord_len(recap), 1024)
+        self.assertEqual(recap.count("•"), 1)
+
+    def test_digest_recap_yields_to_the_embed_total(self):
+        def cog(econ_line_length: int):
+            return SimpleNamespace(
+                bot=SimpleNamespace(settings=SimpleNamespace(alpha_vantage_api_key=None, finnhub_api_key="key")),
+                _fetch_news_with_summaries=AsyncMock(
+                    return_value=[dict(_headline(number), summary="s" * 300) for number in range(3)]
+                ),
+                _fetch_econ_calendar=AsyncMock(return_value=["e" * econ_line_length] * 5),
+                _recap_section=FinanceCog._recap_section,
+                _card_section=lambda: "c" * 1000,
+            )
+
+        roomy = asyncio.run(FinanceCog._build_digest_embed(cog(100)))
+        self.assertEqual(roomy.fields[2].name, "🧠 What Happened This Week")
+        self.assertEqual(roomy.fields[2].value.count("•"), 3)
+
+        # Five long calendar lines leave room for one summary line, not three.
+        tight = asyncio.run(FinanceCog._build_digest_embed(cog(850)))
+        self.assertEqual(tight.fields[2].value.count("•"), 1)
+        self.assertLessEqual(len(tight), 6000)
+        self.assertEqual(tight.fields[-1].name, "💳 Chase Bonus Categories")
+
+        # With no room for even one line the recap is left out.
+        full = asyncio.run(FinanceCog._build_digest_embed(cog(900)))
+        self.assertNotIn("🧠 What Happened This Week", [field.name for field in full.fields])
+        self.assertLessEqual(len(full), 6000)
+
+    def test_failed_recap_still_returns_the_headlines(self):
+        news = [_headline(1), _headline(2)]
+        cog = SimpleNamespace(
+            _fetch_news=AsyncMock(return_value=news),
+            headline_summarizer=SimpleNamespace(summarize=AsyncMock(side_effect=ConnectionError("cache down"))),
+        )
+
+        with self.assertLogs("cogs.finance", level="ERROR"):
+            result = asyncio.run(FinanceCog._fetch_news_with_summaries(cog))
+
+        self.assertEqual([headline["title"] for headline in result], ["Headline 1", "Headline 2"])
+        self.assertTrue(all("summary" not in headline for headline in result))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+
+from services import http_service
+
+
+class NetworkProfileTests(unittest.TestCase):
+    def test_upstream_timeout_falls_back_to_parent_name(self):
+        profile = http_service.get_network_profile("tuned")
+
+        self.assertEqual(
+            profile.timeout_for("google.translate", 30), aiohttp.ClientTimeout(total=30, connect=5, sock_read=10)
+        )
+        self.assertIsNone(profile.timeout_for("example.com", 30))
+        self.assertEqual(http_service.timeout_kwargs(SimpleNamespace(), "google"), {})
+
+    def test_upstream_totals_follow_the_configured_timeout(self):
+        profile = http_service.get_network_profile("tuned")
+        bot = SimpleNamespace(network_profile=profile, settings=SimpleNamespace(http_timeout_seconds=8))
+
+        (timeout,) = http_service.timeout_kwargs(bot, "alphavantage").values()
+        self.assertEqual((timeout.total, timeout.connect, timeout.sock_read), (8, 5, 8))
+        self.assertEqual(http_service.timeout_kwargs(bot, "example.com"), {})
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(RuntimeError):
+            http_service.get_network_profile("fast")
+
+    def test_session_uses_profile_connector_and_timeouts(self):
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/slow", self._slow)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            profile = http_service.NetworkProfile(
+                "test",
+                limit_per_host=2,
+                dns_cache_ttl=300,
+                sock_read_timeout=5,
+                upstream_timeouts={"local.slow": aiohttp.ClientTimeout(sock_read=0.05)},
+            )
+            session = http_service.create_session(profile, 30)
+            bot = SimpleNamespace(
+                http_session=session, network_profile=profile, settings=SimpleNamespace(http_timeout_seconds=30)
+            )
+            try:
+                self.assertEqual(session.connector.limit_per_host, 2)
+                self.assertEqual(session.timeout.sock_read, 5)
+                with self.assertRaises(asyncio.TimeoutError):
+                    await http_service.get_json(bot, f"http://127.0.0.1:{port}/slow", upstream="local.slow")
+            finally:
+                await session.close()
+                await runner.cleanup()
+
+        asyncio.run(scenario())
+
+    @staticmethod
+    async def _slow(request: web.Request) -> web.Response:
+        await asyncio.sleep(0.5)
+        return web.json_response({})
+
+
+if __name__ == "__main__":
+    unittest.main()
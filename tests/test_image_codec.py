@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services import image_codec
+from services.image_codec import ImageTranscoder, create_transcoder, file_extension
+
+
+def _settings(target, quality=85):
+    return SimpleNamespace(image_transcode_format=target, image_transcode_quality=quality)
+
+
+class ImageTranscoderTests(unittest.TestCase):
+    def transcode(self, encode, data=b"p" * 100):
+        transcoder = ImageTranscoder("webp", 80)
+        # A thread pool keeps the patched encoder visible; the real pool spawns fresh processes.
+        transcoder._pool = ThreadPoolExecutor(1)
+        try:
+            with patch.object(image_codec, "_encode", encode):
+                return asyncio.run(transcoder.transcode(data, "image/png"))
+        finally:
+            transcoder.close()
+
+    def test_smaller_encoding_replaces_original(self):
+        data, mime_type = self.transcode(lambda data, image_format, quality: b"w" * 40)
+        self.assertEqual((data, mime_type), (b"w" * 40, "image/webp"))
+        self.assertEqual(file_extension(mime_type), "webp")
+
+    def test_original_kept_when_encoding_is_not_smaller_or_fails(self):
+        original = b"p" * 100
+        data, mime_type = self.transcode(lambda data, image_format, quality: b"w" * 120, original)
+        self.assertIs(data, original)
+        self.assertEqual(mime_type, "image/png")
+
+        def broken(data, image_format, quality):
+            raise OSError("cannot identify image file")
+
+        with self.assertLogs("thejamesroll-bot", level="ERROR"):
+            data, mime_type = self.transcode(broken, original)
+        self.assertIs(data, original)
+
+    @unittest.skipIf(importlib.util.find_spec("PIL") is None, "Pillow is not installed")
+    def test_encodes_png_as_jpeg(self):
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGBA", (64, 64), (255, 0, 0, 128)).save(buffer, format="PNG")
+        encoded = image_codec._encode(buffer.getvalue(), "JPEG", 80)
+        self.assertTrue(encoded.startswith(b"\xff\xd8"))
+
+
+class CreateTranscoderTests(unittest.TestCase):
+    def test_disabled_unknown_and_missing_pillow(self):
+        self.assertIsNone(create_transcoder(_settings("png")))
+        self.assertIsNone(create_transcoder(_settings("")))
+        with self.assertRaises(RuntimeError):
+            create_transcoder(_settings("gif"))
+        with patch.object(image_codec.importlib.util, "find_spec", return_value=None):
+            with self.assertLogs("thejamesroll-bot", level="WARNING"):
+                self.assertIsNone(create_transcoder(_settings("webp")))
+
+    def test_builds_transcoder_when_pillow_is_available(self):
+        with patch.object(image_codec.importlib.util, "find_spec", return_value=object()):
+            transcoder = create_transcoder(_settings("jpeg", 70))
+        self.assertEqual((transcoder.mime_type, transcoder.quality), ("image/jpeg", 70))
+
+
+if __name__ == "__main__":
+    unittest.main()
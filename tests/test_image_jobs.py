@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.image_jobs import ImageDiskCache, ImageJobQueue, ImageRequest, ImageService, image_cache_key
+
+
+class ImageDiskCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_by_size(self):
+        async def scenario(root: Path):
+            cache = ImageDiskCache(root, max_bytes=25)
+            await cache.put("aa01", b"x" * 10)
+            await cache.put("bb02", b"y" * 10)
+            await asyncio.sleep(0.01)
+            self.assertEqual(await cache.get("aa01"), b"x" * 10)
+            await cache.put("cc03", b"z" * 10)
+
+            self.assertIsNone(await cache.get("bb02"))
+            self.assertEqual(await cache.get("aa01"), b"x" * 10)
+            self.assertEqual(cache.total_bytes, 20)
+            self.assertFalse((root / "bb" / "bb02.png").exists())
+
+            # A fresh instance rebuilds its index from the files left on disk.
+            reopened = ImageDiskCache(root, max_bytes=25)
+            self.assertEqual(await reopened.get("cc03"), b"z" * 10)
+            self.assertEqual(reopened.total_bytes, 20)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(scenario(Path(tmp)))
+
+    def test_key_ignores_case_and_spacing(self):
+        self.assertEqual(image_cache_key("m", "A  red\tfox "), image_cache_key("m", "a red fox"))
+        self.assertNotEqual(image_cache_key("m", "a red fox"), image_cache_key("other", "a red fox"))
+        self.assertNotEqual(image_cache_key("m", "a red fox"), image_cache_key("m", "a red fox", variant=1))
+        self.assertNotEqual(image_cache_key("m", "a red fox"), image_cache_key("m", "a red fox", size="1536x1024"))
+
+
+class ImageJobQueueTests(unittest.TestCase):
+    def test_guilds_take_turns_and_positions_follow_dispatch_order(self):
+        async def scenario():
+            started: list[str] = []
+            release = asyncio.Event()
+
+            async def generate(request):
+                started.append(request.prompt)
+                await release.wait()
+                return [{"kind": "url", "value": request.prompt}]
+
+            queue = ImageJobQueue(generate, workers=1)
+            jobs = [await queue.submit(1, ImageRequest(name, "m")) for name in ("a1", "a2", "a3")]
+            jobs.append(await queue.submit(2, ImageRequest("b1", "m")))
+            self.assertEqual([queue.position(job) for job in jobs], [1, 3, 4, 2])
+
+            queue.start()
+            release.set()
+            try:
+                results = await asyncio.gather(*(job.future for job in jobs))
+            finally:
+                await queue.stop()
+            self.assertEqual(started, ["a1", "b1", "a2", "a3"])
+            self.assertEqual([result[0]["value"] for result in results], ["a1", "a2", "a3", "b1"])
+            self.assertEqual(queue.pending, 0)
+
+        asyncio.run(scenario())
+
+    def test_cancelled_jobs_are_skipped(self):
+        async def scenario():
+            started: list[str] = []
+
+            async def generate(request):
+                started.append(request.prompt)
+                return [{"kind": "url", "value": request.prompt}]
+
+            queue = ImageJobQueue(generate, workers=1)
+            dropped = await queue.submit(1, ImageRequest("dropped", "m"))
+            kept = await queue.submit(1, ImageRequest("kept", "m"))
+            dropped.future.cancel()
+            queue.start()
+            try:
+                await kept.future
+            finally:
+                await queue.stop()
+            self.assertEqual(started, ["kept"])
+
+        asyncio.run(scenario())
+
+
+class ImageServiceTests(unittest.TestCase):
+    def test_repeated_prompt_is_served_from_cache(self):
+        async def scenario(root: Path):
+            calls = []
+
+            async def generate(request):
+                calls.append(request)
+                return [
+                    {"kind": "bytes", "value": f"call{len(calls)}-{variant}".encode(), "mime_type": "image/png"}
+                    for variant in range(request.n)
+                ]
+
+            service = ImageService(generate, ImageDiskCache(root, max_bytes=1024), workers=1)
+            service.start()
+            try:
+                self.assertIsNone(await service.cached(ImageRequest("A red fox", "m", n=2)))
+                job = await service.submit(1, ImageRequest("A red fox", "m", n=2))
+                await job.future
+                cached = await service.cached(ImageRequest("a red  fox", "m", n=2))
+                # Asking for more variants than were generated is a miss.
+                self.assertIsNone(await service.cached(ImageRequest("a red fox", "m", n=3)))
+
+                # Regenerations never overwrite the cached variants.
+                job = await service.submit(1, ImageRequest("a red fox", "m", cache=False))
+                await job.future
+                again = await service.cached(ImageRequest("a red fox", "m", n=2))
+            finally:
+                await service.stop()
+            self.assertEqual(len(calls), 2)
+            self.assertEqual([image["value"] for image in cached], [b"call1-0", b"call1-1"])
+            self.assertEqual([image["value"] for image in again], [b"call1-0", b"call1-1"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(scenario(Path(tmp)))
+
+
+if __name__ == "__main__":
+    unittest.main()
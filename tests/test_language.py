@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import unittest
+
+from utils.language import looks_like_language
+
+
+class LooksLikeLanguageTests(unittest.TestCase):
+    def test_latin_languages_use_stopwords(self):
+        self.assertTrue(looks_like_language("I think the movie was great", "en"))
+        self.assertFalse(looks_like_language("Creo que la película fue genial", "en"))
+        self.assertTrue(looks_like_language("Creo que la película fue genial", "es"))
+
+    def test_script_languages(self):
+        self.assertTrue(looks_like_language("今日はいい天気ですね", "ja"))
+        self.assertFalse(looks_like_language("今日はいい天気ですね", "zh-CN"))
+        self.assertTrue(looks_like_language("Привет, как дела?", "ru"))
+        self.assertFalse(looks_like_language("hello there friend", "ko"))
+
+    def test_text_without_letters_needs_no_translation(self):
+        self.assertTrue(looks_like_language("😂 123 !!", "fr"))
+
+    def test_unknown_language_is_never_skipped(self):
+        self.assertFalse(looks_like_language("the cat is here", "sw"))
+
+
+if __name__ == "__main__":
+    unittest.main()
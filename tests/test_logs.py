@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import threading
+import unittest
+from types import SimpleNamespace
+
+from utils.logs import (
+    LOG_RECORDS_SUPPRESSED_TOTAL,
+    RepeatFilter,
+    start_queue_logging,
+    stop_queue_logging,
+)
+from utils.tracing import trace_interaction
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _record(msg="Lookup failed for %s", args=("x",), level=logging.ERROR, name="thejamesroll-bot"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class RepeatFilterTests(unittest.TestCase):
+    def test_bursts_are_sampled_and_report_what_was_dropped(self):
+        repeat = RepeatFilter(burst=2, sample_every=3, clock=_Clock())
+        before = LOG_RECORDS_SUPPRESSED_TOTAL.get(logger="test-repeat")
+
+        passed = [
+            record for record in (_record(args=(n,), name="test-repeat") for n in range(8)) if repeat.filter(record)
+        ]
+
+        # Two pass, then one in every three: records 1, 2, 5 and 8.
+        self.assertEqual([record.args[0] for record in passed], [0, 1, 4, 7])
+        self.assertEqual([record.suppressed for record in passed], [0, 0, 2, 2])
+        self.assertEqual(LOG_RECORDS_SUPPRESSED_TOTAL.get(logger="test-repeat") - before, 4)
+
+    def test_window_resets_and_other_messages_are_independent(self):
+        clock = _Clock()
+        repeat = RepeatFilter(window=60, burst=1, sample_every=100, clock=clock)
+
+        self.assertTrue(repeat.filter(_record()))
+        self.assertFalse(repeat.filter(_record()))
+        self.assertTrue(repeat.filter(_record(msg="Something else")))
+        self.assertTrue(repeat.filter(_record(level=logging.INFO)))
+        self.assertTrue(repeat.filter(_record(level=logging.INFO)))
+
+        clock.now = 61
+        record = _record()
+        self.assertTrue(repeat.filter(record))
+        self.assertEqual(record.suppressed, 1)
+
+
+class QueueLoggingTests(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self._saved = (root.handlers[:], root.level)
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        stop_queue_logging()
+        root = logging.getLogger()
+        root.handlers[:] = self._saved[0]
+        root.setLevel(self._saved[1])
+
+    def _lines(self):
+        stop_queue_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_records_carry_trace_context_and_tracebacks(self):
+        start_queue_logging(stream=self.stream)
+        logger = logging.getLogger("thejamesroll-bot.test")
+        interaction = SimpleNamespace(id=31, guild_id=77, command=SimpleNamespace(qualified_name="eats"))
+
+        with trace_interaction(interaction):
+            try:
+                raise ValueError("bad zip")
+            except ValueError:
+                logger.exception("Search failed for %s", "tacos")
+        logger.info("outside")
+
+        failed, outside = self._lines()
+        self.assertEqual(failed["message"], "Search failed for tacos")
+        self.assertEqual((failed["interaction_id"], failed["guild_id"], failed["command"]), (31, 77, "eats"))
+        self.assertIn("ValueError: bad zip", failed["exc"])
+        self.assertEqual(outside["level"], "INFO")
+        self.assertNotIn("command", outside)
+
+    def test_writing_happens_on_the_listener_thread(self):
+        class RecordingStream(io.StringIO):
+            def write(self, text):
+                threads.add(threading.current_thread())
+                return super().write(text)
+
+        threads = set()
+        self.stream = RecordingStream()
+        start_queue_logging(stream=self.stream, json_output=False)
+        logging.getLogger("thejamesroll-bot.test").warning("queued")
+
+        stop_queue_logging()
+        self.assertIn("[WARNING] thejamesroll-bot.test: queued", self.stream.getvalue())
+        self.assertNotIn(threading.current_thread(), threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import traceback
+import unittest
+from pathlib import Path
+
+from utils.loop_watchdog import BlockReport, LoopWatchdog
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _blocking_helper(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def _run_watched(coro_factory, threshold: float = 0.05):
+    watchdog = LoopWatchdog(asyncio.get_running_loop(), threshold_seconds=threshold, interval_seconds=0.01)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.02)
+        await coro_factory()
+        await asyncio.sleep(0.02)
+    finally:
+        watchdog.stop()
+    return list(watchdog.reports)
+
+
+class LoopWatchdogTests(unittest.TestCase):
+    def test_blocking_call_is_reported_with_its_stack(self):
+        async def blocker():
+            _blocking_helper(0.2)
+
+        reports = asyncio.run(_run_watched(blocker))
+
+        self.assertEqual(len(reports), 1)
+        self.assertGreaterEqual(reports[0].blocked_for, 0.05)
+        self.assertIn("_blocking_helper", reports[0].format())
+
+    def test_awaiting_does_not_count_as_blocking(self):
+        async def sleeper():
+            await asyncio.sleep(0.2)
+
+        self.assertEqual(asyncio.run(_run_watched(sleeper)), [])
+
+    def test_watched_frames_only_match_cogs_and_services(self):
+        stack = [
+            traceback.FrameSummary(str(_REPO_ROOT / "utils" / "presentation.py"), 10, "run_interaction_task"),
+            traceback.FrameSummary(str(_REPO_ROOT / "services" / "google_places.py"), 20, "geocode_city"),
+            traceback.FrameSummary("cogs/fun.py", 30, "add"),
+            traceback.FrameSummary("/usr/lib/python3/json/decoder.py", 40, "decode"),
+        ]
+        report = BlockReport(0.2, stack)
+
+        self.assertEqual([frame.name for frame in report.watched_frames()], ["geocode_city", "add"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import aiohttp
+
+from utils.metrics import MetricsRegistry, MetricsServer
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_render_counter_gauge_and_histogram(self):
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests.", ("command",))
+        requests.inc(command="eats")
+        requests.inc(2, command="eats")
+        registry.gauge("cache_entries", "Entries.").set_function(lambda: 7)
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = registry.render()
+
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{command="eats"} 3', text)
+        self.assertIn("cache_entries 7", text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_count 3", text)
+
+    def test_registering_twice_returns_the_same_metric(self):
+        registry = MetricsRegistry()
+        first = registry.counter("hits_total", "Hits.")
+        self.assertIs(registry.counter("hits_total", "Hits."), first)
+        with self.assertRaises(ValueError):
+            registry.gauge("hits_total", "Hits.")
+
+    def test_wrong_labels_are_rejected(self):
+        counter = MetricsRegistry().counter("calls_total", "Calls.", ("upstream",))
+        with self.assertRaises(ValueError):
+            counter.inc(command="eats")
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("odd_total", "Odd.", ("name",)).inc(name='say "hi"\n')
+        self.assertIn('odd_total{name="say \\"hi\\"\\n"} 1', registry.render())
+
+
+class MetricsServerTests(unittest.TestCase):
+    def test_scrape_local_endpoint(self):
+        registry = MetricsRegistry()
+        registry.counter("scrapes_total", "Scrapes.").inc()
+        server = MetricsServer(registry, port=0)
+
+        async def run():
+            port = await server.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                        return response.status, response.headers["Content-Type"], await response.text()
+            finally:
+                await server.stop()
+
+        status, content_type, body = asyncio.run(run())
+        self.assertEqual(status, 200)
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIn("scrapes_total 1", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services.openai_batch import _MAX_POLL_FAILURES, ChatBatcher, parse_batch_output
+from services.openai_service import OpenAIService
+
+
+class FakeBatchAPI:
+    """In-memory stand-in for the files and batches endpoints.
+
+    Each batch reports ``in_progress`` for ``polls_until_done`` polls, then completes: requests
+    whose prompt contains "fail" land in the error file, the rest are echoed back.
+    """
+
+    def __init__(self, *, polls_until_done: int = 2, final_status: str = "completed") -> None:
+        self.polls_until_done = polls_until_done
+        self.final_status = final_status
+        self.file_store: dict[str, str] = {}
+        self.batch_store: dict[str, dict] = {}
+        self.uploads: list[list[dict]] = []
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    async def _create_file(self, *, file, purpose):
+        assert purpose == "batch"
+        name, data = file
+        file_id = f"file-{len(self.file_store) + 1}"
+        self.file_store[file_id] = data.decode("utf-8")
+        self.uploads.append([json.loads(line) for line in self.file_store[file_id].splitlines()])
+        return SimpleNamespace(id=file_id)
+
+    async def _file_content(self, file_id):
+        return SimpleNamespace(text=self.file_store[file_id])
+
+    async def _create_batch(self, *, input_file_id, endpoint, completion_window):
+        batch_id = f"batch-{len(self.batch_store) + 1}"
+        self.batch_store[batch_id] = {"input": input_file_id, "polls": 0}
+        return SimpleNamespace(id=batch_id, status="validating")
+
+    def _store(self, lines: list[dict]) -> str | None:
+        if not lines:
+            return None
+        file_id = f"file-{len(self.file_store) + 1}"
+        self.file_store[file_id] = "\n".join(json.dumps(line) for line in lines) + "\n"
+        return file_id
+
+    async def _retrieve_batch(self, batch_id):
+        state = self.batch_store[batch_id]
+        state["polls"] += 1
+        if state["polls"] < self.polls_until_done:
+            return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None, error_file_id=None)
+        if self.final_status != "completed":
+            return SimpleNamespace(id=batch_id, status=self.final_status, output_file_id=None, error_file_id=None)
+
+        output, errors = [], []
+        for request in (json.loads(line) for line in self.file_store[state["input"]].splitlines()):
+            prompt = request["body"]["messages"][-1]["content"]
+            if "fail" in prompt:
+                errors.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 400, "body": {"error": {"message": "bad request"}}},
+                        "error": None,
+                    }
+                )
+            else:
+                body = {
+                    "choices": [{"message": {"content": f"echo: {prompt}"}}],
+                    "usage": {"prompt_tokens": 7, "completion_tokens": 3},
+                }
+                output.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}})
+        return SimpleNamespace(
+            id=batch_id, status="completed", output_file_id=self._store(output), error_file_id=self._store(errors)
+        )
+
+
+def _body(prompt: str) -> dict:
+    return {"model": "m", "messages": [{"role": "user", "content": prompt}], "max_tokens": 10}
+
+
+class ChatBatcherTests(unittest.TestCase):
+    def test_jobs_in_one_window_share_a_batch_and_reach_callbacks(self):
+        async def scenario():
+            api = FakeBatchAPI()
+            usage = []
+            batcher = ChatBatcher(
+                lambda: api, flush_seconds=0.01, poll_seconds=0.001, on_usage=lambda *tokens: usage.append(tokens)
+            )
+            seen = []
+
+            async def on_result(result):
+                seen.append(result.custom_id)
+
+            first = batcher.submit(_body("one"), custom_id="a", callback=on_result)
+            second = batcher.submit(_body("two"), custom_id="b", callback=seen.append)
+            broken = batcher.submit(_body("please fail"), custom_id="c")
+            self.assertEqual(batcher.queued, 3)
+            results = await asyncio.gather(first, second, broken)
+            await batcher.close()
+            return api, results, seen, usage
+
+        api, (first, second, broken), seen, usage = asyncio.run(scenario())
+        self.assertEqual(len(api.uploads), 1)
+        self.assertEqual([line["custom_id"] for line in api.uploads[0]], ["a", "b", "c"])
+        self.assertEqual(api.uploads[0][0]["url"], "/v1/chat/completions")
+        self.assertEqual(first.text, "echo: one")
+        self.assertEqual((first.prompt_tokens, first.completion_tokens), (7, 3))
+        self.assertEqual(second.text, "echo: two")
+        self.assertFalse(broken.ok)
+        self.assertEqual(broken.error, "bad request")
+        self.assertEqual(sorted(item if isinstance(item, str) else item.custom_id for item in seen), ["a", "b"])
+        self.assertEqual(usage, [(7, 3), (7, 3)])
+
+    def test_full_batch_is_sent_without_waiting_and_ids_are_shared(self):
+        async def scenario():
+            api = FakeBatchAPI(polls_until_done=1)
+            batcher = ChatBatcher(lambda: api, flush_seconds=60, poll_seconds=0.001, max_jobs=2)
+            same = [batcher.submit(_body("x"), custom_id="digest:1"), batcher.submit(_body("x"), custom_id="digest:1")]
+            self.assertIs(same[0], same[1])
+            other = batcher.submit(_body("y"), custom_id="digest:2")
+            results = await asyncio.wait_for(asyncio.gather(*same, other), timeout=1)
+            await batcher.close()
+            return api, results
+
+        api, results = asyncio.run(scenario())
+        self.assertEqual(len(api.uploads), 1)
+        self.assertEqual([result.text for result in results], ["echo: x", "echo: x", "echo: y"])
+
+    def test_reusing_a_queued_id_for_another_request_is_an_error(self):
+        async def scenario():
+            batcher = ChatBatcher(lambda: FakeBatchAPI(), flush_seconds=60)
+            batcher.submit(_body("x"), custom_id="digest:1")
+            with self.assertRaises(ValueError):
+                batcher.submit(_body("y"), custom_id="digest:1")
+            self.assertEqual(batcher.queued, 1)
+            await batcher.close()
+
+        asyncio.run(scenario())
+
+    def test_failed_batch_fails_every_job(self):
+        async def scenario():
+            api = FakeBatchAPI(final_status="expired")
+            batcher = ChatBatcher(lambda: api, flush_seconds=0, poll_seconds=0.001)
+            future = batcher.submit(_body("one"))
+            with self.assertLogs("thejamesroll-bot", level="ERROR"):
+                result = await future
+            await batcher.close()
+            return result
+
+        result = asyncio.run(scenario())
+        self.assertFalse(result.ok)
+        self.assertIn("expired", result.error)
+
+    def test_transient_poll_failures_are_retried(self):
+        async def scenario():
+            api = FakeBatchAPI(polls_until_done=3)
+            retrieve = api.batches.retrieve
+            calls = 0
+
+            async def flaky(batch_id):
+                nonlocal calls
+                calls += 1
+                if calls in (1, 3):
+                    raise ConnectionResetError("reset by peer")
+                return await retrieve(batch_id)
+
+            api.batches.retrieve = flaky
+            batcher = ChatBatcher(lambda: api, flush_seconds=0, poll_seconds=0.001)
+            future = batcher.submit(_body("one"))
+            with self.assertLogs("thejamesroll-bot", level="WARNING") as logs:
+                result = await future
+            await batcher.close()
+            return result, logs.output
+
+        result, output = asyncio.run(scenario())
+        self.assertEqual(result.text, "echo: one")
+        self.assertEqual(sum(line.startswith("WARNING") for line in output), 2)
+
+    def test_repeated_poll_failures_fail_the_jobs(self):
+        async def scenario():
+            api = FakeBatchAPI()
+
+            async def down(batch_id):
+                raise TimeoutError("upstream timed out")
+
+            api.batches.retrieve = down
+            batcher = ChatBatcher(lambda: api, flush_seconds=0, poll_seconds=0.0001)
+            future = batcher.submit(_body("one"))
+            with self.assertLogs("thejamesroll-bot", level="WARNING") as logs:
+                result = await future
+            await batcher.close()
+            return result, logs.output
+
+        result, output = asyncio.run(scenario())
+        self.assertFalse(result.ok)
+        self.assertEqual(sum(line.startswith("WARNING") for line in output), _MAX_POLL_FAILURES - 1)
+
+    def test_close_cancels_queued_and_running_jobs(self):
+        async def scenario():
+            api = FakeBatchAPI(polls_until_done=10_000)
+            batcher = ChatBatcher(lambda: api, flush_seconds=0, poll_seconds=0.001)
+            running = batcher.submit(_body("one"))
+            await asyncio.sleep(0.02)
+            batcher.flush_seconds = 60
+            queued = batcher.submit(_body("two"))
+            await batcher.close()
+            return running, queued
+
+        running, queued = asyncio.run(scenario())
+        self.assertTrue(running.cancelled())
+        self.assertTrue(queued.cancelled())
+
+    def test_parse_batch_output_reads_request_level_errors(self):
+        line = json.dumps({"custom_id": "a", "response": None, "error": {"code": "x", "message": "expired"}})
+        self.assertEqual(parse_batch_output(line)["a"].error, "expired")
+
+
+class AskBatchedTests(unittest.TestCase):
+    def test_ask_batched_builds_a_chat_request(self):
+        async def scenario():
+            api = FakeBatchAPI(polls_until_done=1)
+            service = OpenAIService(
+                SimpleNamespace(openai_api_key="test", default_chat_model="gpt-4.1-mini", openai_timeout_seconds=1)
+            )
+            with patch.object(OpenAIService, "_client", api):
+                service.batch.flush_seconds = 0
+                service.batch.poll_seconds = 0.001
+                result = await service.ask_batched("hello", system_prompt="Be brief.", max_tokens=50)
+                await service.close()
+            return api, result
+
+        api, result = asyncio.run(scenario())
+        body = api.uploads[0][0]["body"]
+        self.assertEqual(body["model"], "gpt-4.1-mini")
+        self.assertEqual(body["max_tokens"], 50)
+        self.assertTrue(body["messages"][0]["content"].startswith("Be brief."))
+        self.assertEqual(result.text, "echo: hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import binascii
+import threading
 import unittest
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
@@ -16,8 +18,8 @@ class DummySettings:
     image_timeout_seconds = 1
 
 
-def _image_response(url=None, b64_json=None):
-    return SimpleNamespace(data=[SimpleNamespace(url=url, b64_json=b64_json)])
+def _image_response(url=None, b64_json=None, *, n=1):
+    return SimpleNamespace(data=[SimpleNamespace(url=url, b64_json=b64_json) for _ in range(n)])
 
 
 def _chat_response(content: str):
@@ -47,6 +49,35 @@ class OpenAIServiceTests(unittest.TestCase):
             with self.assertRaises(RuntimeError):
                 asyncio.run(service.generate_image("a cat"))
 
+    def test_generate_images_requests_all_variants_in_one_call(self):
+        service = OpenAIService(DummySettings())
+        generate = AsyncMock(return_value=_image_response(b64_json="aGVsbG8=", n=3))
+        with patch.object(service._client.images, "generate", generate):
+            results = asyncio.run(service.generate_images("a cat", n=3, size="1536x1024"))
+        generate.assert_awaited_once()
+        self.assertEqual(generate.await_args.kwargs["n"], 3)
+        self.assertEqual(generate.await_args.kwargs["size"], "1536x1024")
+        self.assertEqual([result["value"] for result in results], [b"hello"] * 3)
+
+    def test_images_are_decoded_off_the_event_loop(self):
+        service = OpenAIService(DummySettings())
+        threads = []
+        a2b_base64 = binascii.a2b_base64
+
+        def decode(data):
+            threads.append(threading.get_ident())
+            return a2b_base64(data)
+
+        async def scenario():
+            with patch("services.openai_service.binascii.a2b_base64", decode):
+                await service.generate_images("a cat", n=2)
+            return threading.get_ident()
+
+        with patch.object(service._client.images, "generate", AsyncMock(return_value=_image_response(b64_json="aGVsbG8=", n=2))):
+            loop_thread = asyncio.run(scenario())
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
     def test_ask_returns_message_content(self):
         service = OpenAIService(DummySettings())
         with patch.object(service._client.chat.completions, "create", AsyncMock(return_value=_chat_response("hello there"))):
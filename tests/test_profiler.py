@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import signal
+import time
+import unittest
+
+from cogs.debug import build_profile_embed
+from utils.profiler import is_profiling, profile_loop
+
+
+async def _busy_worker(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        end = time.perf_counter() + 0.002
+        while time.perf_counter() < end:
+            pass
+        await asyncio.sleep(0)
+
+
+async def _waiter(stop: asyncio.Event) -> None:
+    await stop.wait()
+
+
+class ProfilerTests(unittest.TestCase):
+    def test_profile_attributes_samples_to_running_coroutines(self):
+        async def run():
+            stop = asyncio.Event()
+            workers = [asyncio.create_task(_busy_worker(stop)) for _ in range(2)]
+            waiter = asyncio.create_task(_waiter(stop))
+            result = await profile_loop(0.3, interval=0.002)
+            stop.set()
+            await asyncio.gather(*workers, waiter)
+            return result
+
+        result = asyncio.run(run())
+
+        self.assertGreater(result.samples, 10)
+        self.assertEqual(result.top_tasks(1)[0][0], "_busy_worker")
+        self.assertEqual(result.task_counts["_busy_worker"], 2)
+        self.assertIn("test_profiler:_busy_worker", result.collapsed())
+
+        # The waiter never holds the loop, but its wall time shows up where it is suspended.
+        self.assertNotIn("_waiter", result.task_samples)
+        self.assertGreater(dict(result.top_awaits())["locks:Event.wait"], 0.2)
+        self.assertNotIn("profiler:profile_loop", result.collapsed_tasks())
+        self.assertIn("_waiter;test_profiler:_waiter;locks:Event.wait", result.collapsed_tasks())
+
+        embed = build_profile_embed(result)
+        self.assertIn("_busy_worker", embed.fields[0].value)
+        self.assertIn("Event.wait", embed.fields[1].value)
+
+    def test_overlapping_profiles_are_rejected(self):
+        handler = signal.getsignal(signal.SIGALRM)
+
+        async def run():
+            first = asyncio.create_task(profile_loop(0.05, interval=0.002))
+            await asyncio.sleep(0)
+            self.assertTrue(is_profiling())
+            with self.assertRaises(RuntimeError):
+                await profile_loop(0.05)
+            result = await first
+            return result
+
+        result = asyncio.run(run())
+        self.assertGreater(result.samples, 0)
+        self.assertFalse(is_profiling())
+        self.assertIs(signal.getsignal(signal.SIGALRM), handler)
+
+
+if __name__ == "__main__":
+    unittest.main()
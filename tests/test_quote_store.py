@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.quote_store import QuoteStore, build_match_query
+
+
+class QuoteStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_guilds_are_numbered_and_sampled_separately(self):
+        async def scenario():
+            store = QuoteStore(self.dir / "quotes.sqlite3")
+            try:
+                first = await store.add(1, "Hello", "Ann")
+                second = await store.add(1, "Bye", "Bo")
+                other = await store.add(2, "Elsewhere", "Cy")
+                picks = {(await store.get_random(2)).text for _ in range(10)}
+                return first, second, other, await store.count(1), picks, await store.get_random(3)
+            finally:
+                store.close()
+
+        first, second, other, count, picks, missing = asyncio.run(scenario())
+        self.assertEqual((first, second, other, count), (1, 2, 1, 2))
+        self.assertEqual(picks, {"Elsewhere"})
+        self.assertIsNone(missing)
+
+    def test_concurrent_adds_get_distinct_numbers(self):
+        async def scenario():
+            store = QuoteStore(self.dir / "quotes.sqlite3")
+            try:
+                numbers = await asyncio.gather(*(store.add(1, f"quote {i}", "Ann") for i in range(50)))
+                return numbers, await store.count(1)
+            finally:
+                store.close()
+
+        numbers, count = asyncio.run(scenario())
+        self.assertEqual(sorted(numbers), list(range(1, 51)))
+        self.assertEqual(count, 50)
+
+    def test_legacy_json_is_migrated_once_into_the_configured_guild(self):
+        legacy = self.dir / "quotes.json"
+        legacy.write_text(json.dumps([{"text": "Old one", "author": "Ann"}, {"text": "Old two", "author": "Bo"}]))
+
+        store = QuoteStore(self.dir / "quotes.sqlite3", legacy_json=legacy, legacy_guild_id=42)
+        store.close()
+        reopened = QuoteStore(self.dir / "quotes.sqlite3", legacy_json=legacy, legacy_guild_id=42)
+        try:
+            count = asyncio.run(reopened.count(42))
+            first = asyncio.run(reopened.get(42, 1))
+        finally:
+            reopened.close()
+
+        self.assertEqual(count, 2)
+        self.assertEqual((first.text, first.author), ("Old one", "Ann"))
+        self.assertFalse(legacy.exists())
+        self.assertTrue((self.dir / "quotes.json.migrated").exists())
+
+    def test_legacy_json_waits_for_an_explicit_guild(self):
+        legacy = self.dir / "quotes.json"
+        legacy.write_text(json.dumps([{"text": "Old one", "author": "Ann"}]))
+
+        with self.assertLogs("thejamesroll-bot", level="WARNING") as logs:
+            store = QuoteStore(self.dir / "quotes.sqlite3", legacy_json=legacy)
+        try:
+            count = asyncio.run(store.count(0))
+        finally:
+            store.close()
+
+        self.assertIn("QUOTES_MIGRATE_GUILD_ID", logs.output[0])
+        self.assertEqual(count, 0)
+        self.assertTrue(legacy.exists())
+
+
+class QuoteSearchTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "quotes.sqlite3"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_match_query_prefixes_every_word_and_drops_syntax(self):
+        self.assertEqual(build_match_query('Pizza "fri*" OR'), '"pizza"* "fri"* "or"*')
+        self.assertIsNone(build_match_query("  ?! "))
+
+    def test_search_ranks_prefix_matches_and_filters_by_guild_and_author(self):
+        async def scenario():
+            store = QuoteStore(self.path)
+            try:
+                await store.add(1, "Pizza on Friday is the law", "Ann")
+                await store.add(1, "Pizza pizza pizza", "Bo")
+                await store.add(1, "Tacos on Tuesday", "Ann")
+                await store.add(2, "Pizza is overrated", "Cy")
+                return (
+                    await store.search(1, "piz"),
+                    await store.search(1, "pizza fri"),
+                    await store.search(1, "", author="ann"),
+                    await store.search(1, "pizza", author="Ann"),
+                    await store.suggest_terms(1, "Pizza on f"),
+                    await store.suggest_authors(1, "a"),
+                )
+            finally:
+                store.close()
+
+        prefix, both_words, by_author, filtered, terms, authors = asyncio.run(scenario())
+        self.assertEqual([q.text for q in prefix], ["Pizza pizza pizza", "Pizza on Friday is the law"])
+        self.assertEqual([q.number for q in both_words], [1])
+        self.assertEqual([q.text for q in by_author], ["Tacos on Tuesday", "Pizza on Friday is the law"])
+        self.assertEqual([q.author for q in filtered], ["Ann"])
+        self.assertEqual(terms, ["Pizza on friday"])
+        self.assertEqual(authors, ["Ann"])
+
+    def test_existing_store_is_indexed_when_search_is_added(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript(
+            """
+            CREATE TABLE quotes (
+                id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, seq INTEGER NOT NULL, text TEXT NOT NULL,
+                author TEXT NOT NULL, added_by INTEGER, created_at REAL NOT NULL, UNIQUE (guild_id, seq)
+            );
+            CREATE TABLE guild_quote_counts (guild_id INTEGER PRIMARY KEY, count INTEGER NOT NULL);
+            INSERT INTO quotes (guild_id, seq, text, author, created_at) VALUES (1, 1, 'Old wisdom', 'Ann', 0);
+            INSERT INTO guild_quote_counts VALUES (1, 1);
+            """
+        )
+        conn.close()
+
+        store = QuoteStore(self.path)
+        try:
+            self.assertEqual([q.text for q in asyncio.run(store.search(1, "wis"))], ["Old wisdom"])
+        finally:
+            store.close()
+
+    def test_index_without_guild_column_is_rebuilt(self):
+        store = QuoteStore(self.path)
+        asyncio.run(store.add(1, "Old wisdom", "Ann"))
+        store.close()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(
+            """
+            DROP TRIGGER quotes_fts_insert;
+            DROP TABLE quotes_fts;
+            CREATE VIRTUAL TABLE quotes_fts USING fts5(text, author, content='quotes', content_rowid='id');
+            INSERT INTO quotes_fts (quotes_fts) VALUES ('rebuild');
+            """
+        )
+        conn.close()
+
+        async def scenario():
+            reopened = QuoteStore(self.path)
+            try:
+                await reopened.add(2, "New wisdom", "Bo")
+                return await reopened.search(1, "wis"), await reopened.search(2, "wis")
+            finally:
+                reopened.close()
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual([q.text for q in first], ["Old wisdom"])
+        self.assertEqual([q.text for q in second], ["New wisdom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
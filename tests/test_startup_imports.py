@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from utils.importtime import measure, parse_importtime, total_seconds
+
+# Only needed once a command or job actually runs; importing them at startup is a regression.
+_LAZY_MODULES = ("openai", "xml.etree.ElementTree", "unittest")
+# Generous ceiling for slow CI machines; today's cold start is well under half a second.
+_IMPORT_BUDGET_SECONDS = 3.0
+
+
+class ImportTimeParsingTests(unittest.TestCase):
+    def test_parse_importtime_reads_depth_and_skips_header(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     json.decoder\n"
+            "import time:       300 |        420 |   json\n"
+            "import time:        50 |        470 | bot\n"
+        )
+        timings = parse_importtime(output)
+
+        self.assertEqual([t.module for t in timings], ["json.decoder", "json", "bot"])
+        self.assertEqual([t.depth for t in timings], [2, 1, 0])
+        self.assertAlmostEqual(total_seconds(timings), 0.00047)
+
+
+class StartupImportTests(unittest.TestCase):
+    def test_startup_defers_heavy_modules_and_stays_within_budget(self):
+        timings = measure()
+        imported = {timing.module for timing in timings}
+
+        for module in _LAZY_MODULES:
+            with self.subTest(module=module):
+                self.assertFalse(module in imported, f"{module} is imported at startup")
+        self.assertLess(total_seconds(timings), _IMPORT_BUDGET_SECONDS)
+
+
+class WarmImportTests(unittest.TestCase):
+    def test_deferred_modules_are_imported_off_the_event_loop(self):
+        import core_bot
+
+        threads = []
+
+        def import_module(name):
+            threads.append((name, threading.current_thread()))
+
+        with patch.object(core_bot.importlib, "import_module", side_effect=import_module):
+            asyncio.run(core_bot.JamesBot._warm_imports(None))
+
+        self.assertEqual([name for name, _ in threads], list(core_bot._WARM_MODULES))
+        self.assertNotIn(threading.main_thread(), [thread for _, thread in threads])
+
+
+if __name__ == "__main__":
+    unittest.main()
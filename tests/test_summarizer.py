@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from services.cache import MemoryLRU
+from services.summarizer import ChannelSummarizer, estimate_tokens, pack_by_tokens
+
+
+def _message(message_id: int, content: str, author: str = "sam"):
+    return SimpleNamespace(id=message_id, content=content, author=SimpleNamespace(display_name=author))
+
+
+class FakeChannel:
+    """Messages with IDs 1..n; history() mimics channel.history(after=..., oldest_first=False)."""
+
+    def __init__(self, count: int) -> None:
+        self.messages = [_message(number, f"message number {number}") for number in range(1, count + 1)]
+        self.opened: list[int | None] = []
+
+    def post(self, count: int) -> None:
+        start = len(self.messages) + 1
+        self.messages += [_message(number, f"message number {number}") for number in range(start, start + count)]
+
+    def open_history(self, limit: int):
+        def open_(after_id):
+            self.opened.append(after_id)
+            newer = [message for message in self.messages if after_id is None or message.id > after_id]
+
+            async def history():
+                for message in reversed(newer[-limit:]):
+                    await asyncio.sleep(0)
+                    yield message
+
+            return history()
+
+        return open_
+
+
+class FakeOpenAI:
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def ask(self, prompt, *, system_prompt, max_tokens):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return f"summary {len(self.prompts)}", SimpleNamespace(prompt_tokens=10, completion_tokens=2)
+
+
+class SummarizerTests(unittest.TestCase):
+    def test_pack_by_tokens_respects_budget(self):
+        texts = ["x" * 40] * 5  # 11 tokens each
+        self.assertEqual([len(group) for group in pack_by_tokens(texts, 25)], [2, 2, 1])
+        self.assertEqual(pack_by_tokens(["x" * 400], 25), [["x" * 400]])
+        self.assertEqual(estimate_tokens(""), 1)
+
+    def test_chunks_run_concurrently_and_reduce_to_one_summary(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            channel = FakeChannel(40)
+            summarizer = ChannelSummarizer(openai, MemoryLRU(), chunk_tokens=40, concurrency=3)
+            result = await summarizer.summarize(channel.open_history(100)(None))
+            return openai, result
+
+        openai, result = asyncio.run(scenario())
+        self.assertEqual(result.messages, 40)
+        self.assertEqual(result.newest_id, 40)
+        self.assertGreater(result.chunks, 3)
+        self.assertEqual(openai.max_active, 3)
+        self.assertEqual(result.calls, len(openai.prompts))
+        self.assertEqual(result.prompt_tokens, 10 * result.calls)
+        self.assertTrue(result.text.startswith("summary"))
+
+        chunk_prompts = [prompt for prompt in openai.prompts if "<conversation>" in prompt]
+        self.assertEqual(len(chunk_prompts), result.chunks)
+        # Each chunk reads in chronological order even though history arrives newest first.
+        first = chunk_prompts[0]
+        self.assertLess(first.index("message number 39"), first.index("message number 40"))
+
+    def test_later_request_only_reads_new_messages(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            channel = FakeChannel(5)
+            summarizer = ChannelSummarizer(openai, MemoryLRU())
+            first = await summarizer.summarize_channel(7, channel.open_history(50), limit=50)
+
+            calls = len(openai.prompts)
+            unchanged = await summarizer.summarize_channel(7, channel.open_history(50), limit=50)
+            self.assertEqual(len(openai.prompts), calls)
+
+            channel.post(2)
+            second = await summarizer.summarize_channel(7, channel.open_history(50), limit=50)
+            return openai, channel, first, unchanged, second
+
+        openai, channel, first, unchanged, second = asyncio.run(scenario())
+        self.assertFalse(first.incremental)
+        self.assertEqual(unchanged.text, first.text)
+        self.assertTrue(unchanged.incremental)
+        self.assertEqual(channel.opened, [None, 5, 5])
+        self.assertTrue(second.incremental)
+        self.assertEqual(second.messages, 2)
+        # New chunk summarized, then merged after the cached summary.
+        merge = openai.prompts[-1]
+        self.assertIn("<summaries>", merge)
+        self.assertLess(merge.index(first.text), merge.index("summary 2"))
+
+    def test_rebuilds_when_cache_cannot_cover_the_window(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            channel = FakeChannel(30)
+            summarizer = ChannelSummarizer(openai, MemoryLRU())
+            await summarizer.summarize_channel(7, channel.open_history(10), limit=10)
+            # Asking for a longer window than the cached summary covers starts over.
+            wider = await summarizer.summarize_channel(7, channel.open_history(20), limit=20)
+            # So does falling further behind than the requested window.
+            channel.post(25)
+            behind = await summarizer.summarize_channel(7, channel.open_history(20), limit=20)
+            return channel, wider, behind
+
+        channel, wider, behind = asyncio.run(scenario())
+        self.assertEqual(channel.opened, [None, None, 30])
+        self.assertFalse(wider.incremental)
+        self.assertEqual(wider.messages, 20)
+        self.assertFalse(behind.incremental)
+        self.assertEqual(behind.newest_id, 55)
+
+    def test_does_not_reuse_a_summary_far_wider_than_asked(self):
+        async def scenario():
+            openai = FakeOpenAI()
+            channel = FakeChannel(100)
+            summarizer = ChannelSummarizer(openai, MemoryLRU())
+            await summarizer.summarize_channel(7, channel.open_history(80), limit=80)
+            narrow = await summarizer.summarize_channel(7, channel.open_history(20), limit=20)
+            # A summary covering the requested window keeps being extended until it outgrows it.
+            channel.post(3)
+            extended = await summarizer.summarize_channel(7, channel.open_history(20), limit=20)
+            channel.post(3)
+            outgrown = await summarizer.summarize_channel(7, channel.open_history(20), limit=20)
+            return channel, narrow, extended, outgrown
+
+        channel, narrow, extended, outgrown = asyncio.run(scenario())
+        self.assertEqual(channel.opened, [None, None, 100, 103, None])
+        self.assertFalse(narrow.incremental)
+        self.assertEqual(narrow.messages, 20)
+        self.assertTrue(extended.incremental)
+        self.assertFalse(outgrown.incremental)
+        self.assertEqual(outgrown.messages, 20)
+        self.assertEqual(outgrown.newest_id, 106)
+
+
+if __name__ == "__main__":
+    unittest.main()
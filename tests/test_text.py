@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import unittest
+
+from utils.text import chunk_text, discord_len, split_segments
+
+
+class ChunkTextTests(unittest.TestCase):
+    def test_short_and_empty_text(self):
+        self.assertEqual(chunk_text("  hi  "), ["hi"])
+        self.assertEqual(chunk_text(""), ["(No response)"])
+
+    def test_chunks_respect_limit_and_max_chunks(self):
+        chunks = chunk_text("word " * 5000, limit=1900, max_chunks=6)
+        self.assertEqual(len(chunks), 6)
+        self.assertTrue(all(discord_len(chunk) <= 1900 for chunk in chunks))
+        self.assertTrue(chunks[-1].endswith("…"))
+
+    def test_prefers_paragraph_boundaries(self):
+        first = "a" * 60
+        second = "Sentence one. Sentence two. " * 3
+        chunks = chunk_text(f"{first}\n\n{second}", limit=100)
+        self.assertEqual(chunks[0], first)
+
+    def test_code_fences_are_closed_and_reopened(self):
+        code = "\n".join(f"value_{i} = {i}" for i in range(60))
+        text = f"Here is code:\n```python\n{code}\n```\nDone."
+        chunks = chunk_text(text, limit=200, max_chunks=50)
+
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks:
+            self.assertLessEqual(discord_len(chunk), 200)
+            self.assertEqual(chunk.count("```") % 2, 0, chunk)
+        self.assertTrue(chunks[1].startswith("```python\n"))
+
+    def test_reopened_fence_line_is_measured_in_discord_units(self):
+        code = "\n".join(f"value_{i} = {i}" for i in range(40))
+        text = f"```python {'😀' * 20}\n{code}\n```"
+        chunks = chunk_text(text, limit=100, max_chunks=50)
+
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks:
+            self.assertLessEqual(discord_len(chunk), 100, chunk)
+
+    def test_long_fences_close_with_their_own_marker(self):
+        code = "\n".join(f"print('```{i}')" for i in range(40))
+        text = f"````python\n{code}\n````\nDone."
+        chunks = chunk_text(text, limit=150, max_chunks=50)
+
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks[:-1]:
+            self.assertTrue(chunk.startswith("````python\n"), chunk)
+            self.assertTrue(chunk.endswith("\n````"), chunk)
+        self.assertTrue(chunks[-1].endswith("````\nDone."))
+
+    def test_fence_free_text_matches_the_general_path(self):
+        text = ("First sentence here. Second one! Third?\n" * 40 + "\n") * 5
+        plain = chunk_text(text, limit=300, max_chunks=50)
+        # A fence at the very end sends the same text through the fence-aware loop.
+        fenced = chunk_text(text + "\n```", limit=300, max_chunks=50)
+
+        self.assertEqual(fenced[:-1], plain[:-1])
+        for chunk in plain:
+            self.assertLessEqual(len(chunk), 300)
+
+    def test_counts_astral_characters_like_discord(self):
+        text = "😀" * 1500
+        self.assertEqual(discord_len(text), 3000)
+        chunks = chunk_text(text, limit=1900, max_chunks=6)
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(all(discord_len(chunk) <= 1900 for chunk in chunks))
+        self.assertEqual("".join(chunks), text)
+
+
+class SplitSegmentsTests(unittest.TestCase):
+    def test_short_text_is_one_segment(self):
+        self.assertEqual(split_segments("Hello there.", limit=100), ["Hello there."])
+
+    def test_prefers_paragraph_then_sentence_boundaries(self):
+        text = "First sentence. Second sentence.\n\nNew paragraph here."
+        segments = split_segments(text, limit=35)
+        self.assertEqual(segments, ["First sentence. Second sentence.\n\n", "New paragraph here."])
+
+        segments = split_segments("One two. Three four. Five six.", limit=12)
+        self.assertEqual(segments, ["One two. ", "Three four. ", "Five six."])
+
+    def test_segments_reassemble_to_original(self):
+        text = ("Lorem ipsum dolor sit amet. " * 40 + "\n\n  indented line\n") * 5 + "x" * 300
+        segments = split_segments(text, limit=120)
+        self.assertEqual("".join(segments), text)
+        self.assertTrue(all(len(segment) <= 120 for segment in segments))
+
+
+if __name__ == "__main__":
+    unittest.main()
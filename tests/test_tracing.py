@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import timeit
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from utils.presentation import run_interaction_task
+from utils.tracing import (
+    RECORDER,
+    SPAN_SECONDS,
+    SPANS_DROPPED_TOTAL,
+    SpanRecord,
+    SpanRecorder,
+    span,
+    trace_interaction,
+    upstream_span,
+)
+
+
+def _interaction():
+    return SimpleNamespace(
+        id=987,
+        guild_id=55,
+        channel_id=1,
+        user=SimpleNamespace(id=1),
+        command=SimpleNamespace(qualified_name="eats"),
+        response=SimpleNamespace(defer=AsyncMock()),
+        followup=SimpleNamespace(send=AsyncMock()),
+    )
+
+
+class TracingTests(unittest.TestCase):
+    def setUp(self):
+        RECORDER.reset()
+
+    def test_spans_are_tied_to_the_interaction(self):
+        before = SPAN_SECONDS.count(kind="upstream", name="google.geocode", command="eats")
+
+        async def work():
+            with upstream_span("google.geocode"):
+                await asyncio.sleep(0)
+            return "done"
+
+        asyncio.run(run_interaction_task(_interaction(), task_name="Restaurant search", work=work, ephemeral=False))
+
+        names = {(record.kind, record.name) for record in RECORDER.recent}
+        self.assertTrue(
+            {("phase", "defer"), ("phase", "work"), ("upstream", "google.geocode"), ("phase", "followup"),
+             ("command", "total")} <= names
+        )
+        self.assertTrue(all(record.interaction_id == 987 for record in RECORDER.recent))
+        self.assertTrue(all(record.command == "eats" for record in RECORDER.recent))
+        self.assertEqual(SPAN_SECONDS.count(kind="upstream", name="google.geocode", command="eats"), before + 1)
+
+    def test_spans_outside_interactions_are_background(self):
+        with span("digest"):
+            pass
+        self.assertEqual(RECORDER.recent[-1].command, "background")
+
+    def test_errors_are_recorded_on_the_span(self):
+        with self.assertRaises(ValueError):
+            with trace_interaction(_interaction()):
+                with upstream_span("openai.chat"):
+                    raise ValueError("boom")
+        self.assertEqual(RECORDER.recent[0].error, "ValueError")
+
+    def test_export_writes_only_new_spans(self):
+        with span("one"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "spans.jsonl"
+            self.assertEqual(RECORDER.export(path), 1)
+            self.assertEqual(RECORDER.export(path), 0)
+            self.assertEqual(len(path.read_text().splitlines()), 1)
+
+    def test_spans_over_the_buffer_are_counted_and_reported(self):
+        recorder = SpanRecorder(recent=2)
+        before = SPANS_DROPPED_TOTAL.get()
+        for number in range(5):
+            recorder.record(SpanRecord(f"s{number}", "phase", "eats", None, None, 0.0, 1.0))
+
+        self.assertEqual(SPANS_DROPPED_TOTAL.get() - before, 3)
+        with tempfile.TemporaryDirectory() as tmp, self.assertLogs("thejamesroll-bot.trace", level="WARNING") as logs:
+            self.assertEqual(recorder.export(Path(tmp) / "spans.jsonl"), 2)
+        self.assertIn("Dropped 3 span(s)", logs.output[0])
+
+    def test_span_overhead_is_small(self):
+        def timed():
+            with span("noop"):
+                pass
+
+        per_span = min(timeit.repeat(timed, number=2000, repeat=3)) / 2000
+        self.assertLess(per_span, 50e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""In-flight request coalescing and duplicate-interaction suppression.
+
+When identical requests overlap (a double click, a Discord retry, several people pasting the
+same message into ``/explain``), only the first starts upstream work; the rest await its
+result and each reply in their own interaction.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from utils.metrics import REGISTRY
+
+T = TypeVar("T")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_RECENT_INTERACTIONS = 4096
+
+COALESCED_REQUESTS_TOTAL = REGISTRY.counter(
+    "coalesced_requests_total", "Requests that joined an identical in-flight request.", ("name",)
+)
+DUPLICATE_INTERACTIONS_TOTAL = REGISTRY.counter(
+    "duplicate_interactions_total", "Interactions ignored because their ID was already handled."
+)
+
+
+def normalize_input(text: str) -> str:
+    """Collapse runs of whitespace so trivially different pastes share a key."""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class Coalescer:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await ``factory()``, or the identical call already running under ``key``."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            COALESCED_REQUESTS_TOTAL.inc(name=self.name)
+        # Shielded so one caller giving up does not cancel the result the others are waiting on.
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, done: asyncio.Future) -> None:
+        if self._inflight.get(key) is done:
+            del self._inflight[key]
+
+
+class InteractionDeduper:
+    """Remembers recent interaction IDs so a repeated delivery is ignored instead of run twice."""
+
+    def __init__(self, size: int = _RECENT_INTERACTIONS) -> None:
+        self.size = size
+        self._seen: OrderedDict[int, None] = OrderedDict()
+
+    def claim(self, interaction_id: int | None) -> bool:
+        """True the first time an ID is seen; False (and counted) on repeats."""
+        if interaction_id is None:
+            return True
+        if interaction_id in self._seen:
+            DUPLICATE_INTERACTIONS_TOTAL.inc()
+            return False
+        self._seen[interaction_id] = None
+        if len(self._seen) > self.size:
+            self._seen.popitem(last=False)
+        return True
+
+
+SEEN_INTERACTIONS = InteractionDeduper()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger("thejamesroll-bot")
+
+
+def command_tree_hash(tree, *, guild=None) -> str:
+    """Stable digest of the payload ``tree.sync(guild=guild)`` would upload."""
+    payload = sorted(
+        (command.to_dict() for command in tree.get_commands(guild=guild)),
+        key=lambda data: (data.get("type", 1), data["name"]),
+    )
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_command_hashes(path: Path) -> dict[str, str]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable command hash file %s", path)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_command_hashes(path: Path, hashes: dict[str, str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+    tmp.replace(path)
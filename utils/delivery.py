@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import discord
+
+from utils.metrics import REGISTRY
+from utils.text import chunk_text, discord_len
+from utils.tracing import span
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_MESSAGE_LIMIT = 2000
+_EMBED_PAGE_LIMIT = 4000
+_MESSAGE_EMBED_TOTAL = 6000
+_MAX_EMBEDS = 10
+_PAGINATOR_TIMEOUT_SECONDS = 600
+
+# Discord allows roughly five webhook sends per two seconds per channel.
+_SENDS_PER_WINDOW = 5
+_WINDOW_SECONDS = 2.0
+
+
+class ChannelSendQueue:
+    """Sliding-window limiter that spaces out sends per channel instead of letting them 429."""
+
+    def __init__(self, max_sends: int = _SENDS_PER_WINDOW, window_seconds: float = _WINDOW_SECONDS) -> None:
+        self.max_sends = max_sends
+        self.window_seconds = window_seconds
+        self._sent: dict[int, deque[float]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        # Callers inside acquire() per channel, so a channel is never evicted while in use.
+        self._active: dict[int, int] = {}
+        self._last_sweep = time.monotonic()
+
+    @property
+    def channels(self) -> int:
+        return len(self._sent)
+
+    async def acquire(self, channel_id: int | None) -> None:
+        """Wait until the channel has room for another send, then claim it."""
+        key = channel_id or 0
+        self._active[key] = self._active.get(key, 0) + 1
+        try:
+            async with self._locks.setdefault(key, asyncio.Lock()):
+                sent = self._sent.setdefault(key, deque())
+                while True:
+                    now = time.monotonic()
+                    while sent and now - sent[0] >= self.window_seconds:
+                        sent.popleft()
+                    if len(sent) < self.max_sends:
+                        break
+                    await asyncio.sleep(self.window_seconds - (now - sent[0]))
+                sent.append(now)
+        finally:
+            self._active[key] -= 1
+            if not self._active[key]:
+                del self._active[key]
+        if now - self._last_sweep >= self.window_seconds:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        """Forget channels with no sends in the current window and nobody waiting on them."""
+        self._last_sweep = now
+        for key, sent in list(self._sent.items()):
+            if key in self._active or (sent and now - sent[-1] < self.window_seconds):
+                continue
+            del self._sent[key]
+            self._locks.pop(key, None)
+
+
+SEND_QUEUE = ChannelSendQueue()
+
+FOLLOWUP_SENDS_TOTAL = REGISTRY.counter("bot_followup_sends_total", "Interaction follow-up messages sent.")
+FOLLOWUP_SEND_SECONDS = REGISTRY.histogram("bot_followup_send_seconds", "Latency of one follow-up send.")
+SEND_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "bot_send_queue_wait_seconds", "Time a follow-up waited for room in its channel's send window."
+)
+
+
+@dataclass(slots=True)
+class DeliveryStats:
+    sends: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def total_latency(self) -> float:
+        return sum(self.latencies)
+
+
+def pack_embed_pages(text: str, max_chunks: int) -> list[list[str]]:
+    """Split text into embed descriptions, grouped into as few messages as Discord allows.
+
+    Each group leaves room for the longest "Page x/y" footer the paginator could add to it.
+    """
+    pages = chunk_text(text, limit=_EMBED_PAGE_LIMIT, max_chunks=max_chunks)
+    # Never more groups than pages, and never more pages than max_chunks.
+    budget = _MESSAGE_EMBED_TOTAL - len(f"Page {max_chunks}/{max_chunks}")
+
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_len = 0
+    for page in pages:
+        page_len = discord_len(page)
+        if current and (current_len + page_len > budget or len(current) >= _MAX_EMBEDS):
+            groups.append(current)
+            current = []
+            current_len = 0
+        current.append(page)
+        current_len += page_len
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _build_embeds(pages: list[str], footer: str | None = None) -> list[discord.Embed]:
+    embeds = [discord.Embed(description=page) for page in pages]
+    if footer:
+        embeds[-1].set_footer(text=footer)
+    return embeds
+
+
+class PaginatorView(discord.ui.View):
+    def __init__(
+        self, groups: list[list[str]], owner_id: int | None, *, origin: discord.Interaction | None = None
+    ) -> None:
+        super().__init__(timeout=_PAGINATOR_TIMEOUT_SECONDS)
+        self.groups = groups
+        self.owner_id = owner_id
+        self.index = 0
+        # The most recent interaction on this message; its token outlives the view's timeout.
+        self._latest = origin
+        self._sync_buttons()
+
+    def current_embeds(self) -> list[discord.Embed]:
+        return _build_embeds(self.groups[self.index], footer=f"Page {self.index + 1}/{len(self.groups)}")
+
+    def _sync_buttons(self) -> None:
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.groups) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.owner_id is None or interaction.user.id == self.owner_id:
+            self._latest = interaction
+            return True
+        await interaction.response.send_message("Only the requester can flip pages.", ephemeral=True)
+        return False
+
+    async def on_timeout(self) -> None:
+        # Keep the message and the page it shows; only the buttons stop.
+        self.previous_page.disabled = self.next_page.disabled = True
+        if self._latest is None:
+            return
+        try:
+            await self._latest.edit_original_response(view=self)
+        except discord.HTTPException:
+            logger.debug("Could not disable page buttons on an expired message", exc_info=True)
+
+    async def _show(self, interaction: discord.Interaction, index: int) -> None:
+        self.index = max(0, min(index, len(self.groups) - 1))
+        self._sync_buttons()
+        await interaction.response.edit_message(embeds=self.current_embeds(), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._show(interaction, self.index + 1)
+
+
+async def send_followup(interaction, stats: DeliveryStats, *, queue: ChannelSendQueue = SEND_QUEUE, **kwargs):
+    """Send one follow-up through the per-channel queue and record its latency."""
+    queued = time.perf_counter()
+    with span("send_queue"):
+        await queue.acquire(interaction.channel_id)
+    started = time.perf_counter()
+    SEND_QUEUE_WAIT_SECONDS.observe(started - queued)
+    try:
+        with span("followup"):
+            return await interaction.followup.send(**kwargs)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.sends += 1
+        stats.latencies.append(elapsed)
+        FOLLOWUP_SENDS_TOTAL.inc()
+        FOLLOWUP_SEND_SECONDS.observe(elapsed)
+
+
+async def deliver_text(
+    interaction,
+    text: str,
+    *,
+    ephemeral: bool,
+    max_chunks: int,
+    stats: DeliveryStats,
+    allowed_mentions: discord.AllowedMentions | None = None,
+) -> None:
+    """Deliver text in a single message: plain content, stacked embeds, or a paginated view.
+
+    ``allowed_mentions`` only matters for plain content; mentions inside embeds never ping.
+    """
+    text = (text or "").strip() or "(No response)"
+
+    if discord_len(text) <= _MESSAGE_LIMIT:
+        extra = {"allowed_mentions": allowed_mentions} if allowed_mentions is not None else {}
+        await send_followup(interaction, stats, content=text, ephemeral=ephemeral, **extra)
+        return
+
+    groups = pack_embed_pages(text, max_chunks)
+    if len(groups) == 1:
+        await send_followup(interaction, stats, embeds=_build_embeds(groups[0]), ephemeral=ephemeral)
+        return
+
+    user = getattr(interaction, "user", None)
+    view = PaginatorView(groups, owner_id=user.id if user else None, origin=interaction)
+    await send_followup(interaction, stats, embeds=view.current_embeds(), view=view, ephemeral=ephemeral)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import discord
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_GALLERY_TIMEOUT_SECONDS = 600
+# Every regeneration is a paid generation that skips the image cache, so each gallery gets a
+# few, spaced out like /img itself.
+_MAX_REGENERATIONS = 3
+_REGENERATE_COOLDOWN_SECONDS = 30.0
+
+
+@dataclass(slots=True)
+class GalleryImage:
+    """One variant: either a file attached to the gallery message or a URL hosted upstream."""
+
+    filename: str | None = None
+    url: str | None = None
+
+    @property
+    def embed_url(self) -> str:
+        return f"attachment://{self.filename}" if self.filename else str(self.url)
+
+
+# Called with the variant index; returns the replacement and the file to attach, if any.
+Regenerate = Callable[[int], Awaitable[tuple[GalleryImage, discord.File | None]]]
+
+
+class ImageGalleryView(discord.ui.View):
+    """Every variant in one message: a select picks which one the embed shows, and a button
+    regenerates the shown variant in place, a limited number of times."""
+
+    def __init__(
+        self,
+        prompt: str,
+        images: list[GalleryImage],
+        *,
+        owner_id: int | None,
+        regenerate: Regenerate,
+        max_regenerations: int = _MAX_REGENERATIONS,
+        cooldown: float = _REGENERATE_COOLDOWN_SECONDS,
+    ) -> None:
+        super().__init__(timeout=_GALLERY_TIMEOUT_SECONDS)
+        self.prompt = prompt
+        self.images = images
+        self.owner_id = owner_id
+        self.index = 0
+        self.regenerations_left = max_regenerations
+        self.cooldown = cooldown
+        self._next_regenerate = 0.0
+        self._regenerate = regenerate
+        # The gallery message itself, set once it is sent. A queued /img replaces its status
+        # message with a new follow-up, so the command's original response is not the gallery.
+        self.message: discord.Message | None = None
+        # The most recent click on this message; its token outlives the view's timeout.
+        self._latest: discord.Interaction | None = None
+        if len(images) > 1:
+            self.pick_variant.options = [
+                discord.SelectOption(label=f"Variant {number}", value=str(number - 1))
+                for number in range(1, len(images) + 1)
+            ]
+        else:
+            self.remove_item(self.pick_variant)
+
+    def current_embed(self) -> discord.Embed:
+        embed = discord.Embed(title="Generated image", description=self.prompt)
+        embed.set_image(url=self.images[self.index].embed_url)
+        if len(self.images) > 1:
+            embed.set_footer(text=f"Variant {self.index + 1}/{len(self.images)}")
+        return embed
+
+    def attachments_with(self, message: discord.Message, index: int, file: discord.File | None) -> list:
+        """The message's attachments in variant order, with ``file`` in slot ``index``."""
+        existing = {attachment.filename: attachment for attachment in message.attachments}
+        attachments = []
+        for position, image in enumerate(self.images):
+            if position == index and file is not None:
+                attachments.append(file)
+            elif image.filename in existing:
+                attachments.append(existing[image.filename])
+        return attachments
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.owner_id is None or interaction.user.id == self.owner_id:
+            self._latest = interaction
+            return True
+        await interaction.response.send_message("Only the requester can use these controls.", ephemeral=True)
+        return False
+
+    @discord.ui.select(placeholder="Show variant…", min_values=1, max_values=1)
+    async def pick_variant(self, interaction: discord.Interaction, select: discord.ui.Select) -> None:
+        self.index = int(select.values[0])
+        await interaction.response.edit_message(embed=self.current_embed(), view=self)
+
+    @discord.ui.button(label="Regenerate this one", emoji="🔁", style=discord.ButtonStyle.secondary)
+    async def regenerate_button(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        wait = self._next_regenerate - time.monotonic()
+        if wait > 0:
+            await interaction.response.send_message(
+                f"Regenerate is cooling down; try again in {wait:.0f}s.", ephemeral=True
+            )
+            return
+        index = self.index
+        self.regenerations_left -= 1
+        self._next_regenerate = time.monotonic() + self.cooldown
+        button.disabled = True
+        await interaction.response.edit_message(view=self)
+        try:
+            image, file = await self._regenerate(index)
+        except Exception:
+            logger.exception("Image regeneration failed")
+            await interaction.followup.send("⚠️ Regenerate failed. Please try again.", ephemeral=True)
+            self._sync_regenerate()
+            await interaction.edit_original_response(view=self)
+            return
+
+        attachments = self.attachments_with(interaction.message, index, file)
+        self.images[index] = image
+        self._sync_regenerate()
+        await interaction.edit_original_response(embed=self.current_embed(), attachments=attachments, view=self)
+
+    def _sync_regenerate(self) -> None:
+        self.regenerate_button.disabled = self.regenerations_left <= 0
+        if self.regenerations_left <= 0:
+            self.regenerate_button.label = "No regenerations left"
+
+    async def on_timeout(self) -> None:
+        for item in self.children:
+            item.disabled = True
+        try:
+            if self._latest is not None:
+                await self._latest.edit_original_response(view=self)
+            elif self.message is not None:
+                await self.message.edit(view=self)
+        except discord.HTTPException:
+            logger.warning("Could not disable controls on an expired image gallery", exc_info=True)
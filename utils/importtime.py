@@ -0,0 +1,89 @@
+"""Cold-start import cost of the bot, from ``python -X importtime``.
+
+Imports ``bot`` and every extension in a fresh interpreter (what a restart pays before it can
+log in) and prints the slowest top-level and nested imports::
+
+    python -m utils.importtime --top 20
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(slots=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def startup_modules() -> tuple[str, ...]:
+    from core_bot import EXTENSIONS
+
+    return ("bot", *EXTENSIONS)
+
+
+def measure(modules: tuple[str, ...] | None = None) -> list[ImportTiming]:
+    """Import ``modules`` in a fresh interpreter and return its ``-X importtime`` report."""
+    modules = modules or startup_modules()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=_REPO_ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def total_seconds(timings: list[ImportTiming]) -> float:
+    return sum(timing.cumulative_us for timing in timings if timing.depth == 0) / 1_000_000
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="number of imports to list")
+    args = parser.parse_args(argv)
+
+    timings = measure()
+    print(f"Total: {total_seconds(timings) * 1000:.0f} ms across {len(timings)} modules\n")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[: args.top]:
+        indent = "  " * timing.depth
+        print(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>8.1f}  {indent}{timing.module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
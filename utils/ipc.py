@@ -0,0 +1,218 @@
+"""Localhost IPC between cluster workers.
+
+The launcher runs an ``IPCHub``; each worker process connects an ``IPCClient``. Messages are
+JSON objects, one per line. Workers can broadcast to every other worker (``publish``) and
+update shared counters held by the hub (``incr``), which is enough to share cache fills and
+enforce quotas across processes.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_STREAM_LIMIT = 1024 * 1024
+
+Handler = Callable[[dict[str, Any]], None]
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class _Connection:
+    """A stream writer with serialized writes; concurrent ``drain()`` calls are not safe on 3.10."""
+
+    __slots__ = ("writer", "_lock")
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self._lock = asyncio.Lock()
+
+    async def send(self, message: dict[str, Any] | bytes) -> None:
+        data = message if isinstance(message, bytes) else _encode(message)
+        async with self._lock:
+            self.writer.write(data)
+            await self.writer.drain()
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class IPCHub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+        self._workers: dict[int, _Connection] = {}
+        # key -> (value, expires_at or None)
+        self._counters: dict[str, tuple[float, float | None]] = {}
+
+    @property
+    def workers(self) -> list[int]:
+        return sorted(self._workers)
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=_STREAM_LIMIT)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("IPC hub listening on %s:%d", self.host, self.port)
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for connection in list(self._workers.values()):
+            await connection.close()
+        self._workers.clear()
+
+    def incr(self, key: str, amount: float = 1, ttl: float | None = None) -> float:
+        now = time.monotonic()
+        value, expires_at = self._counters.get(key, (0, None))
+        if expires_at is not None and expires_at <= now:
+            value, expires_at = 0, None
+        if expires_at is None and ttl is not None:
+            expires_at = now + ttl
+        value += amount
+        self._counters[key] = (value, expires_at)
+        return value
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(writer)
+        worker: int | None = None
+        try:
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.warning("Dropping malformed IPC message from worker %s", worker)
+                    continue
+
+                op = message.get("op")
+                if op == "hello":
+                    worker = int(message["worker"])
+                    self._workers[worker] = connection
+                    logger.info("IPC worker %d connected", worker)
+                elif op == "publish":
+                    await self._broadcast(line, exclude=worker)
+                elif op == "incr":
+                    value = self.incr(message["key"], message.get("amount", 1), message.get("ttl"))
+                    await connection.send({"id": message["id"], "value": value})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if worker is not None and self._workers.get(worker) is connection:
+                del self._workers[worker]
+                logger.info("IPC worker %d disconnected", worker)
+            await connection.close()
+
+    async def _broadcast(self, line: bytes, *, exclude: int | None) -> None:
+        for worker, connection in list(self._workers.items()):
+            if worker == exclude:
+                continue
+            try:
+                await connection.send(line)
+            except (ConnectionError, OSError):
+                logger.warning("IPC broadcast to worker %d failed", worker)
+
+
+class IPCClient:
+    def __init__(self, worker_id: int, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.worker_id = worker_id
+        self.host = host
+        self.port = port
+        self._connection: _Connection | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._handlers: dict[str, list[Handler]] = {}
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None
+
+    async def connect(self) -> None:
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=_STREAM_LIMIT)
+        self._connection = _Connection(writer)
+        await self._connection.send({"op": "hello", "worker": self.worker_id})
+        self._reader_task = asyncio.create_task(self._read_forever(reader))
+
+    async def close(self) -> None:
+        # Cleared first, so the reader's cleanup does not report this as a lost hub.
+        connection, self._connection = self._connection, None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if connection is not None:
+            await connection.close()
+        self._fail_pending()
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Call ``handler(payload)`` for every message another worker publishes on ``topic``."""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    async def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        """Best-effort broadcast; a lost hub only costs the other workers a cache fill."""
+        if self._connection is None:
+            return
+        try:
+            await self._connection.send({"op": "publish", "topic": topic, "payload": payload})
+        except (ConnectionError, OSError):
+            logger.warning("IPC publish on %s failed", topic)
+
+    async def incr(self, key: str, amount: float = 1, *, ttl: float | None = None) -> float:
+        """Add to a hub-wide counter and return its new value. ``ttl`` starts when the key is created."""
+        if self._connection is None:
+            raise ConnectionError("IPC client is not connected")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._connection.send({"op": "incr", "id": request_id, "key": key, "amount": amount, "ttl": ttl})
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_forever(self, reader: asyncio.StreamReader) -> None:
+        try:
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.warning("Dropping malformed IPC message from the hub")
+                    continue
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future is not None and not future.done():
+                        future.set_result(message["value"])
+                    continue
+                for handler in self._handlers.get(message.get("topic"), ()):
+                    try:
+                        handler(message.get("payload") or {})
+                    except Exception:
+                        logger.exception("IPC handler for %s failed", message.get("topic"))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # Nothing answers requests once the reader is gone: later calls must fail fast too.
+            connection, self._connection = self._connection, None
+            if connection is not None:
+                logger.warning("IPC connection to hub closed")
+                await connection.close()
+            self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("IPC hub connection closed"))
+        self._pending.clear()
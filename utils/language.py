@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Scripts that identify a language (or family) on their own.
+_SCRIPT_RANGES: dict[str, tuple[tuple[int, int], ...]] = {
+    "ja": ((0x3040, 0x30FF), (0x4E00, 0x9FFF)),
+    "zh": ((0x4E00, 0x9FFF), (0x3400, 0x4DBF)),
+    "ko": ((0xAC00, 0xD7AF), (0x1100, 0x11FF)),
+    "ru": ((0x0400, 0x04FF),),
+    "uk": ((0x0400, 0x04FF),),
+    "bg": ((0x0400, 0x04FF),),
+    "el": ((0x0370, 0x03FF),),
+    "ar": ((0x0600, 0x06FF),),
+    "fa": ((0x0600, 0x06FF),),
+    "he": ((0x0590, 0x05FF),),
+    "iw": ((0x0590, 0x05FF),),
+    "hi": ((0x0900, 0x097F),),
+    "th": ((0x0E00, 0x0E7F),),
+}
+
+# A handful of very common function words per Latin-script language.
+_STOPWORDS: dict[str, frozenset[str]] = {
+    "en": frozenset(
+        "the a an and or but is are was were be to of in on at for with it this that i you he she "
+        "we they my your not do does did have has had will would can just so what if".split()
+    ),
+    "es": frozenset(
+        "el la los las un una y o pero es son está estoy fue ser de del en con por para que no "
+        "yo tú él ella nosotros mi su lo se me te muy qué como".split()
+    ),
+    "fr": frozenset(
+        "le la les un une et ou mais est sont était être de du des en dans sur pour avec que qui "
+        "ne pas je tu il elle nous vous ils mon ton son ce cette très".split()
+    ),
+    "de": frozenset(
+        "der die das ein eine und oder aber ist sind war sein zu von in im auf für mit dass nicht "
+        "ich du er sie wir ihr mein dein es auch sehr was wie".split()
+    ),
+    "pt": frozenset(
+        "o a os as um uma e ou mas é são está estou foi ser de do da em no na com por para que "
+        "não eu tu ele ela nós meu seu se muito como".split()
+    ),
+    "it": frozenset(
+        "il lo la i gli le un una e o ma è sono era essere di del della in con per che non io tu "
+        "lui lei noi mio suo si molto come".split()
+    ),
+}
+
+_SCRIPT_THRESHOLD = 0.5
+_STOPWORD_THRESHOLD = 0.2
+
+
+def _base_language(language: str) -> str:
+    return language.strip().lower().replace("_", "-").split("-")[0]
+
+
+def _in_ranges(char: str, ranges: tuple[tuple[int, int], ...]) -> bool:
+    code = ord(char)
+    return any(start <= code <= end for start, end in ranges)
+
+
+def looks_like_language(text: str, language: str) -> bool:
+    """Cheap local guess at whether ``text`` is already written in ``language``.
+
+    Uses script ranges for languages with their own script and common function words for a
+    few Latin-script languages. Unknown languages always return ``False`` so the caller
+    translates rather than silently skipping. Text with no letters returns ``True``.
+    """
+    letters = [char for char in text if char.isalpha()]
+    if not letters:
+        return True
+
+    base = _base_language(language)
+
+    ranges = _SCRIPT_RANGES.get(base)
+    if ranges is not None:
+        in_script = sum(1 for char in letters if _in_ranges(char, ranges))
+        if base == "zh" and any(_in_ranges(char, ((0x3040, 0x30FF),)) for char in letters):
+            return False
+        return in_script / len(letters) >= _SCRIPT_THRESHOLD
+
+    stopwords = _STOPWORDS.get(base)
+    if stopwords is None:
+        return False
+
+    latin = sum(1 for char in letters if char.isascii() or "À" <= char <= "ɏ")
+    if latin / len(letters) < _SCRIPT_THRESHOLD:
+        return False
+
+    words = [word.lower() for word in _WORD_RE.findall(text)]
+    if not words:
+        return False
+    hits = sum(1 for word in words if word in stopwords)
+    return hits / len(words) >= _STOPWORD_THRESHOLD
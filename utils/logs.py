@@ -0,0 +1,194 @@
+"""Logging that stays off the event loop.
+
+Records are put on a queue by the thread that logs them and written by a background listener
+thread, so formatting tracebacks and writing to the terminal never stall the loop. The trace
+context (interaction, guild, command) is read when the record is queued, since it lives in a
+context variable the listener thread cannot see. Bursts of the same warning or error are
+thinned out before they are queued: the first few in a window pass, then one in every
+``sample_every``, each carrying how many were dropped since the last one.
+"""
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import TextIO
+
+from utils.metrics import REGISTRY
+from utils.tracing import current_trace
+
+_TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+_REPEAT_WINDOW_SECONDS = 60.0
+_REPEAT_BURST = 5
+_REPEAT_SAMPLE_EVERY = 100
+# Windows are pruned once this many distinct messages are tracked.
+_MAX_TRACKED = 1024
+
+LOG_RECORDS_SUPPRESSED_TOTAL = REGISTRY.counter(
+    "log_records_suppressed_total", "Repeated warnings and errors dropped by the log rate limit.", ("logger",)
+)
+
+_TRACE_FIELDS = ("interaction_id", "guild_id", "command")
+_listener: logging.handlers.QueueListener | None = None
+
+
+class RepeatFilter(logging.Filter):
+    """Rate-limits identical warnings and errors.
+
+    Records are identical when they share a logger, level, message template and exception type,
+    so the same failure with different arguments still counts as one. Lower levels always pass.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: float = _REPEAT_WINDOW_SECONDS,
+        burst: int = _REPEAT_BURST,
+        sample_every: int = _REPEAT_SAMPLE_EVERY,
+        clock=time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.sample_every = sample_every
+        self._clock = clock
+        # key -> [window start, records seen in window, dropped since the last one let through]
+        self._windows: dict[tuple, list] = {}
+        # Threads that log (to_thread workers, the process pool's result thread) share the filter.
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.levelno, str(record.msg), exc_type)
+        now = self._clock()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                if len(self._windows) >= _MAX_TRACKED:
+                    self._prune(now)
+                dropped = state[2] if state is not None else 0
+                state = self._windows[key] = [now, 0, dropped]
+            state[1] += 1
+            seen = state[1]
+            if seen > self.burst and (seen - self.burst) % self.sample_every:
+                state[2] += 1
+                LOG_RECORDS_SUPPRESSED_TOTAL.inc(logger=record.name)
+                return False
+            record.suppressed, state[2] = state[2], 0
+        return True
+
+    def _prune(self, now: float) -> None:
+        for key in [key for key, state in self._windows.items() if now - state[0] >= self.window]:
+            del self._windows[key]
+        if len(self._windows) >= _MAX_TRACKED:
+            self._windows.clear()
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their trace context attached, leaving exceptions for the listener.
+
+    The stock handler formats the whole record, traceback included, on the logging thread;
+    here only the message is rendered (its arguments may change after this call returns).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        trace = current_trace()
+        if trace is not None:
+            record.interaction_id = trace.interaction_id
+            record.guild_id = trace.guild_id
+            record.command = trace.command
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the trace context and any traceback as fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in _TRACE_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__(_TEXT_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        if getattr(record, "suppressed", 0):
+            line += f" (+{record.suppressed} similar suppressed)"
+        return line
+
+
+def start_queue_logging(
+    *,
+    level: int = logging.INFO,
+    json_output: bool = True,
+    stream: TextIO | None = None,
+    repeat_filter: RepeatFilter | None = None,
+) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a listener thread writing to ``stream``.
+
+    Replaces the root logger's handlers. The listener is stopped (and the queue drained) at exit.
+    """
+    global _listener
+    stop_queue_logging()
+
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if json_output else TextFormatter())
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = ContextQueueHandler(records)
+    handler.addFilter(repeat_filter or RepeatFilter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and stop the listener thread; safe to call more than once."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, ContextQueueHandler):
+            root.removeHandler(handler)
+
+
+atexit.register(stop_queue_logging)
@@ -0,0 +1,190 @@
+"""Event-loop lag watchdog and blocking-call detector.
+
+The watchdog keeps a heartbeat callback on the loop and a monitor thread beside it. When the
+heartbeat goes stale for longer than the threshold, the loop thread is stuck in a synchronous
+callback, so the monitor captures that thread's current stack and reports it.
+
+Run the test suite with blocking detection enabled (fails if code under ``cogs/`` or
+``services/`` blocks the loop longer than ``--fail-ms``)::
+
+    python -m utils.loop_watchdog --fail-ms 100 discover -s tests -p "test_*.py"
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("thejamesroll-bot")
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_WATCHED_PACKAGES = ("cogs", "services")
+_RECENT_REPORTS = 50
+
+EVENT_LOOP_LAG_SECONDS = REGISTRY.gauge("event_loop_lag_seconds", "Most recent event-loop scheduling lag.")
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds_distribution",
+    "Event-loop scheduling lag samples.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+EVENT_LOOP_BLOCKS_TOTAL = REGISTRY.counter("event_loop_blocks_total", "Times the loop blocked past the threshold.")
+
+
+@dataclass(slots=True)
+class BlockReport:
+    blocked_for: float
+    stack: list[traceback.FrameSummary]
+
+    def format(self) -> str:
+        return "".join(traceback.format_list(self.stack))
+
+    def watched_frames(self, packages: tuple[str, ...] = _WATCHED_PACKAGES) -> list[traceback.FrameSummary]:
+        """Frames that belong to the given top-level packages of this repository."""
+        frames = []
+        for frame in self.stack:
+            path = Path(frame.filename)
+            if not path.is_absolute():
+                path = _REPO_ROOT / path
+            try:
+                relative = path.resolve().relative_to(_REPO_ROOT)
+            except ValueError:
+                continue
+            if relative.parts and relative.parts[0] in packages:
+                frames.append(frame)
+        return frames
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        threshold_seconds: float = 0.25,
+        interval_seconds: float = 0.05,
+        on_block: Callable[[BlockReport], None] | None = None,
+    ) -> None:
+        self.loop = loop
+        self.threshold_seconds = threshold_seconds
+        self.interval_seconds = interval_seconds
+        self.on_block = on_block
+        self.reports: deque[BlockReport] = deque(maxlen=_RECENT_REPORTS)
+        self._loop_thread_id: int | None = None
+        self._last_beat = time.monotonic()
+        self._expected_beat = self._last_beat
+        self._reported_beat: float | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start watching. Must be called from the loop's own thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        lag = max(0.0, now - self._expected_beat)
+        EVENT_LOOP_LAG_SECONDS.set(lag)
+        EVENT_LOOP_LAG.observe(lag)
+        self._last_beat = now
+        self._expected_beat = now + self.interval_seconds
+        if not self._stop.is_set() and not self.loop.is_closed():
+            self._handle = self.loop.call_later(self.interval_seconds, self._beat)
+
+    def _monitor(self) -> None:
+        poll = min(self.interval_seconds, self.threshold_seconds) / 2
+        while not self._stop.wait(poll):
+            if self.loop.is_closed():
+                return
+            if not self.loop.is_running():
+                # Nothing is scheduled while the loop is stopped; don't count that as lag.
+                self._last_beat = self._expected_beat = time.monotonic()
+                continue
+            last_beat = self._last_beat
+            stale_for = time.monotonic() - last_beat - self.interval_seconds
+            if stale_for < self.threshold_seconds or self._reported_beat == last_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._reported_beat = last_beat
+            report = BlockReport(stale_for, traceback.extract_stack(frame))
+            self.reports.append(report)
+            EVENT_LOOP_BLOCKS_TOTAL.inc()
+            logger.warning(
+                "Event loop blocked for %.0f ms; loop thread is at:\n%s",
+                stale_for * 1000,
+                report.format(),
+            )
+            if self.on_block is not None:
+                self.on_block(report)
+
+
+class _WatchdogPolicy(asyncio.DefaultEventLoopPolicy):
+    """Attaches a LoopWatchdog to every loop it creates and collects the reports."""
+
+    def __init__(self, threshold_seconds: float) -> None:
+        super().__init__()
+        self.threshold_seconds = threshold_seconds
+        self.reports: list[BlockReport] = []
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        loop = super().new_event_loop()
+        watchdog = LoopWatchdog(loop, threshold_seconds=self.threshold_seconds, on_block=self.reports.append)
+        original_close = loop.close
+
+        def close() -> None:
+            watchdog.stop()
+            original_close()
+
+        loop.close = close
+        # start() records the thread id, so run it on the loop's thread as soon as the loop runs.
+        loop.call_soon(watchdog.start)
+        return loop
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+    import unittest
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fail-ms", type=float, default=100.0, help="blocking threshold in milliseconds")
+    args, unittest_args = parser.parse_known_args(argv)
+
+    policy = _WatchdogPolicy(args.fail_ms / 1000)
+    asyncio.set_event_loop_policy(policy)
+    program = unittest.main(module=None, argv=["unittest", *unittest_args], exit=False)
+
+    violations = [report for report in policy.reports if report.watched_frames()]
+    for report in violations:
+        print(f"\nEvent loop blocked for {report.blocked_for * 1000:.0f} ms in:", file=sys.stderr)
+        print(report.format(), file=sys.stderr)
+    if violations:
+        print(f"{len(violations)} blocking call(s) in {', '.join(_WATCHED_PACKAGES)}", file=sys.stderr)
+        return 1
+    return 0 if program.result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,84 @@
 import logging
 import discord
 
-from utils.text import chunk_text
+from utils.coalesce import SEEN_INTERACTIONS
+from utils.delivery import DeliveryStats, deliver_text, send_followup
+from utils.metrics import REGISTRY
+from utils.tracing import span, trace_interaction
 
 logger = logging.getLogger("thejamesroll-bot")
 
+COMMANDS_TOTAL = REGISTRY.counter("bot_commands_total", "Interaction tasks started.", ("command",))
+COMMAND_ERRORS_TOTAL = REGISTRY.counter("bot_command_errors_total", "Interaction tasks that failed.", ("command",))
 
-async def run_interaction_task(interaction, *, task_name, work, ephemeral: bool, max_chunks: int = 6):
-    await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+
+async def run_interaction_task(
+    interaction, *, task_name, work, ephemeral: bool, max_chunks: int = 6, allowed_mentions=None
+):
+    if not SEEN_INTERACTIONS.claim(getattr(interaction, "id", None)):
+        # A repeated delivery of an interaction already being handled; answering twice would fail anyway.
+        logger.info("Ignoring duplicate interaction %s for %s", interaction.id, task_name)
+        return
+    with trace_interaction(interaction, fallback=task_name) as trace:
+        COMMANDS_TOTAL.inc(command=trace.command)
+        await _run_interaction_task(
+            interaction,
+            task_name=task_name,
+            work=work,
+            ephemeral=ephemeral,
+            max_chunks=max_chunks,
+            command=trace.command,
+            allowed_mentions=allowed_mentions,
+        )
+
+
+async def _run_interaction_task(
+    interaction, *, task_name, work, ephemeral: bool, max_chunks: int, command: str, allowed_mentions
+):
+    with span("defer"):
+        await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+    stats = DeliveryStats()
 
     try:
-        result = await work()
+        with span("work"):
+            result = await work()
 
         if isinstance(result, tuple):
             embed = next((item for item in result if isinstance(item, discord.Embed)), None)
             files = [item for item in result if isinstance(item, discord.File)]
+            view = next((item for item in result if isinstance(item, discord.ui.View)), None)
             if embed is not None or files:
-                await interaction.followup.send(embed=embed, files=files or None, ephemeral=ephemeral)
+                extra = {"view": view} if view is not None else {}
+                message = await send_followup(
+                    interaction, stats, embed=embed, files=files or None, ephemeral=ephemeral, **extra
+                )
+                if view is not None and hasattr(view, "message"):
+                    # Views that disable themselves on timeout edit the message they were sent on.
+                    view.message = message
                 return
 
         if isinstance(result, discord.Embed):
-            await interaction.followup.send(embed=result, ephemeral=ephemeral)
+            await send_followup(interaction, stats, embed=result, ephemeral=ephemeral)
             return
 
-        for chunk in chunk_text(str(result), max_chunks=max_chunks):
-            await interaction.followup.send(chunk, ephemeral=ephemeral)
+        await deliver_text(
+            interaction,
+            str(result),
+            ephemeral=ephemeral,
+            max_chunks=max_chunks,
+            stats=stats,
+            allowed_mentions=allowed_mentions,
+        )
 
     except Exception:
+        COMMAND_ERRORS_TOTAL.inc(command=command)
         logger.exception("%s failed", task_name)
-        await interaction.followup.send(f"⚠️ {task_name} failed. Please try again.", ephemeral=True)
+        await send_followup(interaction, stats, content=f"⚠️ {task_name} failed. Please try again.", ephemeral=True)
+
+    finally:
+        logger.debug(
+            "%s delivered in %d send(s), %.0f ms sending",
+            task_name,
+            stats.sends,
+            stats.total_latency * 1000,
+        )
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_DEFAULT_INTERVAL_SECONDS = 0.005
+_MAX_STACK_DEPTH = 64
+
+# The SIGALRM handler and interval timer are process-wide, so only one profile may run at a time.
+_PROFILE_LOCK = asyncio.Lock()
+
+
+@dataclass(slots=True)
+class ProfileResult:
+    duration: float
+    interval: float
+    samples: int = 0
+    stacks: Counter[str] = field(default_factory=Counter)
+    task_samples: Counter[str] = field(default_factory=Counter)
+    task_counts: Counter[str] = field(default_factory=Counter)
+    # Every live task's await chain at every sample, rooted at its coroutine's name.
+    task_stacks: Counter[str] = field(default_factory=Counter)
+    await_samples: Counter[str] = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed ``frame;frame;frame count`` format used by flame graph tools."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def collapsed_tasks(self) -> str:
+        """Task await chains in the same format: a wall-time flame graph of every task, suspended or not."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.task_stacks.most_common())
+
+    def top_tasks(self, limit: int = 10) -> list[tuple[str, float]]:
+        """Coroutines ranked by samples that caught them holding the loop, as estimated wall seconds."""
+        return [(name, count * self.interval) for name, count in self.task_samples.most_common(limit)]
+
+    def top_awaits(self, limit: int = 10) -> list[tuple[str, float]]:
+        """Frames tasks were suspended in, ranked by estimated task-seconds spent waiting there."""
+        return [(label, count * self.interval) for label, count in self.await_samples.most_common(limit)]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{Path(code.co_filename).stem}:{name}"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _await_chain(task: asyncio.Task) -> list[str]:
+    """Frame labels from the task's coroutine down to the innermost one it is awaiting."""
+    labels = []
+    awaitable = task.get_coro()
+    # Task.get_stack() stops at the outermost frame of a suspended coroutine; cr_await goes deeper.
+    while awaitable is not None and len(labels) < _MAX_STACK_DEPTH:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_frame_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return labels
+
+
+def coroutine_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+def count_tasks(loop: asyncio.AbstractEventLoop) -> Counter[str]:
+    return Counter(coroutine_name(task) for task in asyncio.all_tasks(loop))
+
+
+def _record(result: ProfileResult, loop, frame, profiler: asyncio.Task | None) -> None:
+    result.samples += 1
+    result.stacks[_collapse(frame)] += 1
+    current = asyncio.current_task(loop)
+    result.task_samples[coroutine_name(current) if current is not None else "(idle / callbacks)"] += 1
+
+    for task in asyncio.all_tasks(loop):
+        if task is profiler:
+            continue
+        labels = _await_chain(task)
+        result.task_stacks[";".join([coroutine_name(task), *labels])] += 1
+        if task is not current and labels:
+            result.await_samples[labels[-1]] += 1
+
+
+async def _sample_with_timer(loop, seconds: float, interval: float, result: ProfileResult) -> None:
+    profiler = asyncio.current_task()
+
+    def on_alarm(signum, frame) -> None:
+        _record(result, loop, frame, profiler)
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, interval, interval)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _sample_from_thread(
+    loop, loop_thread_id: int, profiler: asyncio.Task | None, seconds: float, interval: float, result: ProfileResult
+) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(loop_thread_id)
+        if frame is not None:
+            _record(result, loop, frame, profiler)
+        time.sleep(interval)
+
+
+async def profile_loop(seconds: float, *, interval: float = _DEFAULT_INTERVAL_SECONDS) -> ProfileResult:
+    """Sample the running loop for ``seconds`` while it keeps serving live traffic.
+
+    On the main thread (where the bot runs) a SIGALRM ``ITIMER_REAL`` timer takes each sample
+    on wall-clock time, so the handler sees exactly the frame that was executing, including
+    time blocked in synchronous calls. Each sample also walks every live task's await chain,
+    which shows where suspended coroutines spend their wall time. Elsewhere a helper thread
+    reads the loop thread's frames instead; that path is biased toward moments the loop
+    releases the GIL, so it over-reports time spent idle in ``select``. Raises
+    ``RuntimeError`` if another profile is already running.
+    """
+    if _PROFILE_LOCK.locked():
+        raise RuntimeError("A profile is already running")
+    loop = asyncio.get_running_loop()
+    result = ProfileResult(duration=seconds, interval=interval)
+
+    async with _PROFILE_LOCK:
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            await _sample_with_timer(loop, seconds, interval, result)
+        else:
+            await asyncio.to_thread(
+                _sample_from_thread, loop, threading.get_ident(), asyncio.current_task(), seconds, interval, result
+            )
+
+    result.task_counts = count_tasks(loop)
+    return result
+
+
+def is_profiling() -> bool:
+    return _PROFILE_LOCK.locked()
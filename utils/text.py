@@ -1,23 +1,190 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+_FENCE_MARKERS = ("```", "~~~")
+_LINE_BREAKS = ("\n\n", "\n")
+_SENTENCE_MARKERS = (". ", "! ", "? ", "。", "！", "？")
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…。！？])\s+")
+_WORD_BREAK = re.compile(r"\s+")
+
+
+def discord_len(text: str) -> int:
+    """Length as Discord counts it: UTF-16 code units, so emoji outside the BMP count as two."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+class _Utf16Offsets:
+    """Maps character offsets to Discord lengths without re-measuring slices."""
+
+    def __init__(self, text: str) -> None:
+        self.size = len(text)
+        self.offsets: list[int] | None = None
+        if not text.isascii() and max(text) > "\uffff":
+            self.offsets = list(accumulate((2 if ord(char) > 0xFFFF else 1 for char in text), initial=0))
+
+    def length(self, start: int, end: int) -> int:
+        if self.offsets is None:
+            return end - start
+        return self.offsets[end] - self.offsets[start]
+
+    def end_for(self, start: int, budget: int) -> int:
+        if self.offsets is None:
+            return min(self.size, start + budget)
+        return min(self.size, bisect_right(self.offsets, self.offsets[start] + budget) - 1)
+
+
+def _fence_lines(text: str) -> list[tuple[int, str]]:
+    """(line start, stripped line) for every line that opens or closes a code fence."""
+    fences = []
+    for marker in _FENCE_MARKERS:
+        # Hop between single-character hits: finding one character is a memchr, while a
+        # search for the whole marker crawls through long fence-free stretches.
+        index = text.find(marker[0])
+        while index != -1:
+            if not text.startswith(marker, index):
+                index = text.find(marker[0], index + 1)
+                continue
+            line_start = text.rfind("\n", 0, index) + 1
+            line_end = text.find("\n", index)
+            if line_end == -1:
+                line_end = len(text)
+            if not text[line_start:index].strip(" \t"):
+                fences.append((line_start, text[line_start:line_end].strip()))
+            index = text.find(marker[0], line_end)
+    fences.sort()
+    return fences
+
+
+def _fence_marker(line: str) -> str:
+    """The run of backticks or tildes a fence line starts with."""
+    return line[: len(line) - len(line.lstrip(line[0]))]
+
+
+def _closes(opening: str, line: str) -> bool:
+    """Whether ``line`` closes the fence ``opening`` started: the same character, at least as many."""
+    marker = _fence_marker(opening)
+    return line.strip(marker[0]) == "" and len(line) >= len(marker)
+
+
+def _find_split(
+    text: str,
+    start: int,
+    end: int,
+    line_breaks: tuple[str, ...] = _LINE_BREAKS,
+    sentence_markers: tuple[str, ...] = _SENTENCE_MARKERS,
+) -> int:
+    """Best split index in (start, end]: paragraph, then line, then sentence, then word."""
+    floor = start + (end - start) // 4
+
+    for separator in line_breaks:
+        index = text.rfind(separator, floor, end)
+        if index > start:
+            return index
+
+    sentence_end = max((text.rfind(marker, floor, end) for marker in sentence_markers), default=-1)
+    if sentence_end > start:
+        return sentence_end + 1
+
+    index = text.rfind(" ", start + 1, end)
+    if index > start:
+        return index
+
+    return end
+
+
+def _chunk_plain(text: str, limit: int, max_chunks: int) -> list[str]:
+    """``chunk_text`` for text with no code fences whose length is already its Discord length.
+
+    With no fence state to carry and no offsets to map, each chunk is one boundary search and
+    one slice, and separators whose first character never occurs are never searched for.
+    """
+    line_breaks = _LINE_BREAKS if "\n" in text else ()
+    sentence_markers = tuple(marker for marker in _SENTENCE_MARKERS if marker[0] in text)
+    chunks: list[str] = []
+    pos = 0
+    size = len(text)
+
+    while size - pos > limit:
+        is_last = len(chunks) == max_chunks - 1
+        end = pos + limit - (1 if is_last else 0)
+        split = _find_split(text, pos, end, line_breaks, sentence_markers)
+        if is_last:
+            chunks.append(text[pos:split].rstrip() + "…")
+            return chunks
+        chunks.append(text[pos:split].rstrip())
+        pos = split
+        while pos < size and text[pos] in " \t\r\n":
+            pos += 1
+
+    chunks.append(text[pos:])
+    return chunks
+
+
 def chunk_text(text: str, limit: int = 1900, max_chunks: int = 6) -> list[str]:
+    """Split text into at most ``max_chunks`` Discord-sized pieces in a single pass.
+
+    Works on indices into the original string rather than re-slicing the remainder. Code
+    fences that span a split are closed at the end of one chunk and reopened at the start of
+    the next. If the text needs more than ``max_chunks`` pieces, the last one is truncated.
+    """
     text = (text or "").strip()
     if not text:
         return ["(No response)"]
 
-    chunks = []
-    remaining = text
+    offsets = _Utf16Offsets(text)
+    size = len(text)
+    if offsets.length(0, size) <= limit:
+        return [text]
+
+    fences = _fence_lines(text)
+    if not fences and offsets.offsets is None:
+        return _chunk_plain(text, limit, max_chunks)
+
+    next_fence = 0
+    open_fence: str | None = None
+    # What a chunk inside the open fence starts and ends with; rebuilt only when a fence opens or closes.
+    prefix = closer = ""
+    room = limit
+    # Room for the longest closing marker any split might need, plus its newline.
+    close_reserve = max((1 + len(_fence_marker(line)) for _, line in fences), default=0)
+
+    chunks: list[str] = []
+    pos = 0
 
-    while len(remaining) > limit and len(chunks) < max_chunks - 1:
-        split_at = remaining.rfind("\n", 0, limit)
-        if split_at == -1:
-            split_at = remaining.rfind(" ", 0, limit)
-        if split_at == -1:
-            split_at = limit
+    while pos < size:
+        if offsets.length(pos, size) <= room:
+            chunks.append(prefix + text[pos:])
+            break
 
-        chunks.append(remaining[:split_at].rstrip())
-        remaining = remaining[split_at:].lstrip()
+        is_last = len(chunks) == max_chunks - 1
+        budget = max(1, room - close_reserve - (1 if is_last else 0))
+        split = _find_split(text, pos, offsets.end_for(pos, budget))
 
-    if remaining:
-        chunks.append(remaining)
+        was_open = open_fence
+        while next_fence < len(fences) and fences[next_fence][0] < split:
+            line = fences[next_fence][1]
+            if open_fence is None:
+                open_fence = line
+            elif _closes(open_fence, line):
+                open_fence = None
+            next_fence += 1
+        if open_fence != was_open:
+            closer = f"\n{_fence_marker(open_fence)}" if open_fence else ""
+
+        chunks.append(prefix + text[pos:split].rstrip() + ("…" if is_last else "") + closer)
+        if is_last:
+            break
+
+        if open_fence != was_open:
+            prefix = f"{open_fence}\n" if open_fence else ""
+            room = limit - discord_len(prefix)
+        pos = split
+        skip = "\n" if open_fence else " \t\r\n"
+        while pos < size and text[pos] in skip:
+            pos += 1
 
     return chunks
 
@@ -27,4 +194,51 @@ def build_choice_list(raw: str) -> list[str]:
 
 
 def miles_to_meters(miles: float) -> int:
-    return int(miles * 1609.34)
\ No newline at end of file
+    return int(miles * 1609.34)
+
+
+def _split_after(text: str, pattern: re.Pattern) -> list[str]:
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _segment_units(text: str, limit: int, patterns: tuple[re.Pattern, ...]):
+    if len(text) <= limit:
+        yield text
+        return
+    if not patterns:
+        for start in range(0, len(text), limit):
+            yield text[start:start + limit]
+        return
+    for piece in _split_after(text, patterns[0]):
+        yield from _segment_units(piece, limit, patterns[1:])
+
+
+def split_segments(text: str, limit: int = 4500) -> list[str]:
+    """Split text into pieces of at most ``limit`` characters.
+
+    Splits prefer paragraph breaks, then sentence ends, then whitespace. Every character is kept,
+    so ``"".join(split_segments(text)) == text``.
+    """
+    segments: list[str] = []
+    current: list[str] = []
+    current_len = 0
+
+    for unit in _segment_units(text, limit, (_PARAGRAPH_BREAK, _SENTENCE_BREAK, _WORD_BREAK)):
+        if current and current_len + len(unit) > limit:
+            segments.append("".join(current))
+            current = []
+            current_len = 0
+        current.append(unit)
+        current_len += len(unit)
+
+    if current:
+        segments.append("".join(current))
+    return segments
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("thejamesroll-bot.trace")
+
+_RECENT_SPANS = 2000
+
+SPANS_DROPPED_TOTAL = REGISTRY.counter(
+    "bot_spans_dropped_total", "Spans dropped before export because the export buffer was full."
+)
+SPAN_SECONDS = REGISTRY.histogram(
+    "bot_span_duration_seconds",
+    "Duration of traced phases, upstream calls and whole commands.",
+    ("kind", "name", "command"),
+)
+
+
+@dataclass(slots=True)
+class TraceContext:
+    interaction_id: int | None
+    command: str
+    guild_id: int | None
+
+
+@dataclass(slots=True)
+class SpanRecord:
+    name: str
+    kind: str
+    command: str
+    interaction_id: int | None
+    guild_id: int | None
+    started_at: float
+    duration_ms: float
+    error: str | None = None
+
+
+_current_trace: ContextVar[TraceContext | None] = ContextVar("current_trace", default=None)
+
+
+class SpanRecorder:
+    """Feeds spans into the span-duration histogram and keeps a ring buffer of recent spans."""
+
+    def __init__(self, recent: int = _RECENT_SPANS) -> None:
+        self.recent: deque[SpanRecord] = deque(maxlen=recent)
+        self._unexported: list[SpanRecord] = []
+        self._dropped = 0
+
+    def record(self, record: SpanRecord) -> None:
+        SPAN_SECONDS.observe(record.duration_ms / 1000, kind=record.kind, name=record.name, command=record.command)
+        self.recent.append(record)
+        self._unexported.append(record)
+        if len(self._unexported) > self.recent.maxlen:
+            overflow = len(self._unexported) - self.recent.maxlen
+            del self._unexported[:overflow]
+            self._dropped += overflow
+            SPANS_DROPPED_TOTAL.inc(overflow)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(asdict(record), separators=(",", ":")))
+
+    def export(self, path: str | Path) -> int:
+        """Append spans recorded since the last export to a JSON-lines file. Blocking; run off-loop."""
+        pending, self._unexported = self._unexported, []
+        dropped, self._dropped = self._dropped, 0
+        if dropped:
+            logger.warning("Dropped %d span(s) since the last export; the buffer holds %d", dropped, self.recent.maxlen)
+        if not pending:
+            return 0
+        with Path(path).open("a", encoding="utf-8") as handle:
+            for record in pending:
+                handle.write(json.dumps(asdict(record), separators=(",", ":")) + "\n")
+        return len(pending)
+
+    def reset(self) -> None:
+        self.recent.clear()
+        self._unexported.clear()
+        self._dropped = 0
+
+
+RECORDER = SpanRecorder()
+
+
+class span:
+    """Time a block and record it against the current interaction trace.
+
+    Works as a plain ``with`` block inside coroutines; awaited calls inside are included.
+    """
+
+    __slots__ = ("name", "kind", "_started", "_wall")
+
+    def __init__(self, name: str, kind: str = "phase") -> None:
+        self.name = name
+        self.kind = kind
+
+    def __enter__(self) -> "span":
+        self._wall = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        trace = _current_trace.get()
+        RECORDER.record(
+            SpanRecord(
+                name=self.name,
+                kind=self.kind,
+                command=trace.command if trace else "background",
+                interaction_id=trace.interaction_id if trace else None,
+                guild_id=trace.guild_id if trace else None,
+                started_at=self._wall,
+                duration_ms=duration_ms,
+                error=exc_type.__name__ if exc_type else None,
+            )
+        )
+
+
+def upstream_span(name: str) -> span:
+    return span(name, kind="upstream")
+
+
+class trace_interaction:
+    """Bind spans inside the block to an interaction and record the total as a ``command`` span."""
+
+    __slots__ = ("_context", "_token", "_span")
+
+    def __init__(self, interaction, fallback: str = "unknown") -> None:
+        app_command = getattr(interaction, "command", None)
+        resolved = getattr(app_command, "qualified_name", None) or fallback
+        self._context = TraceContext(
+            interaction_id=getattr(interaction, "id", None),
+            command=resolved,
+            guild_id=getattr(interaction, "guild_id", None),
+        )
+        self._span = span("total", kind="command")
+
+    def __enter__(self) -> TraceContext:
+        self._token = _current_trace.set(self._context)
+        self._span.__enter__()
+        return self._context
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._span.__exit__(exc_type, exc, tb)
+        finally:
+            _current_trace.reset(self._token)
+
+
+def current_trace() -> TraceContext | None:
+    return _current_trace.get()